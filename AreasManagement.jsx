@@ -176,6 +176,8 @@ export default function AreasManagement() {
                 <TableRow>
                   <TableHead>ID</TableHead>
                   <TableHead>Nome</TableHead>
+                  <TableHead className="text-right">Metas</TableHead>
+                  <TableHead className="text-right">Lançamentos</TableHead>
                   <TableHead className="text-right">Ações</TableHead>
                 </TableRow>
               </TableHeader>
@@ -184,6 +186,8 @@ export default function AreasManagement() {
                   <TableRow key={area.id}>
                     <TableCell className="font-medium">{area.id}</TableCell>
                     <TableCell>{area.nome}</TableCell>
+                    <TableCell className="text-right">{area.total_metas}</TableCell>
+                    <TableCell className="text-right">{area.total_lancamentos}</TableCell>
                     <TableCell className="text-right">
                       <div className="flex justify-end gap-2">
                         <Button
@@ -176,6 +176,8 @@ export default function ColaboradoresManagement() {
                 <TableRow>
                   <TableHead>ID</TableHead>
                   <TableHead>Nome</TableHead>
+                  <TableHead className="text-right">Lançamentos</TableHead>
+                  <TableHead className="text-right">Observações</TableHead>
                   <TableHead className="text-right">Ações</TableHead>
                 </TableRow>
               </TableHeader>
@@ -184,6 +186,8 @@ export default function ColaboradoresManagement() {
                   <TableRow key={colaborador.id}>
                     <TableCell className="font-medium">{colaborador.id}</TableCell>
                     <TableCell>{colaborador.nome}</TableCell>
+                    <TableCell className="text-right">{colaborador.total_lancamentos}</TableCell>
+                    <TableCell className="text-right">{colaborador.total_observacoes}</TableCell>
                     <TableCell className="text-right">
                       <div className="flex justify-end gap-2">
                         <Button
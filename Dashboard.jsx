@@ -23,23 +23,17 @@ export default function Dashboard() {
     try {
       setLoading(true)
       
-      // Carregar estatísticas
-      const [areas, colaboradores, metas, lancamentos] = await Promise.all([
-        apiClient.getAreas(),
-        apiClient.getColaboradores(),
-        apiClient.getMetas(),
-        apiClient.getLancamentos()
-      ])
+      // Resumo calculado no servidor em uma única requisição
+      const summary = await apiClient.getDashboardSummary()
 
       setStats({
-        totalAreas: areas.length,
-        totalColaboradores: colaboradores.length,
-        totalMetas: metas.length,
-        totalLancamentos: lancamentos.length
+        totalAreas: summary.totais.areas,
+        totalColaboradores: summary.totais.colaboradores,
+        totalMetas: summary.totais.metas,
+        totalLancamentos: summary.totais.lancamentos
       })
 
-      // Pegar os 5 lançamentos mais recentes
-      setRecentLancamentos(lancamentos.slice(0, 5))
+      setRecentLancamentos(summary.lancamentos_recentes)
     } catch (error) {
       console.error('Erro ao carregar dados do dashboard:', error)
     } finally {
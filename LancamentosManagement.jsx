@@ -14,6 +14,7 @@ export default function LancamentosManagement() {
   const [lancamentos, setLancamentos] = useState([])
   const [areas, setAreas] = useState([])
   const [colaboradores, setColaboradores] = useState([])
+  const [ausentes, setAusentes] = useState({})
   const [loading, setLoading] = useState(true)
   const [dialogOpen, setDialogOpen] = useState(false)
   const [editingLancamento, setEditingLancamento] = useState(null)
@@ -39,6 +40,10 @@ export default function LancamentosManagement() {
     loadLancamentos()
   }, [filters])
 
+  useEffect(() => {
+    loadAusentes(formData.data)
+  }, [formData.data])
+
   const loadData = async () => {
     try {
       setLoading(true)
@@ -57,6 +62,20 @@ export default function LancamentosManagement() {
     }
   }
 
+  const loadAusentes = async (data) => {
+    if (!data) {
+      setAusentes({})
+      return
+    }
+    try {
+      const resultado = await apiClient.getColaboradoresPresentes(data)
+      setAusentes(Object.fromEntries(resultado.ausentes.map((ausente) => [ausente.id, ausente])))
+    } catch (error) {
+      console.error('Erro ao carregar ausências:', error)
+      setAusentes({})
+    }
+  }
+
   const loadLancamentos = async () => {
     try {
       const cleanFilters = Object.fromEntries(
@@ -233,8 +252,13 @@ export default function LancamentosManagement() {
                     </SelectTrigger>
                     <SelectContent>
                       {colaboradores.map((colaborador) => (
-                        <SelectItem key={colaborador.id} value={colaborador.id.toString()}>
+                        <SelectItem
+                          key={colaborador.id}
+                          value={colaborador.id.toString()}
+                          disabled={Boolean(ausentes[colaborador.id])}
+                        >
                           {colaborador.nome}
+                          {ausentes[colaborador.id] && ` (${ausentes[colaborador.id].tipo_observacao})`}
                         </SelectItem>
                       ))}
                     </SelectContent>
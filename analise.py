@@ -0,0 +1,129 @@
+import numpy as np
+from datetime import timedelta
+from src.models.models import db, LancamentosProducao
+
+# Análise de produção por colaborador ou por área: totais móveis de 7 e 30 dias,
+# percentis p50/p90 de quantidade_realizada e variação em relação ao dia de
+# produção anterior.
+#
+# Os lançamentos são lidos uma única vez, como colunas, e processados com NumPy,
+# sem laços por linha: a produção diária forma uma matriz grupo x dia cuja soma
+# acumulada dá as janelas móveis, e os percentis são calculados sobre os
+# lançamentos ordenados por grupo e quantidade. A leitura começa 29 dias antes
+# do período, para que as janelas do primeiro dia já estejam completas.
+
+JANELAS = (7, 30)
+PERCENTIS = (50, 90)
+
+def _colunas(stmt, *tipos):
+    """Executa a consulta e devolve cada coluna como um array NumPy"""
+    # Execução no nível do Core: as linhas não passam pelo carregamento do ORM
+    rows = db.session.connection(bind_arguments={'clause': stmt}).execute(stmt).all()
+    if not rows:
+        return tuple(np.array([], dtype=tipo) for tipo in tipos)
+    return tuple(np.array(coluna, dtype=tipo) for coluna, tipo in zip(zip(*rows), tipos))
+
+def _percentis(quantidades_ordenadas, inicios, contagens):
+    """Percentis (interpolação linear) de cada grupo, a partir das quantidades já ordenadas"""
+    resultado = {}
+    for percentil in PERCENTIS:
+        posicao = inicios + (contagens - 1) * (percentil / 100.0)
+        abaixo = np.floor(posicao).astype(np.int64)
+        acima = np.ceil(posicao).astype(np.int64)
+        fracao = posicao - abaixo
+        resultado[percentil] = (
+            quantidades_ordenadas[abaixo] + (quantidades_ordenadas[acima] - quantidades_ordenadas[abaixo]) * fracao
+        )
+    return resultado
+
+def analisar_producao(tabela, chave, data_inicio, data_fim):
+    """Indicadores por grupo (colaborador ou área) com lançamentos no período
+
+    tabela é o modelo com os nomes do grupo e chave a coluna do grupo em
+    LancamentosProducao (colaborador_id ou area_id). Retorna uma lista de
+    dicionários, com a série diária de cada grupo em formato de colunas.
+    """
+    # Uma única leitura dos lançamentos, incluindo os dias anteriores das janelas.
+    # A data é lida como texto ISO, convertida pelo NumPy sem criar objetos date.
+    inicio_janela = data_inicio - timedelta(days=max(JANELAS) - 1)
+    grupos_lanc, datas_lanc, quantidades = _colunas(
+        db.select(
+            getattr(LancamentosProducao, chave),
+            db.cast(LancamentosProducao.data, db.String),
+            LancamentosProducao.quantidade_realizada
+        ).where(
+            LancamentosProducao.data >= inicio_janela,
+            LancamentosProducao.data <= data_fim,
+            LancamentosProducao.quantidade_realizada.isnot(None)
+        ),
+        np.int64, 'datetime64[D]', np.float64
+    )
+    origem = np.datetime64(inicio_janela, 'D')
+    dia_lanc = (datas_lanc - origem).astype(np.int64)
+    deslocamento = (data_inicio - inicio_janela).days
+    no_periodo = dia_lanc >= deslocamento
+    if not no_periodo.any():
+        return []
+
+    # Percentis e totais do período: lançamentos ordenados por grupo e quantidade
+    grupos_periodo = grupos_lanc[no_periodo]
+    quantidades_periodo = quantidades[no_periodo]
+    ordem = np.lexsort((quantidades_periodo, grupos_periodo))
+    quantidades_ordenadas = quantidades_periodo[ordem]
+    grupos, inicios, contagens = np.unique(grupos_periodo[ordem], return_index=True, return_counts=True)
+    totais = np.add.reduceat(quantidades_ordenadas, inicios)
+    percentis = _percentis(quantidades_ordenadas, inicios, contagens)
+
+    # Matriz grupo x dia com a produção diária dos grupos do período
+    dias = (data_fim - inicio_janela).days + 1
+    posicoes = np.searchsorted(grupos, grupos_lanc)
+    do_grupo = grupos[np.minimum(posicoes, grupos.size - 1)] == grupos_lanc
+    matriz = np.zeros((grupos.size, dias))
+    np.add.at(matriz, (posicoes[do_grupo], dia_lanc[do_grupo]), quantidades[do_grupo])
+
+    # Janelas móveis pela diferença da soma acumulada
+    acumulado = np.concatenate([np.zeros((grupos.size, 1)), np.cumsum(matriz, axis=1)], axis=1)
+    indices = np.arange(1, dias + 1)
+    moveis = {
+        janela: acumulado[:, indices] - acumulado[:, np.maximum(indices - janela, 0)]
+        for janela in JANELAS
+    }
+
+    # Série de cada grupo: dias do período com produção
+    linha, coluna = np.nonzero(matriz[:, deslocamento:] > 0)
+    coluna = coluna + deslocamento
+    quantidade_serie = matriz[linha, coluna]
+    anterior = np.concatenate([[0.0], quantidade_serie[:-1]])
+    mesmo_grupo = np.concatenate([[False], linha[1:] == linha[:-1]])
+    # Primeiro dia de cada grupo não tem dia anterior: delta None
+    delta = np.where(mesmo_grupo, quantidade_serie - anterior, None)
+    datas_serie = np.datetime_as_string(origem + coluna.astype('timedelta64[D]'))
+    cortes = np.searchsorted(linha, np.arange(1, grupos.size))
+
+    series = {
+        'datas': np.split(datas_serie, cortes),
+        'quantidade': np.split(quantidade_serie, cortes),
+        'delta': np.split(delta, cortes)
+    }
+    for janela in JANELAS:
+        series[f'total_{janela}d'] = np.split(moveis[janela][linha, coluna], cortes)
+
+    nomes = dict(db.session.query(tabela.id, tabela.nome).filter(tabela.id.in_(grupos.tolist())))
+    ultimo_dia = dias - 1
+
+    resultado = []
+    for posicao, grupo in enumerate(grupos.tolist()):
+        item = {
+            'id': grupo,
+            'nome': nomes.get(grupo),
+            'quantidade_lancamentos': int(contagens[posicao]),
+            'total_produzido': float(totais[posicao]),
+            'media_producao': float(totais[posicao] / contagens[posicao]),
+            'p50': float(percentis[50][posicao]),
+            'p90': float(percentis[90][posicao])
+        }
+        for janela in JANELAS:
+            item[f'total_{janela}d'] = float(moveis[janela][posicao, ultimo_dia])
+        item['serie'] = {nome: valores[posicao].tolist() for nome, valores in series.items()}
+        resultado.append(item)
+    return resultado
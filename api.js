@@ -86,6 +86,10 @@ class ApiClient {
     return this.request('/colaboradores')
   }
 
+  async getColaboradoresPresentes(data) {
+    return this.request(`/colaboradores/presentes?data=${data}`)
+  }
+
   async createColaborador(data) {
     return this.request('/colaboradores', {
       method: 'POST',
@@ -165,6 +169,21 @@ class ApiClient {
     })
   }
 
+  // selecao: { ids: [...] } ou { filtro: { data_inicio, data_fim, area_id, colaborador_id } }
+  async updateLancamentosLote(selecao, alteracoes) {
+    return this.request('/lancamentos', {
+      method: 'PATCH',
+      body: JSON.stringify({ ...selecao, alteracoes }),
+    })
+  }
+
+  async deleteLancamentosLote(selecao) {
+    return this.request('/lancamentos', {
+      method: 'DELETE',
+      body: JSON.stringify(selecao),
+    })
+  }
+
   // Observações
   async getObservacoes(filters = {}) {
     const params = new URLSearchParams()
@@ -195,6 +214,11 @@ class ApiClient {
     })
   }
 
+  // Dashboard
+  async getDashboardSummary() {
+    return this.request('/dashboard/summary')
+  }
+
   // Relatórios
   async getRelatorioProducaoPorColaborador(filters = {}) {
     const params = new URLSearchParams()
@@ -213,6 +237,15 @@ class ApiClient {
     const queryString = params.toString()
     return this.request(`/lancamentos/relatorios/producao-area${queryString ? `?${queryString}` : ''}`)
   }
+
+  // tipo: 'colaborador' ou 'area'; periodos: [{ nome, data_inicio, data_fim }], o primeiro é a base das variações
+  async getRelatorioComparativo(tipo, periodos) {
+    const params = new URLSearchParams()
+    periodos.forEach(({ nome, data_inicio, data_fim }) => {
+      params.append('periodo', `${nome}:${data_inicio}:${data_fim}`)
+    })
+    return this.request(`/relatorios/producao-${tipo}?${params.toString()}`)
+  }
 }
 
 export const apiClient = new ApiClient()
@@ -2,11 +2,16 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required
 from src.models.models import db, AreasProducao
 from src.utils.decorators import can_manage_areas
+from src.utils.db_profile import read_only
+from src.utils.versoes import versoes_tabelas, conditional_get
+from src.utils.contadores import versao_contadores
 
 areas_bp = Blueprint('areas', __name__)
 
 @areas_bp.route('/areas', methods=['GET'])
 @login_required
+@read_only
+@conditional_get('areas_producao', versao_contadores(AreasProducao))
 def get_areas():
     """Listar todas as áreas"""
     try:
@@ -32,6 +37,7 @@ def create_area():
         
         area = AreasProducao(nome=data['nome'])
         db.session.add(area)
+        versoes_tabelas.incrementar('areas_producao')
         db.session.commit()
         
         return jsonify(area.to_dict()), 201
@@ -66,6 +72,7 @@ def update_area(area_id):
             return jsonify({'error': 'Já existe uma área com esse nome'}), 400
         
         area.nome = data['nome']
+        versoes_tabelas.incrementar('areas_producao')
         db.session.commit()
         
         return jsonify(area.to_dict()), 200
@@ -81,10 +88,11 @@ def delete_area(area_id):
         area = AreasProducao.query.get_or_404(area_id)
         
         # Verificar se existem metas ou lançamentos associados
-        if area.metas or area.lancamentos:
+        if area.total_metas or area.total_lancamentos:
             return jsonify({'error': 'Não é possível deletar área que possui metas ou lançamentos associados'}), 400
         
         db.session.delete(area)
+        versoes_tabelas.incrementar('areas_producao')
         db.session.commit()
         
         return jsonify({'message': 'Área deletada com sucesso'}), 200
@@ -0,0 +1,117 @@
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from src.models.models import db, ObservacoesColaborador
+from src.utils.versoes import versoes_tabelas
+
+# Índice em memória das ausências dos colaboradores (observações de férias, falta,
+# atestado e licença).
+#
+# As observações de cada colaborador são agrupadas em intervalos de dias
+# consecutivos do mesmo tipo, ordenados e sem sobreposição; saber se o colaborador
+# estava ausente em uma data é uma busca binária nos inícios dos intervalos. O
+# índice é carregado em uma única consulta e recarregado quando a versão da tabela
+# observacoes_colaborador muda (as escritas em observacoes.py a incrementam), o que
+# vale também para os demais workers.
+
+TIPOS_AUSENCIA = ('férias', 'falta', 'atestado', 'licença')
+
+Ausencia = namedtuple('Ausencia', ['tipo_observacao', 'data_inicio', 'data_fim'])
+
+def agrupar_intervalos(observacoes):
+    """Agrupa (colaborador_id, data, tipo) em intervalos: {colaborador_id: ([inícios], [Ausencia])}
+
+    Dias consecutivos do mesmo tipo formam um único intervalo; um dia com mais de
+    uma observação fica no intervalo do primeiro tipo encontrado.
+    """
+    por_colaborador = {}
+    for colaborador_id, data, tipo in sorted(observacoes, key=lambda o: (o[0], o[1], o[2])):
+        inicios, intervalos = por_colaborador.setdefault(colaborador_id, ([], []))
+        if intervalos:
+            ultimo = intervalos[-1]
+            if data <= ultimo.data_fim:
+                continue
+            if tipo == ultimo.tipo_observacao and (data - ultimo.data_fim).days == 1:
+                intervalos[-1] = ultimo._replace(data_fim=data)
+                continue
+        inicios.append(data)
+        intervalos.append(Ausencia(tipo, data, data))
+    return por_colaborador
+
+def mensagem_ausencia(ausencia):
+    """Mensagem de erro para lançamento em dia de ausência"""
+    if ausencia.data_inicio == ausencia.data_fim:
+        return f'Colaborador ausente ({ausencia.tipo_observacao}) em {ausencia.data_inicio.isoformat()}'
+    return (
+        f'Colaborador ausente ({ausencia.tipo_observacao}) de '
+        f'{ausencia.data_inicio.isoformat()} a {ausencia.data_fim.isoformat()}'
+    )
+
+class IndiceAusencias:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_colaborador = None
+        self._versao = None
+
+    def invalidar(self):
+        """Descarta o índice; a próxima consulta recarrega as observações do banco"""
+        self._por_colaborador = None
+
+    def carregar(self, versao=None):
+        """Carrega as ausências de todos os colaboradores em uma única consulta"""
+        if versao is None:
+            versao = versoes_tabelas.versoes((ObservacoesColaborador.__tablename__,))
+        observacoes = db.session.query(
+            ObservacoesColaborador.colaborador_id,
+            ObservacoesColaborador.data,
+            ObservacoesColaborador.tipo_observacao
+        ).filter(ObservacoesColaborador.tipo_observacao.in_(TIPOS_AUSENCIA))
+        por_colaborador = agrupar_intervalos(observacoes)
+        self._por_colaborador = por_colaborador
+        self._versao = versao
+        return por_colaborador
+
+    def _intervalos(self):
+        versao = versoes_tabelas.versoes((ObservacoesColaborador.__tablename__,))
+        por_colaborador = self._por_colaborador
+        if por_colaborador is not None and self._versao == versao:
+            return por_colaborador
+        with self._lock:
+            if self._por_colaborador is not None and self._versao == versao:
+                return self._por_colaborador
+            return self.carregar(versao)
+
+    @staticmethod
+    def _buscar(entrada, data):
+        inicios, intervalos = entrada
+        posicao = bisect_right(inicios, data) - 1
+        if posicao >= 0 and intervalos[posicao].data_fim >= data:
+            return intervalos[posicao]
+        return None
+
+    def ausencia(self, colaborador_id, data):
+        """Ausência (tipo e intervalo) do colaborador na data, ou None se presente"""
+        entrada = self._intervalos().get(int(colaborador_id))
+        if not entrada:
+            return None
+        return self._buscar(entrada, data)
+
+    def presente(self, colaborador_id, data):
+        return self.ausencia(colaborador_id, data) is None
+
+    def ausentes(self, data, colaborador_ids=None):
+        """{colaborador_id: Ausencia} dos colaboradores ausentes na data"""
+        por_colaborador = self._intervalos()
+        if colaborador_ids is not None:
+            itens = ((id, por_colaborador.get(id)) for id in colaborador_ids)
+        else:
+            itens = por_colaborador.items()
+        resultado = {}
+        for colaborador_id, entrada in itens:
+            if entrada:
+                ausencia = self._buscar(entrada, data)
+                if ausencia is not None:
+                    resultado[colaborador_id] = ausencia
+        return resultado
+
+indice_ausencias = IndiceAusencias()
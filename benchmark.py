@@ -0,0 +1,519 @@
+import os
+import sys
+# Mesmo ajuste de caminho do main.py: permite executar este arquivo diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import http.cookiejar
+import json
+import platform
+import resource
+import secrets
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from datetime import date, datetime, timedelta
+import numpy as np
+
+# Benchmark das rotas da API sobre o banco configurado (DATABASE_URL ou app.db).
+#
+# Cada rota dos blueprints é chamada `--iteracoes` vezes pelo test client do Flask
+# (medindo também as consultas SQL por requisição) e, com --gunicorn, por HTTP em
+# um gunicorn local (--preload). O tempo de inicialização a frio (importação e
+# create_app() em um processo novo) é medido `--inicializacoes` vezes. O resultado
+# é gravado em JSON com chaves ordenadas, para ser comparado entre commits. Para
+# popular o banco use: flask gerar-dados
+#
+# As requisições usam um administrador temporário, com nome único, removido ao
+# final junto com os seus jobs. As rotas de escrita criam e depois excluem os
+# próprios registros (áreas, colaboradores, metas e observações com o prefixo da
+# execução e lançamentos no ano 2999). Não são medidos: /logout (encerraria a
+# sessão), /create-admin (só cria o primeiro administrador) e o fechamento de um
+# mês novo (os fechamentos são permanentes; POST /fechamentos é medido com um mês
+# já fechado, quando houver, e o cálculo pelo comando flask fechar-mes).
+#
+#   python benchmark.py --iteracoes 50 --gunicorn --saida benchmark.json
+
+PREFIXO_USUARIO = 'benchmark'
+PERCENTIS = (50, 90, 99)
+# Lançamentos criados pelo benchmark ficam a partir desta data, longe dos reais
+DATA_BENCHMARK = date(2999, 1, 1)
+# Lançamentos por requisição em /lancamentos/bulk
+TAMANHO_LOTE = 50
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _preparar(app):
+    """Cria o administrador temporário do benchmark e escolhe os ids usados nas rotas"""
+    from src.models.models import (
+        db, AreasProducao, Colaboradores, Metas, LancamentosProducao, ObservacoesColaborador, FechamentoMensal
+    )
+    from src.models.user import User
+
+    token = secrets.token_hex(4)
+    usuario = f'{PREFIXO_USUARIO}-{token}'
+    senha = secrets.token_urlsafe(16)
+    with app.app_context():
+        if User.query.filter_by(username=usuario).first() is not None:
+            raise RuntimeError(f'Usuário {usuario} já existe')
+        admin = User(username=usuario, email=f'{usuario}@localhost', role='admin')
+        admin.set_password(senha)
+        db.session.add(admin)
+        db.session.commit()
+
+        ultima_data = db.session.query(db.func.max(LancamentosProducao.data)).filter(
+            LancamentosProducao.data < DATA_BENCHMARK
+        ).scalar() or date.today()
+        contexto = {
+            'usuario': usuario,
+            'senha': senha,
+            'prefixo': f'Benchmark {token}',
+            'area_id': db.session.query(db.func.min(AreasProducao.id)).scalar(),
+            'colaborador_id': db.session.query(db.func.min(Colaboradores.id)).scalar(),
+            'meta_id': db.session.query(db.func.min(Metas.id)).scalar(),
+            'lancamento_id': db.session.query(db.func.max(LancamentosProducao.id)).scalar(),
+            'observacao_id': db.session.query(db.func.max(ObservacoesColaborador.id)).scalar(),
+            'competencia_fechada': db.session.query(db.func.max(FechamentoMensal.competencia)).scalar(),
+            'data_fim': ultima_data,
+            'data_inicio': ultima_data - timedelta(days=29),
+            'dados': {
+                'areas': AreasProducao.query.count(),
+                'colaboradores': Colaboradores.query.count(),
+                'metas': Metas.query.count(),
+                'lancamentos': LancamentosProducao.query.count(),
+                'observacoes': ObservacoesColaborador.query.count()
+            }
+        }
+    return contexto
+
+def _remover_usuario(app, usuario):
+    """Remove o administrador temporário e os jobs criados por ele"""
+    from src.models.models import db, Job
+    from src.models.user import User
+    from src.utils.fila_jobs import remover_jobs
+
+    with app.app_context():
+        admin = User.query.filter_by(username=usuario).first()
+        if admin is None:
+            return
+        remover_jobs(Job.usuario_id == admin.id)
+        db.session.delete(admin)
+        db.session.commit()
+
+def rotas_leitura(ctx):
+    """(nome, caminho) das rotas GET, com os ids e o período escolhidos em _preparar"""
+    periodo = f"data_inicio={ctx['data_inicio'].isoformat()}&data_fim={ctx['data_fim'].isoformat()}"
+    return [
+        ('check_auth', '/api/check-auth'),
+        ('me', '/api/me'),
+        ('get_areas', '/api/areas'),
+        ('get_area', f"/api/areas/{ctx['area_id']}"),
+        ('get_colaboradores', '/api/colaboradores'),
+        ('get_colaborador', f"/api/colaboradores/{ctx['colaborador_id']}"),
+        ('get_metas', '/api/metas'),
+        ('get_meta', f"/api/metas/{ctx['meta_id']}"),
+        ('get_metas_by_area', f"/api/metas/area/{ctx['area_id']}"),
+        ('get_lancamentos_pagina', '/api/lancamentos?limit=100'),
+        ('get_lancamentos_periodo', f'/api/lancamentos?{periodo}'),
+        ('get_lancamento', f"/api/lancamentos/{ctx['lancamento_id']}"),
+        ('export_lancamentos', f'/api/lancamentos/export?format=csv&{periodo}'),
+        ('relatorio_producao_colaborador', f'/api/relatorios/producao-colaborador?{periodo}'),
+        ('relatorio_producao_area', f'/api/relatorios/producao-area?{periodo}'),
+        ('export_relatorio_colaborador', f'/api/relatorios/producao-colaborador/export?format=csv&{periodo}'),
+        ('analise_colaborador', f'/api/relatorios/analise-colaborador?{periodo}'),
+        ('analise_area', f'/api/relatorios/analise-area?{periodo}'),
+        ('get_observacoes', '/api/observacoes'),
+        ('get_observacao', f"/api/observacoes/{ctx['observacao_id']}"),
+        ('busca_observacoes', '/api/observacoes?q=falta&limit=50'),
+        ('get_colaboradores_presentes', f"/api/colaboradores/presentes?data={ctx['data_fim'].isoformat()}"),
+        ('dashboard_summary', '/api/dashboard/summary'),
+        ('get_fechamentos', '/api/fechamentos'),
+        ('metricas', '/api/_metrics')
+    ] + ([
+        ('get_fechamento', f"/api/fechamentos/{ctx['competencia_fechada']}")
+    ] if ctx['competencia_fechada'] else [])
+
+def _estatisticas(tempos, status, queries=None):
+    tempos_ms = np.array(tempos) * 1000
+    resultado = {
+        'n': len(tempos),
+        'media_ms': round(float(tempos_ms.mean()), 3),
+        'max_ms': round(float(tempos_ms.max()), 3),
+        'status': sorted(set(status))
+    }
+    for percentil in PERCENTIS:
+        resultado[f'p{percentil}_ms'] = round(float(np.percentile(tempos_ms, percentil)), 3)
+    if queries is not None:
+        resultado['queries_por_requisicao'] = round(float(np.mean(queries)), 2)
+    return resultado
+
+def _data_benchmark(dias):
+    return (DATA_BENCHMARK + timedelta(days=dias)).isoformat()
+
+def _lancamento_benchmark(ctx, indice):
+    # Datas distantes para não colidir com lançamentos reais (data, área, colaborador)
+    return {
+        'data': _data_benchmark(indice),
+        'area_id': ctx['area_id'],
+        'colaborador_id': ctx['colaborador_id'],
+        'quantidade_realizada': 100 + indice % 50
+    }
+
+def _corpo_json(conteudo):
+    """Corpo de uma resposta JSON de objeto; {} para listas, CSV etc."""
+    if not conteudo.startswith(b'{'):
+        return {}
+    try:
+        return json.loads(conteudo)
+    except ValueError:
+        return {}
+
+def _medir_test_client(app, cliente, requisicoes):
+    """Executa as requisições (método, caminho, corpo); devolve estatísticas e respostas"""
+    from src.utils.query_counter import count_queries
+
+    tempos, status, queries, respostas = [], [], [], []
+    for metodo, caminho, corpo in requisicoes:
+        # Consultas no engine principal e no engine de leitura
+        with app.app_context(), count_queries() as contador:
+            inicio = time.perf_counter()
+            resposta = cliente.open(caminho, method=metodo, json=corpo)
+            resposta.get_data()
+            tempos.append(time.perf_counter() - inicio)
+        status.append(resposta.status_code)
+        queries.append(contador.count)
+        respostas.append(resposta)
+    return _estatisticas(tempos, status, queries), respostas
+
+def _medir_http(opener, base_url, requisicoes):
+    tempos, status, respostas = [], [], []
+    for metodo, caminho, corpo in requisicoes:
+        dados = json.dumps(corpo).encode() if corpo is not None else None
+        requisicao = urllib.request.Request(
+            base_url + caminho, data=dados, method=metodo, headers={'Content-Type': 'application/json'}
+        )
+        inicio = time.perf_counter()
+        try:
+            with opener.open(requisicao) as resposta:
+                conteudo = resposta.read()
+                codigo = resposta.status
+        except urllib.error.HTTPError as e:
+            conteudo = e.read()
+            codigo = e.code
+        tempos.append(time.perf_counter() - inicio)
+        status.append(codigo)
+        respostas.append(conteudo)
+    return _estatisticas(tempos, status), respostas
+
+def _cenario(ctx, iteracoes, medir, corpo_json):
+    """Executa todas as rotas com a função medir(requisicoes); devolve as estatísticas por rota
+
+    corpo_json(resposta) devolve o corpo JSON da resposta (ou {}). Os registros
+    criados pelas rotas de escrita são excluídos pelas próprias rotas de exclusão.
+    """
+    resultados = {}
+    # Nomes únicos também entre o test client e o gunicorn
+    prefixo = f"{ctx['prefixo']}-{secrets.token_hex(2)}"
+
+    def executar(nome, metodo, caminho, requisicoes):
+        if not requisicoes:
+            return []
+        resultados[nome], respostas = medir(requisicoes)
+        resultados[nome].update(metodo=metodo, caminho=caminho)
+        return [corpo_json(resposta) for resposta in respostas]
+
+    def ids(corpos):
+        return [corpo['id'] for corpo in corpos if corpo.get('id')]
+
+    for nome, caminho in rotas_leitura(ctx):
+        executar(nome, 'GET', caminho, [('GET', caminho, None)] * iteracoes)
+    executar('login', 'POST', '/api/login', [
+        ('POST', '/api/login', {'username': ctx['usuario'], 'password': ctx['senha']})
+    ] * iteracoes)
+
+    # Cadastros: áreas e colaboradores novos, com uma meta e uma observação cada
+    areas = ids(executar('create_area', 'POST', '/api/areas', [
+        ('POST', '/api/areas', {'nome': f'{prefixo} Área {indice}'}) for indice in range(iteracoes)
+    ]))
+    executar('update_area', 'PUT', '/api/areas/<id>', [
+        ('PUT', f'/api/areas/{id}', {'nome': f'{prefixo} Área {indice} (editada)'}) for indice, id in enumerate(areas)
+    ])
+    colaboradores = ids(executar('create_colaborador', 'POST', '/api/colaboradores', [
+        ('POST', '/api/colaboradores', {'nome': f'{prefixo} Colaborador {indice}'}) for indice in range(iteracoes)
+    ]))
+    executar('update_colaborador', 'PUT', '/api/colaboradores/<id>', [
+        ('PUT', f'/api/colaboradores/{id}', {'nome': f'{prefixo} Colaborador {indice} (editado)'})
+        for indice, id in enumerate(colaboradores)
+    ])
+    metas = ids(executar('create_meta', 'POST', '/api/metas', [
+        ('POST', '/api/metas', {
+            'nome': f'{prefixo} Meta {indice}', 'area_id': area_id, 'meta_quantidade': 100, 'valor_unitario': 50.0
+        })
+        for indice, area_id in enumerate(areas)
+    ]))
+    executar('update_meta', 'PUT', '/api/metas/<id>', [
+        ('PUT', f'/api/metas/{id}', {'meta_quantidade': 120}) for id in metas
+    ])
+    observacoes = ids(executar('create_observacao', 'POST', '/api/observacoes', [
+        ('POST', '/api/observacoes', {
+            'colaborador_id': colaborador_id, 'data': _data_benchmark(0), 'tipo_observacao': 'outros',
+            'descricao': f'{prefixo} observação'
+        })
+        for colaborador_id in colaboradores
+    ]))
+    executar('update_observacao', 'PUT', '/api/observacoes/<id>', [
+        ('PUT', f'/api/observacoes/{id}', {'descricao': f'{prefixo} observação editada'}) for id in observacoes
+    ])
+
+    # Lançamentos individuais, na área e no colaborador reais escolhidos
+    criados = ids(executar('create_lancamento', 'POST', '/api/lancamentos', [
+        ('POST', '/api/lancamentos', _lancamento_benchmark(ctx, indice)) for indice in range(iteracoes)
+    ]))
+    executar('update_lancamento', 'PUT', '/api/lancamentos/<id>', [
+        ('PUT', f'/api/lancamentos/{id}', {'quantidade_realizada': 200 + indice % 50}) for indice, id in enumerate(criados)
+    ])
+    executar('delete_lancamento', 'DELETE', '/api/lancamentos/<id>', [
+        ('DELETE', f'/api/lancamentos/{id}', None) for id in criados
+    ])
+
+    # Lançamentos em lote: um bloco de TAMANHO_LOTE dias por requisição, na área e no colaborador novos
+    if areas and colaboradores:
+        blocos = [
+            (_data_benchmark(indice * TAMANHO_LOTE), _data_benchmark((indice + 1) * TAMANHO_LOTE - 1))
+            for indice in range(iteracoes)
+        ]
+        executar('create_lancamentos_bulk', 'POST', '/api/lancamentos/bulk', [
+            ('POST', '/api/lancamentos/bulk', [
+                {
+                    'data': _data_benchmark(indice * TAMANHO_LOTE + dia), 'area_id': areas[0],
+                    'colaborador_id': colaboradores[0], 'quantidade_realizada': 100 + dia
+                }
+                for dia in range(TAMANHO_LOTE)
+            ])
+            for indice in range(iteracoes)
+        ])
+        executar('update_lancamentos_lote', 'PATCH', '/api/lancamentos', [
+            ('PATCH', '/api/lancamentos', {
+                'filtro': {'data_inicio': inicio, 'data_fim': fim, 'area_id': areas[0]},
+                'alteracoes': {'quantidade_realizada': 150}
+            })
+            for inicio, fim in blocos
+        ])
+        executar('delete_lancamentos_lote', 'DELETE', '/api/lancamentos', [
+            ('DELETE', '/api/lancamentos', {'filtro': {'data_inicio': inicio, 'data_fim': fim, 'area_id': areas[0]}})
+            for inicio, fim in blocos
+        ])
+    if areas:
+        executar('recalcular_metas', 'POST', '/api/metas/recalcular', [
+            ('POST', '/api/metas/recalcular', {'area_id': areas[0], 'dry_run': True})
+        ] * iteracoes)
+
+    # Exclusões, na ordem exigida pelas verificações de vínculo
+    executar('delete_observacao', 'DELETE', '/api/observacoes/<id>', [
+        ('DELETE', f'/api/observacoes/{id}', None) for id in observacoes
+    ])
+    executar('delete_meta', 'DELETE', '/api/metas/<id>', [('DELETE', f'/api/metas/{id}', None) for id in metas])
+    executar('delete_colaborador', 'DELETE', '/api/colaboradores/<id>', [
+        ('DELETE', f'/api/colaboradores/{id}', None) for id in colaboradores
+    ])
+    executar('delete_area', 'DELETE', '/api/areas/<id>', [('DELETE', f'/api/areas/{id}', None) for id in areas])
+
+    # Jobs: a primeira requisição cria o job, as seguintes reaproveitam o mesmo
+    periodo = f"data_inicio={ctx['data_inicio'].isoformat()}&data_fim={ctx['data_fim'].isoformat()}"
+    caminho_async = f'/api/lancamentos/export?format=csv&async=1&{periodo}'
+    jobs = ids(executar('export_lancamentos_async', 'GET', caminho_async, [('GET', caminho_async, None)] * iteracoes))
+    if jobs:
+        # Aguarda o job terminar antes de medir a consulta e o download do resultado
+        limite = time.monotonic() + 60
+        while time.monotonic() < limite:
+            _, respostas = medir([('GET', f'/api/jobs/{jobs[0]}', None)])
+            if corpo_json(respostas[0]).get('status') in ('concluido', 'erro'):
+                break
+            time.sleep(0.1)
+        executar('get_job', 'GET', '/api/jobs/<id>', [('GET', f'/api/jobs/{jobs[0]}', None)] * iteracoes)
+        executar('get_job_resultado', 'GET', '/api/jobs/<id>/resultado', [
+            ('GET', f'/api/jobs/{jobs[0]}/resultado', None)
+        ] * iteracoes)
+
+    if ctx['competencia_fechada']:
+        executar('create_fechamento', 'POST', '/api/fechamentos', [
+            ('POST', '/api/fechamentos', {'competencia': ctx['competencia_fechada']})
+        ] * iteracoes)
+    return resultados
+
+def executar_test_client(app, ctx, iteracoes):
+    """Mede todas as rotas pelo test client, com a contagem de consultas SQL"""
+    cliente = app.test_client()
+    resposta = cliente.post('/api/login', json={'username': ctx['usuario'], 'password': ctx['senha']})
+    if resposta.status_code != 200:
+        raise RuntimeError(f'Falha no login do benchmark: {resposta.get_json()}')
+
+    rotas = _cenario(
+        ctx, iteracoes,
+        lambda requisicoes: _medir_test_client(app, cliente, requisicoes),
+        lambda resposta: _corpo_json(resposta.get_data())
+    )
+    return {'rotas': rotas, 'pico_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+# Executado em um processo novo: tempos de importação e de create_app()
+_SCRIPT_INICIALIZACAO = '''
+import json, time
+inicio = time.perf_counter()
+from src.main import create_app
+importado = time.perf_counter()
+create_app()
+fim = time.perf_counter()
+print(json.dumps({'importacao_ms': (importado - inicio) * 1000, 'create_app_ms': (fim - importado) * 1000}))
+'''
+
+def executar_inicializacao(repeticoes):
+    """Tempo de inicialização a frio, cada repetição em um novo interpretador"""
+    medidas = {'importacao_ms': [], 'create_app_ms': [], 'processo_ms': []}
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = subprocess.run(
+            [sys.executable, '-c', _SCRIPT_INICIALIZACAO], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+        medidas['processo_ms'].append((time.perf_counter() - inicio) * 1000)
+        for chave, valor in json.loads(saida.strip().splitlines()[-1]).items():
+            medidas[chave].append(valor)
+    return {
+        chave: {
+            'p50_ms': round(float(np.percentile(valores, 50)), 3),
+            'min_ms': round(float(np.min(valores)), 3),
+            'max_ms': round(float(np.max(valores)), 3)
+        }
+        for chave, valores in medidas.items()
+    }
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _pico_rss_kb(pid):
+    """VmHWM (pico de memória residente) do processo, em KB"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _filhos(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as filhos:
+            return [int(filho) for filho in filhos.read().split()]
+    except OSError:
+        return []
+
+def executar_gunicorn(ctx, iteracoes, workers):
+    """Mede todas as rotas por HTTP em um gunicorn local (sem contagem de consultas)"""
+    porta = _porta_livre()
+    base_url = f'http://127.0.0.1:{porta}'
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', '--preload', '-w', str(workers), '-b', f'127.0.0.1:{porta}',
+            'src.main:create_app()'
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        limite = time.monotonic() + 30
+        while True:
+            try:
+                login = urllib.request.Request(
+                    base_url + '/api/login', method='POST', headers={'Content-Type': 'application/json'},
+                    data=json.dumps({'username': ctx['usuario'], 'password': ctx['senha']}).encode()
+                )
+                opener.open(login).read()
+                inicializacao_ms = (time.perf_counter() - inicio) * 1000
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if processo.poll() is not None or time.monotonic() > limite:
+                    raise RuntimeError('gunicorn não iniciou')
+                time.sleep(0.2)
+
+        rotas = _cenario(
+            ctx, iteracoes,
+            lambda requisicoes: _medir_http(opener, base_url, requisicoes),
+            _corpo_json
+        )
+        pico = {'master': _pico_rss_kb(processo.pid)}
+        pico['workers'] = [_pico_rss_kb(filho) for filho in _filhos(processo.pid)]
+        return {
+            'rotas': rotas, 'pico_rss_kb': pico, 'workers': workers,
+            'inicializacao_ms': round(inicializacao_ms, 3)
+        }
+    finally:
+        processo.terminate()
+        processo.wait(timeout=30)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark das rotas da API')
+    parser.add_argument('--iteracoes', type=int, default=20, help='Requisições por rota')
+    parser.add_argument('--gunicorn', action='store_true', help='Mede também por HTTP em um gunicorn local')
+    parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn')
+    parser.add_argument('--inicializacoes', type=int, default=5, help='Medições da inicialização a frio (0 desativa)')
+    parser.add_argument('--saida', default='benchmark.json', help='Arquivo JSON de resultado')
+    args = parser.parse_args(argv)
+
+    from src.main import create_app
+
+    app = create_app()
+    ctx = _preparar(app)
+    try:
+        resultado = {
+            'commit': _commit_atual(),
+            'executado_em': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'iteracoes': args.iteracoes,
+            'dados': ctx['dados'],
+            'periodo': {'data_inicio': ctx['data_inicio'].isoformat(), 'data_fim': ctx['data_fim'].isoformat()},
+            'test_client': executar_test_client(app, ctx, args.iteracoes)
+        }
+        if args.gunicorn:
+            resultado['gunicorn'] = executar_gunicorn(ctx, args.iteracoes, args.workers)
+    finally:
+        _remover_usuario(app, ctx['usuario'])
+    if args.inicializacoes:
+        resultado['inicializacao'] = executar_inicializacao(args.inicializacoes)
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2, sort_keys=True, ensure_ascii=False)
+
+    for modo in ('test_client', 'gunicorn'):
+        if modo not in resultado:
+            continue
+        print(f'\n{modo}')
+        for nome, estatisticas in sorted(resultado[modo]['rotas'].items()):
+            queries = estatisticas.get('queries_por_requisicao')
+            print(
+                f"  {nome:34} p50 {estatisticas['p50_ms']:9.2f} ms  p90 {estatisticas['p90_ms']:9.2f} ms  "
+                f"p99 {estatisticas['p99_ms']:9.2f} ms" + (f'  {queries:6.1f} queries' if queries is not None else '')
+            )
+    if 'inicializacao' in resultado:
+        print('\ninicializacao')
+        for nome, estatisticas in sorted(resultado['inicializacao'].items()):
+            print(f"  {nome:34} p50 {estatisticas['p50_ms']:9.2f} ms  min {estatisticas['min_ms']:9.2f} ms")
+    if 'gunicorn' in resultado:
+        print(f"  {'gunicorn_ate_primeira_resposta':34} {resultado['gunicorn']['inicializacao_ms']:9.2f} ms")
+    print(f'\nResultado gravado em {args.saida}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import re
+import sqlalchemy as sa
+from src.models.models import db, ObservacoesColaborador
+
+# Busca textual nas descrições das observações.
+#
+# No SQLite a tabela virtual FTS5 observacoes_fts (migração 6) indexa a coluna
+# descricao de observacoes_colaborador e é mantida por triggers; o tokenizador
+# unicode61 com remove_diacritics ignora acentos e maiúsculas ("manutencao"
+# encontra "Manutenção"). Os resultados são ordenados por relevância (bm25). Em
+# outros bancos a busca cai para ILIKE em cada termo, ordenada por data.
+
+TABELA_FTS = 'observacoes_fts'
+
+_TERMOS = re.compile(r'\w+', re.UNICODE)
+
+def termos_busca(texto):
+    """Palavras do texto de busca (pontuação e operadores do FTS5 são descartados)"""
+    return _TERMOS.findall(texto or '')
+
+def expressao_fts(termos):
+    """Expressão MATCH do FTS5: todos os termos, cada um como prefixo"""
+    return ' '.join(f'"{termo}"*' for termo in termos)
+
+def padrao_like(termo):
+    """Padrão LIKE com o termo em qualquer posição e os curingas (%, _) escapados"""
+    escapado = termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escapado}%'
+
+def _filtrar_like(query, termos):
+    # _ é caractere de palavra (\w) e também curinga do LIKE
+    for termo in termos:
+        query = query.filter(ObservacoesColaborador.descricao.ilike(padrao_like(termo), escape='\\'))
+    return query.add_columns(
+        sa.null().label('relevancia'),
+        ObservacoesColaborador.descricao.label('trecho')
+    ).order_by(ObservacoesColaborador.data.desc(), ObservacoesColaborador.id.desc())
+
+def filtrar_busca(query, texto):
+    """Aplica a busca à query de observações, com as colunas relevancia e trecho
+
+    Retorna a query ordenada por relevância, ou None se o texto não tiver termos.
+    """
+    termos = termos_busca(texto)
+    if not termos:
+        return None
+
+    if db.session.get_bind().dialect.name == 'sqlite':
+        fts = sa.table(TABELA_FTS, sa.column('rowid'), sa.column('rank'))
+        tabela = sa.literal_column(TABELA_FTS)
+        return query.join(
+            fts, fts.c.rowid == ObservacoesColaborador.id
+        ).filter(
+            tabela.op('MATCH')(expressao_fts(termos))
+        ).add_columns(
+            (-fts.c.rank).label('relevancia'),
+            sa.func.snippet(tabela, 0, '[', ']', '…', 12).label('trecho')
+        ).order_by(fts.c.rank, ObservacoesColaborador.id.desc())
+
+    return _filtrar_like(query, termos)
@@ -0,0 +1,17 @@
+def calcular_saldo_valor(quantidade_realizada, meta_quantidade, valor_unitario):
+    """Calcula saldo e valor a receber de um lançamento em relação à meta
+
+    Retorna a tupla (saldo, valor_receber). Uma meta com quantidade menor ou igual
+    a zero (não aceita pelas rotas de metas) é tratada como ausência de meta.
+    """
+    if meta_quantidade <= 0:
+        return 0, 0
+    saldo = quantidade_realizada - meta_quantidade
+    # Calcular valor proporcional
+    if quantidade_realizada >= meta_quantidade:
+        # Atingiu a meta: valor base + proporcional ao excesso
+        valor_receber = valor_unitario + (saldo * (valor_unitario / meta_quantidade))
+    else:
+        # Não atingiu a meta: valor proporcional
+        valor_receber = (quantidade_realizada / meta_quantidade) * valor_unitario
+    return saldo, valor_receber
@@ -1,12 +1,19 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required
+from datetime import datetime
 from src.models.models import db, Colaboradores
 from src.utils.decorators import can_manage_colaboradores
+from src.utils.db_profile import read_only
+from src.utils.versoes import versoes_tabelas, conditional_get
+from src.utils.ausencias import indice_ausencias
+from src.utils.contadores import versao_contadores
 
 colaboradores_bp = Blueprint('colaboradores', __name__)
 
 @colaboradores_bp.route('/colaboradores', methods=['GET'])
 @login_required
+@read_only
+@conditional_get('colaboradores', versao_contadores(Colaboradores))
 def get_colaboradores():
     """Listar todos os colaboradores"""
     try:
@@ -15,6 +22,40 @@ def get_colaboradores():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@colaboradores_bp.route('/colaboradores/presentes', methods=['GET'])
+@login_required
+@read_only
+def get_colaboradores_presentes():
+    """Colaboradores presentes e ausentes (férias, falta, atestado ou licença) em uma data"""
+    try:
+        data = request.args.get('data')
+        if not data:
+            return jsonify({'error': 'data é obrigatória'}), 400
+        
+        try:
+            data_consulta = datetime.strptime(data, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+        
+        ausentes = indice_ausencias.ausentes(data_consulta)
+        presentes = []
+        lista_ausentes = []
+        for colaborador in Colaboradores.query.order_by(Colaboradores.nome).all():
+            ausencia = ausentes.get(colaborador.id)
+            if ausencia is None:
+                presentes.append(colaborador.to_dict())
+            else:
+                lista_ausentes.append(dict(
+                    colaborador.to_dict(),
+                    tipo_observacao=ausencia.tipo_observacao,
+                    data_inicio=ausencia.data_inicio.isoformat(),
+                    data_fim=ausencia.data_fim.isoformat()
+                ))
+        
+        return jsonify({'data': data_consulta.isoformat(), 'presentes': presentes, 'ausentes': lista_ausentes}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @colaboradores_bp.route('/colaboradores', methods=['POST'])
 @can_manage_colaboradores
 def create_colaborador():
@@ -32,6 +73,7 @@ def create_colaborador():
         
         colaborador = Colaboradores(nome=data['nome'])
         db.session.add(colaborador)
+        versoes_tabelas.incrementar('colaboradores')
         db.session.commit()
         
         return jsonify(colaborador.to_dict()), 201
@@ -66,6 +108,7 @@ def update_colaborador(colaborador_id):
             return jsonify({'error': 'Já existe um colaborador com esse nome'}), 400
         
         colaborador.nome = data['nome']
+        versoes_tabelas.incrementar('colaboradores')
         db.session.commit()
         
         return jsonify(colaborador.to_dict()), 200
@@ -81,10 +124,11 @@ def delete_colaborador(colaborador_id):
         colaborador = Colaboradores.query.get_or_404(colaborador_id)
         
         # Verificar se existem lançamentos ou observações associados
-        if colaborador.lancamentos or colaborador.observacoes:
+        if colaborador.total_lancamentos or colaborador.total_observacoes:
             return jsonify({'error': 'Não é possível deletar colaborador que possui lançamentos ou observações associados'}), 400
         
         db.session.delete(colaborador)
+        versoes_tabelas.incrementar('colaboradores')
         db.session.commit()
         
         return jsonify({'message': 'Colaborador deletado com sucesso'}), 200
@@ -0,0 +1,81 @@
+from collections import Counter
+from sqlalchemy import bindparam, func, select
+from src.models.models import db, AreasProducao, Colaboradores, Metas, LancamentosProducao, ObservacoesColaborador
+from src.utils.versoes import versoes_tabelas
+
+# Contadores de relacionamentos mantidos nas próprias tabelas de referência.
+#
+# areas_producao guarda total_metas e total_lancamentos; colaboradores guarda
+# total_lancamentos e total_observacoes. As escritas ajustam os contadores na mesma
+# transação da alteração, com UPDATE coluna = coluna + delta: os lançamentos pelo
+# producao_diaria.substituir() (caminho de todas as escritas de lançamentos), as
+# metas e observações pelas rotas, pelo importador e pelo gerador. Com isso a
+# verificação antes de excluir uma área ou um colaborador e os totais das
+# listagens não precisam carregar os registros relacionados.
+#
+# Cada ajuste incrementa a versão '<tabela>.contadores' (e não a da própria
+# tabela), usada pelo GET condicional das listagens de áreas e colaboradores. Como
+# os totais fazem parte do corpo dessas listagens, toda inclusão ou exclusão de
+# lançamento (e de meta ou observação) muda o ETag de /api/areas e
+# /api/colaboradores; só as edições que não mudam área, colaborador ou a
+# existência do lançamento (quantidade, recálculo) os mantêm válidos. É o custo de
+# mostrar os totais sem contagem por requisição: as listagens são pequenas e o 304
+# continua valendo entre escritas. As demais listagens que dependem de
+# areas_producao não são afetadas, porque só a versão dos contadores muda.
+
+# (model, coluna contadora, model relacionado, chave estrangeira)
+CONTADORES = (
+    (AreasProducao, 'total_metas', Metas, 'area_id'),
+    (AreasProducao, 'total_lancamentos', LancamentosProducao, 'area_id'),
+    (Colaboradores, 'total_lancamentos', LancamentosProducao, 'colaborador_id'),
+    (Colaboradores, 'total_observacoes', ObservacoesColaborador, 'colaborador_id'),
+)
+
+def _deltas(anteriores, novos):
+    deltas = Counter(novos)
+    deltas.subtract(anteriores)
+    return deltas
+
+def versao_contadores(model):
+    """Nome da versão dos contadores da tabela, para versoes_tabelas e @conditional_get"""
+    return f'{model.__tablename__}.contadores'
+
+def ajustar(model, coluna, deltas):
+    """Soma os deltas {id: delta} à coluna contadora e incrementa a versão dos contadores (sem commit)"""
+    deltas = {id: delta for id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    tabela = model.__table__
+    db.session.execute(
+        tabela.update().where(tabela.c.id == bindparam('b_id')).values({coluna: tabela.c[coluna] + bindparam('b_delta')}),
+        [{'b_id': id, 'b_delta': delta} for id, delta in deltas.items()]
+    )
+    versoes_tabelas.incrementar(versao_contadores(model))
+
+def lancamentos(anteriores, novas):
+    """Ajusta total_lancamentos a partir das linhas (data, area_id, colaborador_id, ...) dos consolidados"""
+    ajustar(AreasProducao, 'total_lancamentos', _deltas((l[1] for l in anteriores), (l[1] for l in novas)))
+    ajustar(Colaboradores, 'total_lancamentos', _deltas((l[2] for l in anteriores), (l[2] for l in novas)))
+
+def metas(anteriores=(), novas=()):
+    """Ajusta total_metas: area_id das metas removidas (ou antes da alteração) e das novas"""
+    ajustar(AreasProducao, 'total_metas', _deltas(anteriores, novas))
+
+def observacoes(anteriores=(), novas=()):
+    """Ajusta total_observacoes: colaborador_id das observações removidas (ou antes da alteração) e das novas"""
+    ajustar(Colaboradores, 'total_observacoes', _deltas(anteriores, novas))
+
+def reconstruir(conn=None):
+    """Recalcula todos os contadores a partir das tabelas relacionadas
+
+    Aceita uma conexão (usada pelas migrações); por padrão usa a sessão atual.
+    """
+    conn = conn if conn is not None else db.session
+    for model, coluna, relacionado, chave in CONTADORES:
+        tabela = model.__table__
+        conn.execute(tabela.update().values({
+            coluna: select(func.count()).where(getattr(relacionado, chave) == tabela.c.id).scalar_subquery()
+        }))
+    if conn is db.session:
+        versoes_tabelas.incrementar(versao_contadores(AreasProducao), versao_contadores(Colaboradores))
@@ -0,0 +1,192 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required
+from datetime import date, datetime, timedelta
+import threading
+from sqlalchemy import func
+from src.models.models import (
+    db, AreasProducao, Colaboradores, Metas, LancamentosProducao, ObservacoesColaborador,
+    ProducaoDiariaArea, ProducaoDiariaColaborador
+)
+from src.utils.db_profile import read_only
+from src.utils.meta_resolver import meta_resolver
+from src.utils.serializers import lancamentos_query, lancamento_row_to_dict
+from src.utils.versoes import versoes_tabelas
+
+# Resumo do dashboard em uma única resposta, calculado a partir dos consolidados
+# diários com poucas consultas agrupadas e guardado em cache em cada worker. Cada
+# resumo guarda as versões (versoes_tabelas) das tabelas de que depende e é
+# recalculado quando alguma muda, de modo que os workers mostram os mesmos números
+# assim que releem as versões.
+
+TABELAS_RESUMO = (
+    AreasProducao.__tablename__, Colaboradores.__tablename__, Metas.__tablename__,
+    LancamentosProducao.__tablename__, ObservacoesColaborador.__tablename__
+)
+TOP_PRODUTORES = 5
+LANCAMENTOS_RECENTES = 5
+DIAS_OBSERVACOES = 30
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def limpar_cache():
+    """Descarta os resumos guardados"""
+    with _cache_lock:
+        _cache.clear()
+
+def _atingimento(quantidade, esperado):
+    if not esperado:
+        return None
+    return round(quantidade * 100.0 / esperado, 2)
+
+def _totais_por_area(hoje):
+    """Totais do dia e do mês por área, com o percentual de atingimento da meta"""
+    inicio_mes = hoje.replace(day=1)
+    areas = {
+        area_id: {
+            'area_id': area_id,
+            'area_nome': nome,
+            'hoje': {'lancamentos': 0, 'quantidade': 0, 'valor': 0.0, 'meta_esperada': 0},
+            'mes': {'lancamentos': 0, 'quantidade': 0, 'valor': 0.0, 'meta_esperada': 0}
+        }
+        for area_id, nome in db.session.query(AreasProducao.id, AreasProducao.nome).order_by(AreasProducao.nome)
+    }
+
+    dias = db.session.query(
+        ProducaoDiariaArea.area_id,
+        ProducaoDiariaArea.data,
+        ProducaoDiariaArea.quantidade_lancamentos,
+        ProducaoDiariaArea.soma_quantidade,
+        ProducaoDiariaArea.soma_valor
+    ).filter(
+        ProducaoDiariaArea.data >= inicio_mes,
+        ProducaoDiariaArea.data <= hoje
+    )
+    for area_id, data, lancamentos, quantidade, valor in dias:
+        area = areas.get(area_id)
+        if area is None:
+            continue
+        # Meta esperada: meta diária vigente em cada dia vezes o número de lançamentos
+        meta = meta_resolver.resolver(area_id, data)
+        esperado = meta.meta_quantidade * lancamentos if meta else 0
+        periodos = (area['mes'], area['hoje']) if data == hoje else (area['mes'],)
+        for periodo in periodos:
+            periodo['lancamentos'] += lancamentos
+            periodo['quantidade'] += quantidade
+            periodo['valor'] += valor
+            periodo['meta_esperada'] += esperado
+
+    for area in areas.values():
+        meta = meta_resolver.resolver(area['area_id'], hoje)
+        area['meta_quantidade'] = meta.meta_quantidade if meta else None
+        for periodo in (area['hoje'], area['mes']):
+            periodo['atingimento'] = _atingimento(periodo['quantidade'], periodo['meta_esperada'])
+    return list(areas.values())
+
+def _top_produtores(hoje):
+    """Colaboradores com maior produção no mês"""
+    total_quantidade = func.sum(ProducaoDiariaColaborador.soma_quantidade)
+    resultados = db.session.query(
+        Colaboradores.id,
+        Colaboradores.nome,
+        total_quantidade.label('quantidade'),
+        func.sum(ProducaoDiariaColaborador.soma_valor).label('valor')
+    ).join(
+        ProducaoDiariaColaborador, ProducaoDiariaColaborador.colaborador_id == Colaboradores.id
+    ).filter(
+        ProducaoDiariaColaborador.data >= hoje.replace(day=1),
+        ProducaoDiariaColaborador.data <= hoje
+    ).group_by(
+        Colaboradores.id, Colaboradores.nome
+    ).order_by(
+        total_quantidade.desc(), Colaboradores.nome
+    ).limit(TOP_PRODUTORES).all()
+    return [
+        {
+            'colaborador_id': resultado.id,
+            'colaborador_nome': resultado.nome,
+            'quantidade': resultado.quantidade or 0,
+            'valor': float(resultado.valor or 0)
+        }
+        for resultado in resultados
+    ]
+
+def _observacoes_recentes(hoje):
+    """Quantidade de observações por tipo nos últimos DIAS_OBSERVACOES dias"""
+    inicio = hoje - timedelta(days=DIAS_OBSERVACOES - 1)
+    por_tipo = dict(
+        db.session.query(
+            ObservacoesColaborador.tipo_observacao, func.count(ObservacoesColaborador.id)
+        ).filter(
+            ObservacoesColaborador.data >= inicio,
+            ObservacoesColaborador.data <= hoje
+        ).group_by(ObservacoesColaborador.tipo_observacao)
+    )
+    return {
+        'data_inicio': inicio.isoformat(),
+        'data_fim': hoje.isoformat(),
+        'total': sum(por_tipo.values()),
+        'por_tipo': por_tipo
+    }
+
+def _totais():
+    """Contagens gerais em uma única consulta"""
+    resultado = db.session.query(
+        db.session.query(func.count(AreasProducao.id)).scalar_subquery().label('areas'),
+        db.session.query(func.count(Colaboradores.id)).scalar_subquery().label('colaboradores'),
+        db.session.query(func.count(Metas.id)).scalar_subquery().label('metas'),
+        db.session.query(
+            func.coalesce(func.sum(ProducaoDiariaArea.quantidade_lancamentos), 0)
+        ).scalar_subquery().label('lancamentos')
+    ).one()
+    return {
+        'areas': resultado.areas,
+        'colaboradores': resultado.colaboradores,
+        'metas': resultado.metas,
+        'lancamentos': resultado.lancamentos
+    }
+
+def calcular_resumo(hoje):
+    """Resumo do dashboard para a data de referência informada"""
+    recentes = lancamentos_query().order_by(
+        LancamentosProducao.data.desc(), LancamentosProducao.id.desc()
+    ).limit(LANCAMENTOS_RECENTES).all()
+    return {
+        'data': hoje.isoformat(),
+        'totais': _totais(),
+        'areas': _totais_por_area(hoje),
+        'top_produtores': _top_produtores(hoje),
+        'observacoes_recentes': _observacoes_recentes(hoje),
+        'lancamentos_recentes': [lancamento_row_to_dict(row) for row in recentes]
+    }
+
+@dashboard_bp.route('/dashboard/summary', methods=['GET'])
+@login_required
+@read_only
+def get_dashboard_summary():
+    """Resumo do dashboard: totais do dia e do mês por área, maiores produtores e observações recentes"""
+    try:
+        data_param = request.args.get('data')
+        if data_param:
+            try:
+                hoje = datetime.strptime(data_param, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+        else:
+            hoje = date.today()
+        
+        versao = versoes_tabelas.versoes(TABELAS_RESUMO)
+        entrada = _cache.get(hoje)
+        if entrada is not None and entrada[0] == versao:
+            return jsonify(entrada[1]), 200
+        
+        resumo = calcular_resumo(hoje)
+        with _cache_lock:
+            if len(_cache) > 32:
+                _cache.clear()
+            _cache[hoje] = (versao, resumo)
+        return jsonify(resumo), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,103 @@
+import os
+from functools import wraps
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+
+# Perfil de banco de dados.
+#
+# A URL vem da configuração passada a create_app (SQLALCHEMY_DATABASE_URI) ou, sem
+# ela, de DATABASE_URL (padrão: SQLite em src/database/app.db); qualquer URL
+# suportada pelo SQLAlchemy funciona, por exemplo postgresql://... Em SQLite cada
+# conexão recebe os PRAGMAs de SQLITE_PRAGMAS (WAL, busy_timeout etc.), o que evita
+# "database is locked" com vários workers do gunicorn.
+#
+# Rotas marcadas com @read_only executam SELECTs em um engine de leitura separado
+# (DATABASE_READ_URL na configuração ou no ambiente, por exemplo uma réplica;
+# padrão: o mesmo banco, com conexões em query_only), enquanto escritas sempre
+# usam o engine principal.
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456
+}
+
+def _pragmas_config(app):
+    pragmas = dict(SQLITE_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    return pragmas
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def _engine_options(url, pragmas):
+    if url.get_backend_name() == 'sqlite':
+        # O timeout do driver também aguarda o lock (em segundos)
+        return {'connect_args': {'timeout': pragmas['busy_timeout'] / 1000}}
+    return {
+        'pool_pre_ping': True,
+        'pool_size': int(os.environ.get('DATABASE_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DATABASE_MAX_OVERFLOW', 10))
+    }
+
+def aplicar_pragmas(engine, pragmas, somente_leitura=False):
+    """Executa os PRAGMAs em cada nova conexão SQLite do engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @sa.event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f'PRAGMA {nome}={valor}')
+            if somente_leitura:
+                cursor.execute('PRAGMA query_only=ON')
+        finally:
+            cursor.close()
+
+def configurar_banco(app, db, default_url):
+    """Configura URL, opções de engine, PRAGMAs e engine de leitura, e inicializa db"""
+    # A configuração explícita tem precedência sobre o ambiente
+    url = sa.make_url(app.config.get('SQLALCHEMY_DATABASE_URI') or os.environ.get('DATABASE_URL') or default_url)
+    pragmas = _pragmas_config(app)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = url.render_as_string(hide_password=False)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _engine_options(url, pragmas))
+    db.init_app(app)
+
+    with app.app_context():
+        aplicar_pragmas(db.engine, pragmas)
+
+    # Banco em memória não pode ser compartilhado com um segundo engine
+    leitura = None
+    read_url = app.config.get('DATABASE_READ_URL') or os.environ.get('DATABASE_READ_URL')
+    if read_url or not _is_sqlite_memory(url):
+        read_url = sa.make_url(read_url) if read_url else url
+        leitura = sa.create_engine(read_url, **_engine_options(read_url, pragmas))
+        aplicar_pragmas(leitura, pragmas, somente_leitura=True)
+    app.extensions['db_leitura'] = leitura
+
+def _leitura_ativa():
+    return has_app_context() and g.get('db_read_only', False)
+
+def read_only(f):
+    """Decorator que direciona os SELECTs da rota para o engine de leitura"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+class RoutingSession(Session):
+    """Sessão que envia SELECTs de rotas somente leitura para o engine de leitura"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _leitura_ativa() and isinstance(clause, sa.Select):
+            leitura = current_app.extensions.get('db_leitura')
+            if leitura is not None:
+                return leitura
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -1,6 +1,22 @@
 from functools import wraps
 from flask import jsonify
 from flask_login import current_user, login_required
+from src.models.user import (
+    PERM_MANAGE_METAS, PERM_CREATE_LANCAMENTOS, PERM_MANAGE_AREAS,
+    PERM_MANAGE_COLABORADORES, PERM_MANAGE_OBSERVACOES
+)
+
+def permission_required(permission, message):
+    """Decorator que verifica a máscara de permissões do usuário atual"""
+    def decorator(f):
+        @wraps(f)
+        @login_required
+        def decorated_function(*args, **kwargs):
+            if not current_user.has_permission(permission):
+                return jsonify({'error': message}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
 
 def admin_required(f):
     """Decorator que requer que o usuário seja administrador"""
@@ -14,51 +30,30 @@ def admin_required(f):
 
 def can_manage_metas(f):
     """Decorator que verifica se o usuário pode gerenciar metas"""
-    @wraps(f)
-    @login_required
-    def decorated_function(*args, **kwargs):
-        if not current_user.can_manage_metas():
-            return jsonify({'error': 'Acesso negado. Você não tem permissão para gerenciar metas.'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
+    return permission_required(
+        PERM_MANAGE_METAS, 'Acesso negado. Você não tem permissão para gerenciar metas.'
+    )(f)
 
 def can_create_lancamentos(f):
     """Decorator que verifica se o usuário pode criar lançamentos"""
-    @wraps(f)
-    @login_required
-    def decorated_function(*args, **kwargs):
-        if not current_user.can_create_lancamentos():
-            return jsonify({'error': 'Acesso negado. Você não tem permissão para criar lançamentos.'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
+    return permission_required(
+        PERM_CREATE_LANCAMENTOS, 'Acesso negado. Você não tem permissão para criar lançamentos.'
+    )(f)
 
 def can_manage_areas(f):
     """Decorator que verifica se o usuário pode gerenciar áreas"""
-    @wraps(f)
-    @login_required
-    def decorated_function(*args, **kwargs):
-        if not current_user.can_manage_areas():
-            return jsonify({'error': 'Acesso negado. Você não tem permissão para gerenciar áreas.'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
+    return permission_required(
+        PERM_MANAGE_AREAS, 'Acesso negado. Você não tem permissão para gerenciar áreas.'
+    )(f)
 
 def can_manage_colaboradores(f):
     """Decorator que verifica se o usuário pode gerenciar colaboradores"""
-    @wraps(f)
-    @login_required
-    def decorated_function(*args, **kwargs):
-        if not current_user.can_manage_colaboradores():
-            return jsonify({'error': 'Acesso negado. Você não tem permissão para gerenciar colaboradores.'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
+    return permission_required(
+        PERM_MANAGE_COLABORADORES, 'Acesso negado. Você não tem permissão para gerenciar colaboradores.'
+    )(f)
 
 def can_manage_observacoes(f):
     """Decorator que verifica se o usuário pode gerenciar observações"""
-    @wraps(f)
-    @login_required
-    def decorated_function(*args, **kwargs):
-        if not current_user.can_manage_observacoes():
-            return jsonify({'error': 'Acesso negado. Você não tem permissão para gerenciar observações.'}), 403
-        return f(*args, **kwargs)
-    return decorated_function
-
+    return permission_required(
+        PERM_MANAGE_OBSERVACOES, 'Acesso negado. Você não tem permissão para gerenciar observações.'
+    )(f)
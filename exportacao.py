@@ -0,0 +1,70 @@
+import csv
+import io
+import tempfile
+from flask import Response, stream_with_context
+
+# Exportação em CSV e XLSX como respostas em streaming.
+#
+# As linhas são consumidas de um iterável (normalmente uma query com yield_per),
+# sem montar o resultado inteiro em memória. O CSV é enviado à medida que as
+# linhas são lidas; o XLSX é montado pelo openpyxl em modo write-only (linhas
+# gravadas em arquivo temporário) e então enviado em partes.
+
+CSV_BATCH_ROWS = 500
+XLSX_CHUNK_BYTES = 64 * 1024
+
+FORMATOS = ('csv', 'xlsx')
+
+def _headers(nome_arquivo):
+    return {'Content-Disposition': f'attachment; filename="{nome_arquivo}"'}
+
+def stream_csv(cabecalho, linhas, nome_arquivo):
+    """CSV separado por ponto e vírgula, com BOM UTF-8 para abrir corretamente no Excel"""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';')
+        buffer.write('\ufeff')
+        writer.writerow(cabecalho)
+        for indice, linha in enumerate(linhas, 1):
+            writer.writerow(linha)
+            if indice % CSV_BATCH_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv; charset=utf-8',
+        headers=_headers(f'{nome_arquivo}.csv')
+    )
+
+def stream_xlsx(cabecalho, linhas, nome_arquivo, titulo='Dados'):
+    """Planilha XLSX gerada em modo write-only e enviada em partes"""
+    def generate():
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(title=titulo[:31])
+        worksheet.append(cabecalho)
+        for linha in linhas:
+            worksheet.append(linha)
+
+        with tempfile.TemporaryFile() as arquivo:
+            workbook.save(arquivo)
+            arquivo.seek(0)
+            while True:
+                parte = arquivo.read(XLSX_CHUNK_BYTES)
+                if not parte:
+                    break
+                yield parte
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        headers=_headers(f'{nome_arquivo}.xlsx')
+    )
+
+def stream_export(formato, cabecalho, linhas, nome_arquivo, titulo='Dados'):
+    """Resposta de exportação no formato informado ('csv' ou 'xlsx')"""
+    if formato == 'xlsx':
+        return stream_xlsx(cabecalho, linhas, nome_arquivo, titulo)
+    return stream_csv(cabecalho, linhas, nome_arquivo)
@@ -0,0 +1,204 @@
+import json
+import multiprocessing
+import os
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from src.models.models import (
+    db, Colaboradores, LancamentosProducao, ObservacoesColaborador, FechamentoMensal, FechamentoColaborador
+)
+
+# Fechamento mensal (equivalente à planilha "fechamento"): por colaborador, total
+# produzido, média, valor a receber e observações de férias, falta e treinamento.
+#
+# Os colaboradores são divididos em faixas contíguas de id, calculadas em paralelo
+# por um pool de processos (cada processo abre sua própria conexão). Os processos
+# são iniciados com spawn, nunca com fork: o fechamento roda na thread de um job
+# ou no comando fechar-mes, e um fork do worker (com a thread de escrita e o pool
+# de jobs ativos) copiaria locks possivelmente adquiridos. A quantidade de
+# processos é limitada por FECHAMENTO_MAX_PROCESSOS. O resultado é
+# gravado uma única vez nas tabelas fechamentos_mensais/fechamentos_colaboradores,
+# junto com a resposta JSON já serializada; executar de novo o mesmo mês devolve o
+# fechamento existente, sem recalcular. A leitura de um mês fechado é uma consulta
+# pela chave primária.
+
+# Tipos de observação com coluna própria no fechamento; os demais são somados em outras_observacoes
+COLUNAS_OBSERVACOES = {'férias': 'ferias', 'falta': 'faltas', 'treinamento': 'treinamentos'}
+
+# Quantidade mínima de colaboradores por partição
+MIN_PARTICAO = 50
+
+# Máximo de processos do cálculo (FECHAMENTO_MAX_PROCESSOS sobrescreve)
+DEFAULT_MAX_PROCESSOS = 4
+
+def limitar_processos(processos):
+    """Processos a usar: o pedido (padrão: número de CPUs), entre 1 e FECHAMENTO_MAX_PROCESSOS"""
+    maximo = current_app.config.get('FECHAMENTO_MAX_PROCESSOS', DEFAULT_MAX_PROCESSOS)
+    return max(1, min(processos or os.cpu_count() or 1, maximo))
+
+def periodo_competencia(competencia):
+    """(data_inicio, data_fim) da competência AAAA-MM; ValueError se inválida"""
+    try:
+        inicio = datetime.strptime(competencia, '%Y-%m').date()
+    except (TypeError, ValueError):
+        raise ValueError('Formato de competência inválido. Use YYYY-MM')
+    return inicio, inicio.replace(day=monthrange(inicio.year, inicio.month)[1])
+
+def particoes(colaborador_ids, quantidade):
+    """Divide os ids (ordenados) em até `quantidade` faixas contíguas (primeiro, último)"""
+    if not colaborador_ids:
+        return []
+    tamanho = max(MIN_PARTICAO, -(-len(colaborador_ids) // quantidade))
+    return [
+        (colaborador_ids[inicio], colaborador_ids[min(inicio + tamanho, len(colaborador_ids)) - 1])
+        for inicio in range(0, len(colaborador_ids), tamanho)
+    ]
+
+def calcular(conn, data_inicio, data_fim, primeiro_id, ultimo_id):
+    """Linhas do fechamento dos colaboradores com id entre primeiro_id e ultimo_id"""
+    linhas = {
+        id: {
+            'colaborador_id': id,
+            'colaborador_nome': nome,
+            'quantidade_lancamentos': 0,
+            'total_produzido': 0,
+            'media_producao': 0.0,
+            'valor_receber': 0.0,
+            'ferias': 0,
+            'faltas': 0,
+            'treinamentos': 0,
+            'outras_observacoes': 0
+        }
+        for id, nome in conn.execute(
+            sa.select(Colaboradores.id, Colaboradores.nome).where(Colaboradores.id.between(primeiro_id, ultimo_id))
+        )
+    }
+
+    producao = conn.execute(
+        sa.select(
+            LancamentosProducao.colaborador_id,
+            sa.func.count(LancamentosProducao.id),
+            sa.func.coalesce(sa.func.sum(LancamentosProducao.quantidade_realizada), 0),
+            sa.func.coalesce(sa.func.sum(LancamentosProducao.valor_receber), 0)
+        ).where(
+            LancamentosProducao.colaborador_id.between(primeiro_id, ultimo_id),
+            LancamentosProducao.data >= data_inicio,
+            LancamentosProducao.data <= data_fim
+        ).group_by(LancamentosProducao.colaborador_id)
+    )
+    for colaborador_id, quantidade, total, valor in producao:
+        linha = linhas.get(colaborador_id)
+        if linha is None:
+            continue
+        linha['quantidade_lancamentos'] = quantidade
+        linha['total_produzido'] = int(total)
+        linha['media_producao'] = float(total) / quantidade if quantidade else 0.0
+        linha['valor_receber'] = float(valor)
+
+    # Observações contadas em dias distintos no mês
+    observacoes = conn.execute(
+        sa.select(
+            ObservacoesColaborador.colaborador_id,
+            ObservacoesColaborador.tipo_observacao,
+            sa.func.count(sa.distinct(ObservacoesColaborador.data))
+        ).where(
+            ObservacoesColaborador.colaborador_id.between(primeiro_id, ultimo_id),
+            ObservacoesColaborador.data >= data_inicio,
+            ObservacoesColaborador.data <= data_fim
+        ).group_by(ObservacoesColaborador.colaborador_id, ObservacoesColaborador.tipo_observacao)
+    )
+    for colaborador_id, tipo, dias in observacoes:
+        linha = linhas.get(colaborador_id)
+        if linha is None:
+            continue
+        linha[COLUNAS_OBSERVACOES.get(tipo, 'outras_observacoes')] += dias
+
+    return list(linhas.values())
+
+def _calcular_particao(url, data_inicio, data_fim, primeiro_id, ultimo_id):
+    # Executado em outro processo: usa um engine próprio, nunca o do processo pai
+    engine = sa.create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return calcular(conn, data_inicio, data_fim, primeiro_id, ultimo_id)
+    finally:
+        engine.dispose()
+
+def _calcular_todos(data_inicio, data_fim, processos):
+    colaborador_ids = [id for id, in db.session.query(Colaboradores.id).order_by(Colaboradores.id)]
+    faixas = particoes(colaborador_ids, processos)
+    url = db.engine.url
+    # Banco em memória só existe nesta conexão: calcula no próprio processo
+    em_memoria = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+    if processos <= 1 or len(faixas) <= 1 or em_memoria:
+        conn = db.session.connection()
+        return [linha for faixa in faixas for linha in calcular(conn, data_inicio, data_fim, *faixa)]
+
+    url = url.render_as_string(hide_password=False)
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(processos, len(faixas)), mp_context=contexto) as executor:
+        resultados = executor.map(
+            _calcular_particao,
+            [url] * len(faixas),
+            [data_inicio] * len(faixas),
+            [data_fim] * len(faixas),
+            [primeiro for primeiro, _ in faixas],
+            [ultimo for _, ultimo in faixas]
+        )
+        return [linha for linhas in resultados for linha in linhas]
+
+def obter_fechamento(competencia):
+    """Resposta JSON já serializada do fechamento da competência, ou None se não fechado"""
+    competencia = periodo_competencia(competencia)[0].strftime('%Y-%m')
+    fechamento = db.session.get(FechamentoMensal, competencia)
+    return fechamento.resultado if fechamento is not None else None
+
+def fechar_mes(competencia, processos=None, hoje=None):
+    """Calcula e grava o fechamento da competência AAAA-MM
+
+    Retorna (FechamentoMensal, criado). Se o mês já estiver fechado, devolve o
+    fechamento existente com criado=False, sem recalcular. Faz commit.
+    """
+    data_inicio, data_fim = periodo_competencia(competencia)
+    competencia = data_inicio.strftime('%Y-%m')
+    if data_fim >= (hoje or date.today()):
+        raise ValueError('Só é possível fechar meses já encerrados')
+
+    existente = db.session.get(FechamentoMensal, competencia)
+    if existente is not None:
+        return existente, False
+
+    processos = limitar_processos(processos)
+    linhas = sorted(_calcular_todos(data_inicio, data_fim, processos), key=lambda linha: linha['colaborador_nome'])
+
+    fechamento = FechamentoMensal(
+        competencia=competencia,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        fechado_em=datetime.utcnow(),
+        quantidade_colaboradores=len(linhas),
+        total_produzido=sum(linha['total_produzido'] for linha in linhas),
+        total_valor=sum(linha['valor_receber'] for linha in linhas)
+    )
+    resultado = fechamento.to_dict()
+    resultado['colaboradores'] = linhas
+    fechamento.resultado = json.dumps(resultado, ensure_ascii=False)
+
+    try:
+        db.session.add(fechamento)
+        db.session.flush()
+        if linhas:
+            db.session.execute(
+                db.insert(FechamentoColaborador),
+                [dict(linha, competencia=competencia) for linha in linhas]
+            )
+        db.session.commit()
+    except IntegrityError:
+        # Outro processo fechou o mesmo mês ao mesmo tempo
+        db.session.rollback()
+        return db.session.get(FechamentoMensal, competencia), False
+    return fechamento, True
@@ -0,0 +1,84 @@
+from flask import Blueprint, Response, request, jsonify
+from flask_login import login_required
+from datetime import date
+from src.models.models import db, FechamentoMensal
+from src.utils.decorators import admin_required
+from src.utils.db_profile import read_only
+from src.utils.fechamento import fechar_mes, obter_fechamento, periodo_competencia
+from src.utils.fila_jobs import enfileirar
+
+fechamentos_bp = Blueprint('fechamentos', __name__)
+
+@fechamentos_bp.route('/fechamentos', methods=['GET'])
+@login_required
+@read_only
+def get_fechamentos():
+    """Listar os meses fechados"""
+    try:
+        fechamentos = FechamentoMensal.query.order_by(FechamentoMensal.competencia.desc()).all()
+        return jsonify([fechamento.to_dict() for fechamento in fechamentos]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@fechamentos_bp.route('/fechamentos/<competencia>', methods=['GET'])
+@login_required
+@read_only
+def get_fechamento(competencia):
+    """Obter o fechamento de um mês (AAAA-MM) por colaborador"""
+    try:
+        try:
+            resultado = obter_fechamento(competencia)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if resultado is None:
+            return jsonify({'error': 'Mês ainda não fechado'}), 404
+        
+        return Response(resultado, status=200, mimetype='application/json')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _fechar(competencia, processos):
+    # Executado pelo pool de jobs, fora da requisição
+    fechamento, _ = fechar_mes(competencia, processos=processos)
+    return Response(fechamento.resultado, status=200, mimetype='application/json')
+
+@fechamentos_bp.route('/fechamentos', methods=['POST'])
+@admin_required
+def create_fechamento():
+    """Fechar um mês (apenas administradores)
+
+    O cálculo é executado como job (202 com o id; o resultado fica em
+    /api/jobs/<id>/resultado). Um mês já fechado é devolvido diretamente.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'competencia' not in data:
+            return jsonify({'error': 'competencia é obrigatória'}), 400
+        
+        try:
+            processos = int(data['processos']) if data.get('processos') else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'processos deve ser um número inteiro'}), 400
+        
+        try:
+            data_inicio, data_fim = periodo_competencia(data['competencia'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if data_fim >= date.today():
+            return jsonify({'error': 'Só é possível fechar meses já encerrados'}), 400
+        
+        competencia = data_inicio.strftime('%Y-%m')
+        existente = db.session.get(FechamentoMensal, competencia)
+        if existente is not None:
+            return Response(existente.resultado, status=200, mimetype='application/json')
+        
+        return enfileirar('fechamento-mensal', _fechar, {'competencia': competencia}, {
+            'competencia': competencia,
+            'processos': processos
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,142 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app
+from src.models.models import db
+
+# Escrita agrupada (group commit) dos lançamentos.
+#
+# As rotas de escrita descrevem a alteração como uma função gravar() e chamam
+# executar_escrita(). No modo padrão a função é executada e confirmada na própria
+# requisição, como antes. Com WRITE_BEHIND habilitado, a função vai para uma fila
+# e uma única thread de escrita por processo junta as alterações que chegam em
+# WRITE_BEHIND_WINDOW_MS (até WRITE_BEHIND_MAX_BATCH) e as confirma em um só
+# commit: um fsync e um lock de escrita por lote, em vez de um por requisição.
+# Cada alteração roda em um SAVEPOINT próprio, então um erro (por exemplo o
+# índice único de duplicados) desfaz apenas aquela alteração e é devolvido à
+# requisição que a enviou, pelo seu Future.
+
+DEFAULT_WINDOW_MS = 5
+DEFAULT_MAX_BATCH = 200
+# Tempo máximo que a requisição aguarda o lote ser gravado
+TIMEOUT_SEGUNDOS = 30
+
+# Item que encerra a thread de escrita de uma fila substituída
+_PARAR = None
+
+def _habilitada(app):
+    return bool(app.config.get('WRITE_BEHIND', os.environ.get('WRITE_BEHIND') == '1'))
+
+class FilaEscrita:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fila = None
+        self._pid = None
+        self._app = None
+
+    def enviar(self, app, gravar, serializar):
+        """Enfileira a alteração e devolve o Future com o resultado serializado"""
+        futuro = Future()
+        # Sob o lock: nada é enfileirado em uma fila já encerrada
+        with self._lock:
+            self._obter_fila(app).put((gravar, serializar, futuro))
+        return futuro
+
+    def _obter_fila(self, app):
+        # A thread de escrita é criada sob demanda em cada processo (inclusive após o
+        # fork) e para cada app, pois grava no banco do app com que foi criada. A
+        # thread da fila anterior do mesmo processo termina o que já recebeu e para.
+        if self._fila is None or self._pid != os.getpid() or self._app is not app:
+            if self._fila is not None and self._pid == os.getpid():
+                self._fila.put(_PARAR)
+            self._fila = queue.Queue()
+            self._pid = os.getpid()
+            self._app = app
+            threading.Thread(
+                target=self._executar, args=(app, self._fila), name='fila-escrita', daemon=True
+            ).start()
+        return self._fila
+
+    def _proximo_lote(self, fila, janela, maximo):
+        """Próximo lote da fila e se a thread deve parar depois dele"""
+        item = fila.get()
+        if item is _PARAR:
+            return [], True
+        lote = [item]
+        limite = time.monotonic() + janela
+        while len(lote) < maximo:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                item = fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            if item is _PARAR:
+                return lote, True
+            lote.append(item)
+        return lote, False
+
+    def _executar(self, app, fila):
+        janela = app.config.get('WRITE_BEHIND_WINDOW_MS', DEFAULT_WINDOW_MS) / 1000
+        maximo = app.config.get('WRITE_BEHIND_MAX_BATCH', DEFAULT_MAX_BATCH)
+        while True:
+            lote, parar = self._proximo_lote(fila, janela, maximo)
+            if lote:
+                with app.app_context():
+                    try:
+                        self._gravar_lote(lote)
+                    finally:
+                        db.session.remove()
+            if parar:
+                return
+
+    def _gravar_lote(self, lote):
+        gravados = []
+        try:
+            conexao = db.session.connection()
+            # O pysqlite não abre transação antes de um SAVEPOINT; sem o BEGIN o
+            # primeiro SAVEPOINT seria confirmado sozinho
+            if conexao.dialect.name == 'sqlite' and not conexao.connection.dbapi_connection.in_transaction:
+                conexao.exec_driver_sql('BEGIN IMMEDIATE')
+            for gravar, serializar, futuro in lote:
+                try:
+                    with db.session.begin_nested():
+                        resultado = gravar()
+                    gravados.append((resultado, serializar, futuro))
+                except Exception as e:
+                    futuro.set_exception(e)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for _, _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        for resultado, serializar, futuro in gravados:
+            try:
+                futuro.set_result(serializar(resultado) if serializar else resultado)
+            except Exception as e:
+                futuro.set_exception(e)
+
+fila_escrita = FilaEscrita()
+
+def executar_escrita(gravar, serializar=None):
+    """Executa gravar() e confirma a transação; devolve serializar(resultado)
+
+    gravar altera a sessão sem fazer commit. Com WRITE_BEHIND a alteração é
+    confirmada em lote pela thread de escrita; exceções (inclusive IntegrityError)
+    são relançadas na requisição nos dois modos.
+    """
+    app = current_app._get_current_object()
+    if not _habilitada(app):
+        resultado = gravar()
+        db.session.commit()
+        return serializar(resultado) if serializar else resultado
+    # Devolve a conexão da requisição ao pool enquanto aguarda: com muitas
+    # requisições esperando, a thread de escrita ainda precisa de uma conexão
+    db.session.close()
+    return fila_escrita.enviar(app, gravar, serializar).result(timeout=TIMEOUT_SEGUNDOS)
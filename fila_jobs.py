@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from flask_login import current_user
+from src.models.models import db, Job
+from src.utils.versoes import versoes_tabelas
+
+# Execução em segundo plano dos relatórios e exportações longos.
+#
+# As rotas marcadas com @async_job continuam síncronas; com async=1 a requisição
+# grava um job (tabela jobs) e responde 202 com o id, e a própria view é executada
+# por um pool de threads do processo, em um contexto de requisição com os mesmos
+# parâmetros. Rotas que só executam em segundo plano (o fechamento mensal) chamam
+# enfileirar() diretamente. O corpo gerado é gravado em blocos em um arquivo do
+# diretório de jobs (JOBS_DIR; padrão: <instance>/jobs), cujo caminho fica no job, e
+# é enviado a partir do arquivo em /api/jobs/<id>/resultado: exportações em
+# streaming continuam usando memória constante. A chave do job inclui o usuário e as versões das
+# tabelas de entrada (incrementadas a cada escrita), então um pedido igual do mesmo
+# usuário reaproveita o job existente até que os dados mudem; jobs de outros
+# usuários nunca são devolvidos. Jobs pendentes ou em execução há mais de
+# TIMEOUT_MINUTOS (worker reiniciado, por exemplo) não são reaproveitados.
+
+# Tabelas cujas alterações invalidam os resultados dos relatórios
+TABELAS_ENTRADA = ('lancamentos_producao', 'areas_producao', 'colaboradores', 'metas')
+
+DEFAULT_WORKERS = 2
+TIMEOUT_MINUTOS = 60
+RETENCAO_DIAS = 7
+
+_NOME_ARQUIVO = re.compile(r'filename="([^"]+)"')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _obter_executor(app):
+    # Criado sob demanda em cada processo, depois do fork dos workers
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('JOB_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='job'
+            )
+        return _executor
+
+def _parametros():
+    # Parâmetros repetidos (ex.: periodo) são mantidos como lista
+    return {
+        chave: valores if len(valores) > 1 else valores[0]
+        for chave, valores in sorted(request.args.lists()) if chave != 'async'
+    }
+
+def chave_job(usuario_id, tipo, caminho, parametros, versoes):
+    """Hash do usuário, do tipo, do caminho, dos parâmetros e das versões dos dados de entrada"""
+    conteudo = json.dumps([usuario_id, tipo, caminho, parametros, list(versoes)], sort_keys=True)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def diretorio_jobs(app):
+    """Diretório dos arquivos de resultado dos jobs (criado se não existir)"""
+    diretorio = app.config.get('JOBS_DIR') or os.path.join(app.instance_path, 'jobs')
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+def _apagar_arquivo(caminho):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+
+def remover_jobs(*criterios):
+    """Exclui os jobs que atendem aos critérios e os seus arquivos de resultado (sem commit)"""
+    for arquivo, in db.session.query(Job.arquivo).filter(*criterios, Job.arquivo.isnot(None)):
+        _apagar_arquivo(arquivo)
+    db.session.execute(db.delete(Job).where(*criterios))
+
+def _remover_antigos(agora):
+    remover_jobs(Job.criado_em < agora - timedelta(days=RETENCAO_DIAS))
+
+def _gravar_resultado(app, job_id, response):
+    """Grava o corpo da resposta, bloco a bloco, no arquivo do job; devolve o caminho"""
+    caminho = os.path.join(diretorio_jobs(app), job_id)
+    parcial = caminho + '.parcial'
+    try:
+        with open(parcial, 'wb') as arquivo:
+            for bloco in response.iter_encoded():
+                arquivo.write(bloco)
+        os.replace(parcial, caminho)
+    except BaseException:
+        _apagar_arquivo(parcial)
+        raise
+    finally:
+        response.close()
+    return caminho
+
+def _job_existente(chave, usuario_id, agora):
+    limite = agora - timedelta(minutes=TIMEOUT_MINUTOS)
+    return Job.query.filter(
+        Job.chave == chave,
+        Job.usuario_id == usuario_id,
+        db.or_(Job.status == 'concluido', db.and_(Job.status.in_(['pendente', 'executando']), Job.criado_em >= limite))
+    ).order_by(Job.criado_em.desc()).first()
+
+def _executar(app, job_id, funcao, caminho, parametros, kwargs):
+    with app.test_request_context(caminho, query_string=parametros):
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return
+        job.status = 'executando'
+        job.iniciado_em = datetime.utcnow()
+        db.session.commit()
+
+        try:
+            response = app.make_response(funcao(**kwargs))
+            if response.status_code >= 400:
+                resultado = response.get_data()
+                corpo = response.get_json(silent=True) or {}
+                g.db_read_only = False
+                job.status = 'erro'
+                job.erro = corpo.get('error') or resultado.decode('utf-8', 'replace')
+            else:
+                arquivo = _gravar_resultado(app, job_id, response)
+                # A view pode ter usado o banco de leitura; o job é gravado no principal
+                g.db_read_only = False
+                disposicao = _NOME_ARQUIVO.search(response.headers.get('Content-Disposition', ''))
+                job.status = 'concluido'
+                job.arquivo = arquivo
+                job.mimetype = response.mimetype
+                job.nome_arquivo = disposicao.group(1) if disposicao else None
+        except Exception as e:
+            g.db_read_only = False
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = 'erro'
+            job.erro = str(e)
+        job.concluido_em = datetime.utcnow()
+        db.session.commit()
+
+def enfileirar(tipo, funcao, parametros, kwargs=None):
+    """Grava um job e agenda funcao(**kwargs) no pool de jobs; devolve a resposta 202
+
+    A função é executada em um contexto de requisição com o caminho atual e os
+    parâmetros informados e deve devolver uma resposta do Flask. Um job igual ainda
+    válido (mesma chave) é reaproveitado, com 200 se já estiver concluído.
+    """
+    kwargs = kwargs or {}
+    # Versões lidas do banco, não do cache com TTL
+    versoes_tabelas.carregar()
+    chave = chave_job(current_user.id, tipo, request.path, parametros, versoes_tabelas.versoes(TABELAS_ENTRADA))
+    agora = datetime.utcnow()
+
+    job = _job_existente(chave, current_user.id, agora)
+    if job is not None:
+        return jsonify(job.to_dict()), 200 if job.status == 'concluido' else 202
+
+    _remover_antigos(agora)
+    job = Job(
+        id=uuid.uuid4().hex,
+        tipo=tipo,
+        chave=chave,
+        parametros=json.dumps(dict(parametros, **kwargs), ensure_ascii=False),
+        status='pendente',
+        usuario_id=current_user.id,
+        criado_em=agora
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    _obter_executor(app).submit(_executar, app, job.id, funcao, request.path, parametros, kwargs)
+    return jsonify(job.to_dict()), 202
+
+def async_job(tipo):
+    """Decorator de relatório que aceita async=1 e passa a ser executado como job
+
+    Deve ficar acima de @read_only, para que o job seja gravado no banco principal.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.args.get('async') not in ('1', 'true'):
+                return f(*args, **kwargs)
+
+            try:
+                return enfileirar(tipo, f, _parametros(), kwargs)
+            except Exception as e:
+                db.session.rollback()
+                return jsonify({'error': str(e)}), 500
+        return decorated_function
+    return decorator
@@ -0,0 +1,144 @@
+import random
+from datetime import date, timedelta
+from src.models.models import db, AreasProducao, Colaboradores, Metas, LancamentosProducao, ObservacoesColaborador
+from src.utils import producao_diaria, contadores
+from src.utils.meta_resolver import meta_resolver
+from src.utils.recalculo import recalcular_lancamentos
+from src.utils.versoes import versoes_tabelas
+
+# Geração de dados sintéticos para medir as rotas em escala de produção.
+#
+# Cria áreas, colaboradores e metas com nomes próprios (prefixo do lote, para não
+# colidir com dados existentes), lançamentos de segunda a sábado para cada
+# colaborador em sua área e observações aleatórias; nos dias com observação o
+# colaborador não tem lançamento. Os lançamentos são gravados em blocos pelo
+# caminho normal (consolidados diários incluídos) e saldo/valor_receber são
+# calculados depois, mês a mês, pelo recálculo vetorizado.
+
+CHUNK_SIZE = 5000
+
+TIPOS_OBSERVACAO = ['férias', 'falta', 'treinamento', 'atestado', 'licença', 'outros']
+
+# Probabilidade de um colaborador não ter lançamento em um dia útil sem observação
+PROB_SEM_LANCAMENTO = 0.03
+
+def _inserir(model, registros):
+    db.session.execute(db.insert(model), registros)
+
+def _dias_uteis(data_inicio, data_fim):
+    dia = data_inicio
+    while dia <= data_fim:
+        if dia.weekday() < 6:
+            yield dia
+        dia += timedelta(days=1)
+
+def _meses(data_inicio, data_fim):
+    inicio = data_inicio
+    while inicio <= data_fim:
+        proximo = (inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield inicio, min(proximo - timedelta(days=1), data_fim)
+        inicio = proximo
+
+def gerar_dados(areas=7, colaboradores=100, metas_por_area=2, anos=1, observacoes=12,
+                data_fim=None, semente=42, prefixo='Sintético', chunk_size=CHUNK_SIZE, progresso=None):
+    """Gera o lote de dados e retorna um resumo com as quantidades criadas
+
+    observacoes é a quantidade média de observações por colaborador por ano. Faz
+    commit a cada bloco de lançamentos.
+    """
+    rng = random.Random(semente)
+    data_fim = data_fim or date.today() - timedelta(days=1)
+    data_inicio = data_fim - timedelta(days=int(365 * anos) - 1)
+    resumo = {'areas': areas, 'colaboradores': colaboradores, 'metas': 0, 'lancamentos': 0, 'observacoes': 0}
+
+    _inserir(AreasProducao, [{'nome': f'{prefixo} Área {i:03d}'} for i in range(1, areas + 1)])
+    _inserir(Colaboradores, [{'nome': f'{prefixo} Colaborador {i:05d}'} for i in range(1, colaboradores + 1)])
+    area_ids = [id for id, in db.session.query(AreasProducao.id).filter(
+        AreasProducao.nome.like(f'{prefixo} Área %')).order_by(AreasProducao.id)]
+    colaborador_ids = [id for id, in db.session.query(Colaboradores.id).filter(
+        Colaboradores.nome.like(f'{prefixo} Colaborador %')).order_by(Colaboradores.id)]
+
+    # Metas: a primeira vale desde sempre, as demais passam a valer ao longo do período
+    metas = []
+    meta_base = {}
+    for area_id in area_ids:
+        meta_base[area_id] = rng.choice([160, 200, 250, 280, 320])
+        for indice in range(metas_por_area):
+            vigencia = None if indice == 0 else data_inicio + timedelta(days=rng.randrange((data_fim - data_inicio).days + 1))
+            metas.append({
+                'nome': f'{prefixo} Meta {area_id}-{indice + 1}',
+                'area_id': area_id,
+                'meta_quantidade': meta_base[area_id] + 10 * indice,
+                'valor_unitario': float(rng.choice([150, 200, 250, 300, 350])),
+                'data_vigencia': vigencia
+            })
+    _inserir(Metas, metas)
+    contadores.metas(novas=[meta['area_id'] for meta in metas])
+    resumo['metas'] = len(metas)
+
+    total_dias = (data_fim - data_inicio).days + 1
+    ausencias = set()
+    registros = []
+    for colaborador_id in colaborador_ids:
+        for _ in range(int(observacoes * anos)):
+            data = data_inicio + timedelta(days=rng.randrange(total_dias))
+            if (colaborador_id, data) in ausencias:
+                continue
+            ausencias.add((colaborador_id, data))
+            tipo = rng.choice(TIPOS_OBSERVACAO)
+            registros.append({
+                'colaborador_id': colaborador_id,
+                'data': data,
+                'tipo_observacao': tipo,
+                'descricao': f'{tipo.capitalize()} registrada pelo gerador de dados'
+            })
+    for inicio in range(0, len(registros), chunk_size):
+        _inserir(ObservacoesColaborador, registros[inicio:inicio + chunk_size])
+    contadores.observacoes(novas=[registro['colaborador_id'] for registro in registros])
+    resumo['observacoes'] = len(registros)
+
+    versoes_tabelas.incrementar(
+        AreasProducao.__tablename__, Colaboradores.__tablename__, Metas.__tablename__, ObservacoesColaborador.__tablename__
+    )
+    db.session.commit()
+    meta_resolver.invalidar()
+
+    def gravar(bloco):
+        _inserir(LancamentosProducao, bloco)
+        producao_diaria.adicionar([
+            (linha['data'], linha['area_id'], linha['colaborador_id'], linha['quantidade_realizada'], 0.0)
+            for linha in bloco
+        ])
+        db.session.commit()
+        resumo['lancamentos'] += len(bloco)
+        if progresso:
+            progresso(resumo)
+
+    bloco = []
+    for dia in _dias_uteis(data_inicio, data_fim):
+        for posicao, colaborador_id in enumerate(colaborador_ids):
+            if (colaborador_id, dia) in ausencias or rng.random() < PROB_SEM_LANCAMENTO:
+                continue
+            area_id = area_ids[posicao % len(area_ids)]
+            bloco.append({
+                'data': dia,
+                'area_id': area_id,
+                'colaborador_id': colaborador_id,
+                'quantidade_realizada': max(0, int(rng.gauss(meta_base[area_id] * 0.95, meta_base[area_id] * 0.2))),
+                'saldo': 0,
+                'valor_receber': 0.0
+            })
+            if len(bloco) >= chunk_size:
+                gravar(bloco)
+                bloco = []
+    if bloco:
+        gravar(bloco)
+
+    # Saldo e valor com a meta vigente em cada data, um mês por vez
+    for inicio, fim in _meses(data_inicio, data_fim):
+        recalcular_lancamentos(area_ids=area_ids, data_inicio=inicio, data_fim=fim)
+        db.session.commit()
+
+    resumo['data_inicio'] = data_inicio.isoformat()
+    resumo['data_fim'] = data_fim.isoformat()
+    return resumo
@@ -0,0 +1,330 @@
+import re
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from xml.etree.ElementTree import iterparse
+from src.models.models import db, AreasProducao, Colaboradores, Metas
+from src.utils.lote import inserir_lancamentos
+from src.utils.meta_resolver import meta_resolver
+from src.utils.versoes import versoes_tabelas
+from src.utils import contadores
+
+# Importação da planilha legada "Análise.xlsx".
+#
+# As planilhas são lidas linha a linha (openpyxl em modo somente leitura, ou
+# iterparse sobre sheetN.xml/sharedStrings.xml extraídos) e os lançamentos são
+# gravados em blocos de CHUNK_SIZE linhas, com um commit por bloco. A memória usada
+# depende do tamanho do bloco e da quantidade de nomes distintos, não do tamanho
+# da planilha.
+#
+# Layout das planilhas de área (Alça, Fundo, Topo, ...): cada colaborador ocupa um
+# bloco com a célula "Colaborador: <nome>", seguida de um cabeçalho
+# Data | Meta | Realizado | Saldo | Valor e das linhas diárias, encerradas por
+# "Média:"/"Total". Blocos podem estar lado a lado. Células "Área: <nome>" acima
+# do bloco definem a área; sem elas vale o nome da planilha. A planilha "Metas"
+# traz o nome da área seguido de "Meta: 160 (R$ 350,00)".
+
+CHUNK_SIZE = 5000
+
+PLANILHA_METAS = 'metas'
+PLANILHAS_IGNORADAS = {'fechamento', 'geral', 'planilha2'}
+
+EXCEL_EPOCH = date(1899, 12, 30)
+META_RE = re.compile(r'Meta:\s*([\d.]+)\s*\(R\$\s*([\d.,]+)\)')
+
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+RegistroLancamento = namedtuple('RegistroLancamento', ['area', 'colaborador', 'data', 'quantidade'])
+RegistroMeta = namedtuple('RegistroMeta', ['area', 'meta_quantidade', 'valor_unitario'])
+
+def _normalizar_nome(nome):
+    return ' '.join(str(nome).split())
+
+def _chave_nome(nome):
+    return _normalizar_nome(nome).casefold()
+
+# Leitura
+
+def ler_planilhas_xlsx(caminho):
+    """Gera (nome da planilha, linhas) de um .xlsx em modo somente leitura
+
+    A planilha de metas é entregue primeiro, para que os lançamentos importados
+    em seguida já sejam calculados com as metas da planilha.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilhas = sorted(workbook.worksheets, key=lambda ws: ws.title.strip().casefold() != PLANILHA_METAS)
+        for worksheet in planilhas:
+            yield worksheet.title, worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def ler_shared_strings(origem):
+    """Lista de textos compartilhados (sharedStrings.xml)"""
+    textos = []
+    for _, elem in iterparse(origem, events=('end',)):
+        if elem.tag == NS + 'si':
+            textos.append(''.join(t.text or '' for t in elem.iter(NS + 't')))
+            elem.clear()
+    return textos
+
+def _indice_coluna(referencia):
+    indice = 0
+    for caractere in referencia:
+        if not caractere.isalpha():
+            break
+        indice = indice * 26 + (ord(caractere.upper()) - ord('A') + 1)
+    return indice - 1
+
+def ler_planilha_xml(origem, shared_strings=None):
+    """Gera as linhas (listas de valores) de um sheetN.xml usando iterparse
+
+    Os elementos são descartados assim que cada linha é processada. Datas não são
+    convertidas aqui (sem os estilos, chegam como números seriais do Excel).
+    """
+    shared_strings = shared_strings or []
+    for _, elem in iterparse(origem, events=('end',)):
+        if elem.tag != NS + 'row':
+            continue
+        valores = {}
+        for celula in elem.iter(NS + 'c'):
+            tipo = celula.get('t')
+            if tipo == 'inlineStr':
+                valor = ''.join(t.text or '' for t in celula.iter(NS + 't'))
+            else:
+                v = celula.find(NS + 'v')
+                if v is None or v.text is None:
+                    continue
+                valor = v.text
+                if tipo == 's':
+                    valor = shared_strings[int(valor)]
+                elif tipo == 'b':
+                    valor = valor == '1'
+                elif tipo not in ('str', 'e'):
+                    valor = float(valor)
+            valores[_indice_coluna(celula.get('r', 'A'))] = valor
+        elem.clear()
+        linha = [None] * (max(valores) + 1 if valores else 0)
+        for indice, valor in valores.items():
+            linha[indice] = valor
+        yield linha
+
+# Interpretação das planilhas
+
+def _converter_data(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if isinstance(valor, (int, float)) and 20000 < valor < 80000:
+        # Número serial do Excel (leitura via XML, sem estilos)
+        return EXCEL_EPOCH + timedelta(days=int(valor))
+    return None
+
+def _converter_quantidade(valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        return None
+    return int(round(valor))
+
+def _rotulo_proximo(rotulos, inicio, fim):
+    """Rótulo cuja coluna está no intervalo [inicio, fim], o mais próximo de inicio"""
+    colunas = [coluna for coluna in rotulos if inicio <= coluna <= fim]
+    if not colunas:
+        return None
+    return rotulos[min(colunas)]
+
+def extrair_lancamentos(nome_planilha, linhas):
+    """Gera RegistroLancamento a partir das linhas de uma planilha de área"""
+    area_padrao = _normalizar_nome(nome_planilha)
+    colaboradores_pendentes = {}
+    areas_rotulos = {}
+    blocos = {}
+
+    for linha in linhas:
+        for coluna, valor in enumerate(linha):
+            if not isinstance(valor, str):
+                continue
+            texto = valor.strip()
+            if texto.startswith('Colaborador:'):
+                nome = _normalizar_nome(texto[len('Colaborador:'):])
+                if nome:
+                    colaboradores_pendentes[coluna] = nome
+                blocos.pop(coluna, None)
+            elif texto.startswith('Área:'):
+                areas_rotulos[coluna] = _normalizar_nome(texto[len('Área:'):])
+            elif texto == 'Data':
+                coluna_realizado = next(
+                    (c for c in range(coluna + 1, len(linha)) if isinstance(linha[c], str) and linha[c].strip() == 'Realizado'),
+                    None
+                )
+                if coluna_realizado is None:
+                    continue
+                fim = coluna_realizado + 2
+                colaborador = _rotulo_proximo(colaboradores_pendentes, coluna, fim)
+                for c in [c for c in colaboradores_pendentes if coluna <= c <= fim]:
+                    del colaboradores_pendentes[c]
+                blocos[coluna] = (
+                    coluna_realizado,
+                    colaborador,
+                    _rotulo_proximo(areas_rotulos, coluna, fim) or area_padrao
+                )
+            elif coluna in blocos and (texto.startswith('Média') or texto.startswith('Total')):
+                del blocos[coluna]
+
+        for coluna, (coluna_realizado, colaborador, area) in blocos.items():
+            if colaborador is None or coluna_realizado >= len(linha):
+                continue
+            data = _converter_data(linha[coluna])
+            quantidade = _converter_quantidade(linha[coluna_realizado])
+            if data is not None and quantidade is not None:
+                yield RegistroLancamento(area, colaborador, data, quantidade)
+
+def extrair_metas(linhas):
+    """Gera RegistroMeta a partir da planilha "Metas" (área na célula acima da meta)"""
+    ultimo_texto = {}
+    for linha in linhas:
+        for coluna, valor in enumerate(linha):
+            if not isinstance(valor, str):
+                continue
+            encontrado = META_RE.search(valor)
+            if encontrado and coluna in ultimo_texto:
+                meta_quantidade = int(encontrado.group(1).replace('.', ''))
+                valor_unitario = float(encontrado.group(2).replace('.', '').replace(',', '.'))
+                if meta_quantidade > 0:
+                    yield RegistroMeta(ultimo_texto[coluna], meta_quantidade, valor_unitario)
+            elif not encontrado and valor.strip():
+                ultimo_texto[coluna] = _normalizar_nome(valor)
+
+# Gravação
+
+class ImportadorPlanilha:
+    """Importa planilhas no formato da "Análise.xlsx" para o banco
+
+    Áreas e colaboradores são identificados pelo nome (sem diferenciar maiúsculas
+    de espaços extras) e criados quando não existem. Lançamentos já existentes para
+    o mesmo colaborador, área e data são ignorados, o que torna a importação
+    re-executável.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, progresso=None):
+        self.chunk_size = chunk_size
+        self.progresso = progresso
+        self.resumo = {
+            'linhas_lidas': 0,
+            'inseridos': 0,
+            'ignorados': 0,
+            'areas_criadas': 0,
+            'colaboradores_criados': 0,
+            'metas_criadas': 0,
+            'erros': []
+        }
+        self._areas = {_chave_nome(nome): id for id, nome in db.session.query(AreasProducao.id, AreasProducao.nome)}
+        self._colaboradores = {
+            _chave_nome(nome): id for id, nome in db.session.query(Colaboradores.id, Colaboradores.nome)
+        }
+        self._buffer = []
+
+    def importar(self, planilhas):
+        """Importa um iterável de (nome da planilha, linhas); retorna o resumo"""
+        for nome, linhas in planilhas:
+            chave = nome.strip().casefold()
+            if chave in PLANILHAS_IGNORADAS:
+                continue
+            if chave == PLANILHA_METAS:
+                self._importar_metas(extrair_metas(linhas))
+                continue
+            for registro in extrair_lancamentos(nome, linhas):
+                self._buffer.append(registro)
+                if len(self._buffer) >= self.chunk_size:
+                    self._gravar_bloco()
+        self._gravar_bloco()
+        return self.resumo
+
+    def _ids(self, model, cache, nomes, contador):
+        """Ids dos nomes informados, criando os que ainda não existem"""
+        faltantes = {}
+        for nome in nomes:
+            chave = _chave_nome(nome)
+            if chave not in cache and chave not in faltantes:
+                faltantes[chave] = _normalizar_nome(nome)
+        if faltantes:
+            db.session.execute(db.insert(model), [{'nome': nome} for nome in faltantes.values()])
+            for id, nome in db.session.query(model.id, model.nome).filter(model.nome.in_(faltantes.values())):
+                cache[_chave_nome(nome)] = id
+            versoes_tabelas.incrementar(model.__tablename__)
+            self.resumo[contador] += len(faltantes)
+        return cache
+
+    def _importar_metas(self, registros):
+        registros = list(registros)
+        if not registros:
+            return
+        self._ids(AreasProducao, self._areas, [r.area for r in registros], 'areas_criadas')
+        existentes = {
+            (meta.area_id, meta.meta_quantidade, meta.valor_unitario)
+            for meta in db.session.query(Metas.area_id, Metas.meta_quantidade, Metas.valor_unitario)
+        }
+        novas = []
+        for registro in registros:
+            area_id = self._areas[_chave_nome(registro.area)]
+            chave = (area_id, registro.meta_quantidade, registro.valor_unitario)
+            if chave in existentes:
+                continue
+            existentes.add(chave)
+            novas.append({
+                'nome': f'Meta {registro.area}',
+                'area_id': area_id,
+                'meta_quantidade': registro.meta_quantidade,
+                'valor_unitario': registro.valor_unitario,
+                'data_vigencia': None
+            })
+        if novas:
+            db.session.execute(db.insert(Metas), novas)
+            contadores.metas(novas=[meta['area_id'] for meta in novas])
+            versoes_tabelas.incrementar(Metas.__tablename__)
+        db.session.commit()
+        meta_resolver.invalidar()
+        self.resumo['metas_criadas'] += len(novas)
+
+    def _gravar_bloco(self):
+        if not self._buffer:
+            return
+        bloco, self._buffer = self._buffer, []
+
+        self._ids(AreasProducao, self._areas, {r.area for r in bloco}, 'areas_criadas')
+        self._ids(Colaboradores, self._colaboradores, {r.colaborador for r in bloco}, 'colaboradores_criados')
+
+        inicio = self.resumo['linhas_lidas']
+        candidatos = [
+            (
+                inicio + indice,
+                registro.data,
+                self._areas[_chave_nome(registro.area)],
+                self._colaboradores[_chave_nome(registro.colaborador)],
+                registro.quantidade
+            )
+            for indice, registro in enumerate(bloco)
+        ]
+        inseridos, erros = inserir_lancamentos(candidatos)
+        db.session.commit()
+
+        self.resumo['linhas_lidas'] += len(bloco)
+        self.resumo['inseridos'] += inseridos
+        self.resumo['ignorados'] += len(erros)
+        # Mantém apenas uma amostra dos erros, para não crescer com a planilha
+        espaco = 100 - len(self.resumo['erros'])
+        if espaco > 0:
+            self.resumo['erros'].extend(erros[:espaco])
+        if self.progresso:
+            self.progresso(self.resumo)
+
+def importar_xlsx(caminho, chunk_size=CHUNK_SIZE, progresso=None):
+    """Importa um arquivo .xlsx completo"""
+    return ImportadorPlanilha(chunk_size, progresso).importar(ler_planilhas_xlsx(caminho))
+
+def importar_xml(nome_planilha, sheet_xml, shared_strings_xml=None, chunk_size=CHUNK_SIZE, progresso=None):
+    """Importa uma planilha a partir dos XML extraídos (sheetN.xml e sharedStrings.xml)"""
+    shared_strings = ler_shared_strings(shared_strings_xml) if shared_strings_xml else []
+    planilhas = [(nome_planilha, ler_planilha_xml(sheet_xml, shared_strings))]
+    return ImportadorPlanilha(chunk_size, progresso).importar(planilhas)
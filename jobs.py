@@ -0,0 +1,54 @@
+import os
+from flask import Blueprint, jsonify, send_file
+from flask_login import login_required, current_user
+from src.models.models import db, Job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def _obter_job(job_id):
+    """Job do usuário atual (ou de qualquer usuário, para administradores)"""
+    job = db.session.get(Job, job_id)
+    if job is None or (job.usuario_id != current_user.id and not current_user.is_admin()):
+        return None
+    return job
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Obter a situação de um job de relatório ou exportação"""
+    try:
+        job = _obter_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Job não encontrado'}), 404
+        
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/jobs/<job_id>/resultado', methods=['GET'])
+@login_required
+def get_job_resultado(job_id):
+    """Baixar o resultado de um job concluído (enviado a partir do arquivo gravado pelo job)"""
+    try:
+        job = _obter_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Job não encontrado'}), 404
+        
+        if job.status == 'erro':
+            return jsonify({'error': job.erro}), 409
+        
+        if job.status != 'concluido':
+            return jsonify({'error': 'Job ainda não concluído', 'status': job.status}), 409
+        
+        if not job.arquivo or not os.path.exists(job.arquivo):
+            return jsonify({'error': 'Resultado do job não está mais disponível'}), 410
+        
+        return send_file(
+            job.arquivo,
+            mimetype=job.mimetype,
+            as_attachment=bool(job.nome_arquivo),
+            download_name=job.nome_arquivo,
+            conditional=False
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
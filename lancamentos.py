@@ -1,50 +1,160 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
+import re
 from datetime import datetime
-from src.models.models import db, LancamentosProducao, AreasProducao, Colaboradores, Metas
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import NotFound
+from src.models.models import (
+    db, LancamentosProducao, AreasProducao, Colaboradores, ProducaoDiariaArea, ProducaoDiariaColaborador
+)
 from src.utils.decorators import can_create_lancamentos
+from src.utils.db_profile import read_only
+from src.utils.pagination import (
+    STREAM_CHUNK_SIZE, encode_cursor, keyset_filter, parse_limit, stream_json_array, stream_ndjson
+)
+from src.utils.serializers import lancamentos_query, lancamento_row_to_dict
+from src.utils.calculos import calcular_saldo_valor
+from src.utils import producao_diaria
+from src.utils.meta_resolver import meta_resolver
+from src.utils.lote import (
+    inserir_lancamentos, selecionar_lancamentos, atualizar_lancamentos, remover_lancamentos, remover_por_ids
+)
+from src.utils.exportacao import FORMATOS, stream_export
+from src.utils.analise import analisar_producao
+from src.utils.fila_jobs import async_job
+from src.utils.ausencias import indice_ausencias, mensagem_ausencia
+from src.utils.fila_escrita import executar_escrita
+
+# Quantidade máxima de linhas aceitas por requisição de inserção em lote
+MAX_BULK_ROWS = 5000
+
+# Quantidade máxima de períodos em um relatório comparativo
+MAX_PERIODOS = 12
+
+_NOME_PERIODO = re.compile(r'^[\w-]{1,40}$')
 
 lancamentos_bp = Blueprint('lancamentos', __name__)
 
+def _filtrar_lancamentos(query):
+    """Aplica os filtros opcionais da listagem de lançamentos; ValueError se inválidos"""
+    # Se não for admin, mostrar apenas lançamentos do próprio usuário
+    # (Para isso, seria necessário associar lançamentos a usuários - por enquanto, todos podem ver todos)
+    
+    # Filtros opcionais
+    data_inicio = request.args.get('data_inicio')
+    data_fim = request.args.get('data_fim')
+    area_id = request.args.get('area_id')
+    colaborador_id = request.args.get('colaborador_id')
+    
+    if data_inicio:
+        try:
+            data_inicio_obj = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Formato de data_inicio inválido. Use YYYY-MM-DD')
+        query = query.filter(LancamentosProducao.data >= data_inicio_obj)
+    
+    if data_fim:
+        try:
+            data_fim_obj = datetime.strptime(data_fim, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Formato de data_fim inválido. Use YYYY-MM-DD')
+        query = query.filter(LancamentosProducao.data <= data_fim_obj)
+    
+    if area_id:
+        query = query.filter(LancamentosProducao.area_id == area_id)
+    
+    if colaborador_id:
+        query = query.filter(LancamentosProducao.colaborador_id == colaborador_id)
+    
+    return query
+
 @lancamentos_bp.route('/lancamentos', methods=['GET'])
 @login_required
+@read_only
 def get_lancamentos():
-    """Listar lançamentos (administradores veem todos, usuários comuns veem apenas os próprios)"""
+    """Listar lançamentos (administradores veem todos, usuários comuns veem apenas os próprios)
+
+    Modos de resposta:
+    - com ``limit`` e/ou ``cursor``: página ``{'items': [...], 'next_cursor': ...}``
+      paginada por chave (data DESC, id DESC);
+    - com ``format=ndjson``: todas as linhas em streaming, uma por linha (não
+      combina com ``limit``/``cursor``: a página é sempre JSON);
+    - sem parâmetros de paginação: array JSON completo, enviado em streaming.
+    """
     try:
         # Aplicar filtros se fornecidos
-        query = LancamentosProducao.query
+        try:
+            query = _filtrar_lancamentos(lancamentos_query())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Se não for admin, mostrar apenas lançamentos do próprio usuário
-        # (Para isso, seria necessário associar lançamentos a usuários - por enquanto, todos podem ver todos)
+        query = query.order_by(LancamentosProducao.data.desc(), LancamentosProducao.id.desc())
         
-        # Filtros opcionais
-        data_inicio = request.args.get('data_inicio')
-        data_fim = request.args.get('data_fim')
-        area_id = request.args.get('area_id')
-        colaborador_id = request.args.get('colaborador_id')
+        formato = request.args.get('format', 'json')
+        if formato not in ('json', 'ndjson'):
+            return jsonify({'error': 'format deve ser json ou ndjson'}), 400
         
-        if data_inicio:
+        cursor = request.args.get('cursor')
+        if 'limit' in request.args or cursor:
+            if formato == 'ndjson':
+                return jsonify({'error': 'format=ndjson não pode ser combinado com limit ou cursor'}), 400
             try:
-                data_inicio_obj = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-                query = query.filter(LancamentosProducao.data >= data_inicio_obj)
-            except ValueError:
-                return jsonify({'error': 'Formato de data_inicio inválido. Use YYYY-MM-DD'}), 400
-        
-        if data_fim:
-            try:
-                data_fim_obj = datetime.strptime(data_fim, '%Y-%m-%d').date()
-                query = query.filter(LancamentosProducao.data <= data_fim_obj)
-            except ValueError:
-                return jsonify({'error': 'Formato de data_fim inválido. Use YYYY-MM-DD'}), 400
-        
-        if area_id:
-            query = query.filter(LancamentosProducao.area_id == area_id)
-        
-        if colaborador_id:
-            query = query.filter(LancamentosProducao.colaborador_id == colaborador_id)
+                limit = parse_limit(request.args.get('limit'))
+                if cursor:
+                    query = query.filter(keyset_filter(LancamentosProducao.data, LancamentosProducao.id, cursor))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            lancamentos = query.limit(limit + 1).all()
+            next_cursor = None
+            if len(lancamentos) > limit:
+                lancamentos = lancamentos[:limit]
+                ultimo = lancamentos[-1]
+                next_cursor = encode_cursor(ultimo.data, ultimo.id)
+            
+            return jsonify({
+                'items': [lancamento_row_to_dict(lancamento) for lancamento in lancamentos],
+                'next_cursor': next_cursor
+            }), 200
+        
+        # Streaming a partir de um cursor do servidor, sem materializar o resultado
+        rows = query.execution_options(stream_results=True).yield_per(STREAM_CHUNK_SIZE)
+        if formato == 'ndjson':
+            return stream_ndjson(rows, lancamento_row_to_dict)
+        return stream_json_array(rows, lancamento_row_to_dict)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@lancamentos_bp.route('/lancamentos/export', methods=['GET'])
+@login_required
+@async_job('exportacao-lancamentos')
+@read_only
+def export_lancamentos():
+    """Exportar lançamentos em CSV ou XLSX (format=csv|xlsx), com os filtros da listagem"""
+    try:
+        formato = request.args.get('format', 'csv')
+        if formato not in FORMATOS:
+            return jsonify({'error': 'format deve ser csv ou xlsx'}), 400
         
-        lancamentos = query.order_by(LancamentosProducao.data.desc()).all()
-        return jsonify([lancamento.to_dict() for lancamento in lancamentos]), 200
+        try:
+            query = _filtrar_lancamentos(lancamentos_query())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = query.order_by(LancamentosProducao.data.desc(), LancamentosProducao.id.desc())
+        rows = query.execution_options(stream_results=True).yield_per(STREAM_CHUNK_SIZE)
+        linhas = (
+            (row.data, row.area_nome, row.colaborador_nome, row.quantidade_realizada, row.saldo, row.valor_receber)
+            for row in rows
+        )
+        return stream_export(
+            formato,
+            ['Data', 'Área', 'Colaborador', 'Realizado', 'Saldo', 'Valor a receber'],
+            linhas,
+            'lancamentos',
+            'Lançamentos'
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -76,18 +186,13 @@ def create_lancamento():
         except ValueError:
             return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
-        # Verificar se já existe lançamento para este colaborador, área e data
-        existing_lancamento = LancamentosProducao.query.filter_by(
-            data=data_lancamento,
-            area_id=data['area_id'],
-            colaborador_id=data['colaborador_id']
-        ).first()
-        
-        if existing_lancamento:
-            return jsonify({'error': 'Já existe um lançamento para este colaborador, área e data'}), 400
+        # Colaborador com férias, falta, atestado ou licença registrados na data
+        ausencia = indice_ausencias.ausencia(data['colaborador_id'], data_lancamento)
+        if ausencia:
+            return jsonify({'error': mensagem_ausencia(ausencia)}), 400
         
-        # Buscar meta vigente para a área
-        meta = Metas.query.filter_by(area_id=data['area_id']).first()
+        # Buscar meta vigente para a área na data do lançamento
+        meta = meta_resolver.resolver(data['area_id'], data_lancamento)
         
         # Calcular saldo e valor
         quantidade_realizada = data['quantidade_realizada']
@@ -95,28 +200,230 @@ def create_lancamento():
         valor_receber = 0
         
         if meta:
-            saldo = quantidade_realizada - meta.meta_quantidade
-            # Calcular valor proporcional
-            if quantidade_realizada >= meta.meta_quantidade:
-                # Atingiu a meta: valor base + proporcional ao excesso
-                valor_receber = meta.valor_unitario + (saldo * (meta.valor_unitario / meta.meta_quantidade))
-            else:
-                # Não atingiu a meta: valor proporcional
-                valor_receber = (quantidade_realizada / meta.meta_quantidade) * meta.valor_unitario
-        
-        lancamento = LancamentosProducao(
-            data=data_lancamento,
-            area_id=data['area_id'],
-            colaborador_id=data['colaborador_id'],
-            quantidade_realizada=quantidade_realizada,
-            saldo=saldo,
-            valor_receber=valor_receber
-        )
+            saldo, valor_receber = calcular_saldo_valor(
+                quantidade_realizada, meta.meta_quantidade, meta.valor_unitario
+            )
+        
+        def gravar():
+            lancamento = LancamentosProducao(
+                data=data_lancamento,
+                area_id=data['area_id'],
+                colaborador_id=data['colaborador_id'],
+                quantidade_realizada=quantidade_realizada,
+                saldo=saldo,
+                valor_receber=valor_receber
+            )
+            
+            # Duplicados (mesmo colaborador, área e data) são barrados pelo índice único
+            db.session.add(lancamento)
+            producao_diaria.adicionar([producao_diaria.linha_lancamento(lancamento)])
+            return lancamento
+        
+        return jsonify(executar_escrita(gravar, LancamentosProducao.to_dict)), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Já existe um lançamento para este colaborador, área e data'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@lancamentos_bp.route('/lancamentos/bulk', methods=['POST'])
+@can_create_lancamentos
+def create_lancamentos_bulk():
+    """Criar lançamentos em lote (um turno inteiro por requisição)
+
+    Aceita uma lista de lançamentos ou ``{'lancamentos': [...]}``. Áreas e
+    colaboradores são validados com uma consulta IN cada, duplicados com uma única
+    consulta e as linhas válidas são inseridas com executemany em uma só transação.
+    Linhas inválidas não impedem a inserção das demais e são retornadas em ``erros``.
+    """
+    try:
+        data = request.get_json()
+        rows = data.get('lancamentos') if isinstance(data, dict) else data
+        
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'Informe uma lista de lançamentos'}), 400
+        
+        if len(rows) > MAX_BULK_ROWS:
+            return jsonify({'error': f'Máximo de {MAX_BULK_ROWS} lançamentos por requisição'}), 400
+        
+        erros = []
+        candidatos = []
+        
+        # Validação individual (sem acesso ao banco)
+        required_fields = ['data', 'area_id', 'colaborador_id', 'quantidade_realizada']
+        for indice, row in enumerate(rows):
+            if not isinstance(row, dict):
+                erros.append({'linha': indice, 'error': 'Lançamento inválido'})
+                continue
+            
+            campo_ausente = next((field for field in required_fields if field not in row), None)
+            if campo_ausente:
+                erros.append({'linha': indice, 'error': f'{campo_ausente} é obrigatório'})
+                continue
+            
+            try:
+                data_lancamento = datetime.strptime(row['data'], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                erros.append({'linha': indice, 'error': 'Formato de data inválido. Use YYYY-MM-DD'})
+                continue
+            
+            try:
+                area_id = int(row['area_id'])
+                colaborador_id = int(row['colaborador_id'])
+                quantidade_realizada = int(row['quantidade_realizada'])
+            except (TypeError, ValueError):
+                erros.append({'linha': indice, 'error': 'area_id, colaborador_id e quantidade_realizada devem ser inteiros'})
+                continue
+            
+            candidatos.append((indice, data_lancamento, area_id, colaborador_id, quantidade_realizada))
+        
+        inseridos, erros_lote = inserir_lancamentos(candidatos, verificar_ausencias=True)
+        erros.extend(erros_lote)
+        if inseridos:
+            db.session.commit()
+        
+        erros.sort(key=lambda erro: erro['linha'])
+        status = 201 if inseridos or not erros else 400
+        return jsonify({'inseridos': inseridos, 'erros': erros}), status
+    except IntegrityError:
+        # Outro lançamento concorrente ocupou uma das chaves após a verificação
+        db.session.rollback()
+        return jsonify({'error': 'Já existe um lançamento para este colaborador, área e data'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _selecao_lote(data):
+    """Lançamentos selecionados por ``ids`` ou por ``filtro``; ValueError se a seleção for inválida
+
+    O filtro exige data_inicio e data_fim; area_id e colaborador_id são opcionais.
+    Retorna (linhas, ids não encontrados).
+    """
+    if not isinstance(data, dict) or ('ids' in data) == ('filtro' in data):
+        raise ValueError('Informe ids ou filtro')
+    
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not ids:
+            raise ValueError('ids deve ser uma lista não vazia')
+        try:
+            ids = {int(id) for id in ids}
+        except (TypeError, ValueError):
+            raise ValueError('ids deve conter apenas inteiros')
+        if len(ids) > MAX_BULK_ROWS:
+            raise ValueError(f'Máximo de {MAX_BULK_ROWS} lançamentos por requisição')
+        linhas = selecionar_lancamentos(ids=ids)
+        return linhas, sorted(ids - {row.id for row in linhas})
+    
+    filtro = data['filtro']
+    if not isinstance(filtro, dict) or not filtro.get('data_inicio') or not filtro.get('data_fim'):
+        raise ValueError('filtro exige data_inicio e data_fim')
+    try:
+        data_inicio = datetime.strptime(filtro['data_inicio'], '%Y-%m-%d').date()
+        data_fim = datetime.strptime(filtro['data_fim'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Formato de data inválido. Use YYYY-MM-DD')
+    # Uma linha além do máximo basta para recusar, sem carregar todo o período
+    linhas = selecionar_lancamentos(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        area_id=filtro.get('area_id'),
+        colaborador_id=filtro.get('colaborador_id'),
+        limite=MAX_BULK_ROWS + 1
+    )
+    if len(linhas) > MAX_BULK_ROWS:
+        raise ValueError(f'O filtro seleciona mais de {MAX_BULK_ROWS} lançamentos; máximo por requisição')
+    return linhas, []
+
+@lancamentos_bp.route('/lancamentos', methods=['PATCH'])
+@can_create_lancamentos
+def update_lancamentos_lote():
+    """Atualizar vários lançamentos de uma vez (ex.: corrigir área ou data de um turno)
+
+    Corpo: ``{'ids': [...]}`` ou ``{'filtro': {'data_inicio', 'data_fim', 'area_id', 'colaborador_id'}}``
+    e ``alteracoes`` com data, area_id, colaborador_id e/ou quantidade_realizada.
+    As alterações são aplicadas com um único UPDATE e saldo e valor a receber são
+    recalculados em lote, tudo em uma transação.
+    """
+    try:
+        data = request.get_json()
+        
+        alteracoes = data.get('alteracoes') if isinstance(data, dict) else None
+        if not isinstance(alteracoes, dict) or not alteracoes:
+            return jsonify({'error': 'alteracoes é obrigatório'}), 400
+        
+        campos_invalidos = set(alteracoes) - {'data', 'area_id', 'colaborador_id', 'quantidade_realizada'}
+        if campos_invalidos:
+            return jsonify({'error': f'Campos não permitidos em alteracoes: {", ".join(sorted(campos_invalidos))}'}), 400
+        
+        valores = {}
+        try:
+            for campo in ('area_id', 'colaborador_id', 'quantidade_realizada'):
+                if campo in alteracoes:
+                    valores[campo] = int(alteracoes[campo])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'area_id, colaborador_id e quantidade_realizada devem ser inteiros'}), 400
+        
+        if 'data' in alteracoes:
+            try:
+                valores['data'] = datetime.strptime(alteracoes['data'], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+        
+        if 'area_id' in valores and not AreasProducao.query.get(valores['area_id']):
+            return jsonify({'error': 'Área não encontrada'}), 404
+        
+        if 'colaborador_id' in valores and not Colaboradores.query.get(valores['colaborador_id']):
+            return jsonify({'error': 'Colaborador não encontrado'}), 404
+        
+        try:
+            linhas, nao_encontrados = _selecao_lote(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Colaborador com férias, falta, atestado ou licença na nova data
+        if 'colaborador_id' in valores or 'data' in valores:
+            for row in linhas:
+                ausencia = indice_ausencias.ausencia(
+                    valores.get('colaborador_id', row.colaborador_id), valores.get('data', row.data)
+                )
+                if ausencia:
+                    return jsonify({'error': f'Lançamento {row.id}: {mensagem_ausencia(ausencia)}'}), 400
+        
+        resumo = {'lancamentos_alterados': 0}
+        if linhas:
+            resumo = atualizar_lancamentos(linhas, valores)
+            db.session.commit()
+        
+        return jsonify({
+            'atualizados': len(linhas),
+            'recalculados': resumo['lancamentos_alterados'],
+            'nao_encontrados': nao_encontrados
+        }), 200
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'A alteração geraria mais de um lançamento para o mesmo colaborador, área e data'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@lancamentos_bp.route('/lancamentos', methods=['DELETE'])
+@can_create_lancamentos
+def delete_lancamentos_lote():
+    """Deletar vários lançamentos de uma vez, por ``ids`` ou por ``filtro`` (mesmo formato do PATCH)"""
+    try:
+        try:
+            linhas, nao_encontrados = _selecao_lote(request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        db.session.add(lancamento)
-        db.session.commit()
+        removidos = 0
+        if linhas:
+            removidos = remover_lancamentos(linhas)
+            db.session.commit()
         
-        return jsonify(lancamento.to_dict()), 201
+        return jsonify({'removidos': removidos, 'nao_encontrados': nao_encontrados}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -138,44 +445,67 @@ def update_lancamento(lancamento_id):
     try:
         lancamento = LancamentosProducao.query.get_or_404(lancamento_id)
         data = request.get_json()
+        alteracoes = {}
         
         # Verificar se a área existe (se fornecida)
         if 'area_id' in data:
             area = AreasProducao.query.get(data['area_id'])
             if not area:
                 return jsonify({'error': 'Área não encontrada'}), 404
-            lancamento.area_id = data['area_id']
+            alteracoes['area_id'] = data['area_id']
         
         # Verificar se o colaborador existe (se fornecido)
         if 'colaborador_id' in data:
             colaborador = Colaboradores.query.get(data['colaborador_id'])
             if not colaborador:
                 return jsonify({'error': 'Colaborador não encontrado'}), 404
-            lancamento.colaborador_id = data['colaborador_id']
+            alteracoes['colaborador_id'] = data['colaborador_id']
         
         # Atualizar data (se fornecida)
         if 'data' in data:
             try:
-                lancamento.data = datetime.strptime(data['data'], '%Y-%m-%d').date()
+                alteracoes['data'] = datetime.strptime(data['data'], '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
-        # Atualizar quantidade e recalcular valores
+        if 'colaborador_id' in alteracoes or 'data' in alteracoes:
+            ausencia = indice_ausencias.ausencia(
+                alteracoes.get('colaborador_id', lancamento.colaborador_id),
+                alteracoes.get('data', lancamento.data)
+            )
+            if ausencia:
+                return jsonify({'error': mensagem_ausencia(ausencia)}), 400
+        
+        # Atualizar quantidade
         if 'quantidade_realizada' in data:
-            lancamento.quantidade_realizada = data['quantidade_realizada']
+            alteracoes['quantidade_realizada'] = data['quantidade_realizada']
+        
+        def gravar():
+            lancamento = LancamentosProducao.query.get_or_404(lancamento_id)
+            linha_anterior = producao_diaria.linha_lancamento(lancamento)
+            for campo, valor in alteracoes.items():
+                setattr(lancamento, campo, valor)
             
-            # Recalcular saldo e valor
-            meta = Metas.query.filter_by(area_id=lancamento.area_id).first()
-            if meta:
-                lancamento.saldo = lancamento.quantidade_realizada - meta.meta_quantidade
-                if lancamento.quantidade_realizada >= meta.meta_quantidade:
-                    lancamento.valor_receber = meta.valor_unitario + (lancamento.saldo * (meta.valor_unitario / meta.meta_quantidade))
+            # Recalcular saldo e valor com a meta vigente na data (área, data ou quantidade mudaram)
+            if any(field in alteracoes for field in ('area_id', 'data', 'quantidade_realizada')):
+                meta = meta_resolver.resolver(lancamento.area_id, lancamento.data)
+                if meta:
+                    lancamento.saldo, lancamento.valor_receber = calcular_saldo_valor(
+                        lancamento.quantidade_realizada, meta.meta_quantidade, meta.valor_unitario
+                    )
                 else:
-                    lancamento.valor_receber = (lancamento.quantidade_realizada / meta.meta_quantidade) * meta.valor_unitario
-        
-        db.session.commit()
-        
-        return jsonify(lancamento.to_dict()), 200
+                    lancamento.saldo, lancamento.valor_receber = 0, 0
+            
+            producao_diaria.substituir([linha_anterior], [producao_diaria.linha_lancamento(lancamento)])
+            return lancamento
+        
+        return jsonify(executar_escrita(gravar, LancamentosProducao.to_dict)), 200
+    except NotFound:
+        # Também quando o lançamento é excluído antes da gravação em lote (WRITE_BEHIND)
+        raise
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Já existe um lançamento para este colaborador, área e data'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -185,102 +515,261 @@ def update_lancamento(lancamento_id):
 def delete_lancamento(lancamento_id):
     """Deletar lançamento"""
     try:
-        lancamento = LancamentosProducao.query.get_or_404(lancamento_id)
-        db.session.delete(lancamento)
-        db.session.commit()
+        LancamentosProducao.query.get_or_404(lancamento_id)
+        
+        def gravar():
+            # Removido por outra requisição depois da verificação acima
+            if not remover_por_ids([lancamento_id]):
+                raise NotFound()
         
+        executar_escrita(gravar)
         return jsonify({'message': 'Lançamento deletado com sucesso'}), 200
+    except NotFound:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@lancamentos_bp.route('/relatorios/producao-colaborador', methods=['GET'])
-@login_required
-def get_relatorio_producao_por_colaborador():
-    """Relatório de produção por colaborador"""
+# Relatórios: tabela com os nomes, consolidado diário, coluna de agrupamento e rótulo
+RELATORIOS = {
+    'colaborador': (Colaboradores, ProducaoDiariaColaborador, 'colaborador_id', 'colaborador'),
+    'area': (AreasProducao, ProducaoDiariaArea, 'area_id', 'area')
+}
+
+def _periodo_relatorio():
+    """Período (data_inicio, data_fim) obrigatório dos relatórios; ValueError se inválido"""
+    data_inicio = request.args.get('data_inicio')
+    data_fim = request.args.get('data_fim')
+    
+    if not data_inicio or not data_fim:
+        raise ValueError('data_inicio e data_fim são obrigatórios')
+    
     try:
-        data_inicio = request.args.get('data_inicio')
-        data_fim = request.args.get('data_fim')
-        
-        if not data_inicio or not data_fim:
-            return jsonify({'error': 'data_inicio e data_fim são obrigatórios'}), 400
+        return (
+            datetime.strptime(data_inicio, '%Y-%m-%d').date(),
+            datetime.strptime(data_fim, '%Y-%m-%d').date()
+        )
+    except ValueError:
+        raise ValueError('Formato de data inválido. Use YYYY-MM-DD')
+
+def _relatorio_query(tipo, data_inicio, data_fim):
+    """Query do relatório por colaborador ou por área, a partir do consolidado diário"""
+    tabela, consolidado, chave, rotulo = RELATORIOS[tipo]
+    return db.session.query(
+        tabela.nome.label(rotulo),
+        db.func.sum(consolidado.soma_quantidade).label('total_produzido'),
+        db.func.sum(consolidado.quantidade_lancamentos).label('quantidade_lancamentos'),
+        db.func.sum(consolidado.soma_valor).label('total_valor')
+    ).join(
+        consolidado, tabela.id == getattr(consolidado, chave)
+    ).filter(
+        consolidado.data >= data_inicio,
+        consolidado.data <= data_fim
+    ).group_by(tabela.id, tabela.nome).having(
+        db.func.sum(consolidado.quantidade_lancamentos) > 0
+    )
+
+def _relatorio_row_to_dict(tipo, resultado):
+    rotulo = RELATORIOS[tipo][3]
+    return {
+        rotulo: getattr(resultado, rotulo),
+        'total_produzido': resultado.total_produzido or 0,
+        'media_producao': float((resultado.total_produzido or 0) / resultado.quantidade_lancamentos),
+        'total_valor': float(resultado.total_valor or 0)
+    }
+
+def _periodos_comparacao():
+    """Períodos nomeados do relatório comparativo; ValueError se inválidos
+
+    Cada parâmetro ``periodo`` (repetido ou separado por vírgulas) tem o formato
+    ``nome:YYYY-MM-DD:YYYY-MM-DD``.
+    """
+    periodos = []
+    for valor in request.args.getlist('periodo'):
+        for item in valor.split(','):
+            partes = item.strip().split(':')
+            if len(partes) != 3 or not _NOME_PERIODO.match(partes[0]):
+                raise ValueError('periodo deve ter o formato nome:YYYY-MM-DD:YYYY-MM-DD')
+            try:
+                data_inicio = datetime.strptime(partes[1], '%Y-%m-%d').date()
+                data_fim = datetime.strptime(partes[2], '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError('Formato de data inválido. Use YYYY-MM-DD')
+            if data_inicio > data_fim:
+                raise ValueError(f'Período {partes[0]}: data_inicio posterior a data_fim')
+            periodos.append((partes[0], data_inicio, data_fim))
+    
+    nomes = [nome for nome, _, _ in periodos]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError('Os nomes dos períodos devem ser distintos')
+    if len(periodos) > MAX_PERIODOS:
+        raise ValueError(f'Máximo de {MAX_PERIODOS} períodos por relatório')
+    return periodos
+
+def _comparacao_query(tipo, periodos):
+    """Query com as somas de cada período em colunas, em uma única leitura do consolidado
+
+    Cada período vira um grupo de colunas SUM(CASE WHEN data no período ...);
+    apenas as datas de algum período são lidas.
+    """
+    tabela, consolidado, chave, rotulo = RELATORIOS[tipo]
+    colunas = []
+    for indice, (_, data_inicio, data_fim) in enumerate(periodos):
+        no_periodo = consolidado.data.between(data_inicio, data_fim)
+        for campo, coluna in (
+            ('total_produzido', consolidado.soma_quantidade),
+            ('quantidade_lancamentos', consolidado.quantidade_lancamentos),
+            ('total_valor', consolidado.soma_valor)
+        ):
+            colunas.append(db.func.sum(db.case((no_periodo, coluna), else_=0)).label(f'{campo}_{indice}'))
+    
+    return db.session.query(tabela.nome.label(rotulo), *colunas).join(
+        consolidado, tabela.id == getattr(consolidado, chave)
+    ).filter(
+        db.or_(*(consolidado.data.between(data_inicio, data_fim) for _, data_inicio, data_fim in periodos))
+    ).group_by(tabela.id, tabela.nome).order_by(tabela.nome)
+
+def _totais_periodo(total_produzido, quantidade_lancamentos, total_valor):
+    return {
+        'total_produzido': int(total_produzido or 0),
+        'quantidade_lancamentos': int(quantidade_lancamentos or 0),
+        'media_producao': float(total_produzido or 0) / quantidade_lancamentos if quantidade_lancamentos else 0.0,
+        'total_valor': float(total_valor or 0)
+    }
+
+def _variacoes(base, outros):
+    """Diferença (base - período) e variação percentual de cada período em relação à base"""
+    variacoes = {}
+    for nome, valores in outros.items():
+        variacao = {}
+        for campo in ('total_produzido', 'media_producao', 'total_valor'):
+            diferenca = base[campo] - valores[campo]
+            variacao[campo] = diferenca
+            variacao[f'{campo}_percentual'] = diferenca / valores[campo] * 100 if valores[campo] else None
+        variacoes[nome] = variacao
+    return variacoes
+
+def _relatorio_comparativo(tipo, periodos):
+    """Relatório com os totais de cada período e as variações em relação ao primeiro"""
+    rotulo = RELATORIOS[tipo][3]
+    nomes = [nome for nome, _, _ in periodos]
+    totais = {nome: [0, 0, 0.0] for nome in nomes}
+    itens = []
+    for resultado in _comparacao_query(tipo, periodos):
+        colunas = resultado._mapping
+        por_periodo = {}
+        for indice, nome in enumerate(nomes):
+            somas = (
+                colunas[f'total_produzido_{indice}'],
+                colunas[f'quantidade_lancamentos_{indice}'],
+                colunas[f'total_valor_{indice}']
+            )
+            por_periodo[nome] = _totais_periodo(*somas)
+            for posicao, soma in enumerate(somas):
+                totais[nome][posicao] += soma or 0
+        itens.append({
+            rotulo: getattr(resultado, rotulo),
+            'periodos': por_periodo,
+            'variacoes': _variacoes(por_periodo[nomes[0]], {nome: por_periodo[nome] for nome in nomes[1:]})
+        })
+    
+    totais = {nome: _totais_periodo(*somas) for nome, somas in totais.items()}
+    return {
+        'base': nomes[0],
+        'periodos': [
+            {'nome': nome, 'data_inicio': data_inicio.isoformat(), 'data_fim': data_fim.isoformat()}
+            for nome, data_inicio, data_fim in periodos
+        ],
+        'totais': totais,
+        'variacoes': _variacoes(totais[nomes[0]], {nome: totais[nome] for nome in nomes[1:]}),
+        'itens': itens
+    }
+
+def _relatorio(tipo):
+    try:
+        if 'periodo' in request.args:
+            try:
+                periodos = _periodos_comparacao()
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(_relatorio_comparativo(tipo, periodos)), 200
         
         try:
-            data_inicio_obj = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-            data_fim_obj = datetime.strptime(data_fim, '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+            data_inicio, data_fim = _periodo_relatorio()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Query para relatório por colaborador
-        query = db.session.query(
-            Colaboradores.nome.label('colaborador'),
-            db.func.sum(LancamentosProducao.quantidade_realizada).label('total_produzido'),
-            db.func.avg(LancamentosProducao.quantidade_realizada).label('media_producao'),
-            db.func.sum(LancamentosProducao.valor_receber).label('total_valor')
-        ).join(
-            LancamentosProducao, Colaboradores.id == LancamentosProducao.colaborador_id
-        ).filter(
-            LancamentosProducao.data >= data_inicio_obj,
-            LancamentosProducao.data <= data_fim_obj
-        ).group_by(Colaboradores.id, Colaboradores.nome)
-        
-        resultados = query.all()
-        
-        relatorio = []
-        for resultado in resultados:
-            relatorio.append({
-                'colaborador': resultado.colaborador,
-                'total_produzido': resultado.total_produzido or 0,
-                'media_producao': float(resultado.media_producao or 0),
-                'total_valor': float(resultado.total_valor or 0)
-            })
-        
-        return jsonify(relatorio), 200
+        resultados = _relatorio_query(tipo, data_inicio, data_fim).all()
+        return jsonify([_relatorio_row_to_dict(tipo, resultado) for resultado in resultados]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@lancamentos_bp.route('/relatorios/producao-colaborador', methods=['GET'])
+@login_required
+@async_job('relatorio-colaborador')
+@read_only
+def get_relatorio_producao_por_colaborador():
+    """Relatório de produção por colaborador (com ``periodo``, comparativo entre períodos)"""
+    return _relatorio('colaborador')
+
 @lancamentos_bp.route('/relatorios/producao-area', methods=['GET'])
 @login_required
+@async_job('relatorio-area')
+@read_only
 def get_relatorio_producao_por_area():
-    """Relatório de produção por área"""
+    """Relatório de produção por área (com ``periodo``, comparativo entre períodos)"""
+    return _relatorio('area')
+
+@lancamentos_bp.route('/relatorios/analise-<any(colaborador, area):tipo>', methods=['GET'])
+@login_required
+@async_job('analise-producao')
+@read_only
+def get_analise_producao(tipo):
+    """Análise de produção por colaborador ou por área: totais móveis, percentis e variação diária"""
     try:
-        data_inicio = request.args.get('data_inicio')
-        data_fim = request.args.get('data_fim')
-        
-        if not data_inicio or not data_fim:
-            return jsonify({'error': 'data_inicio e data_fim são obrigatórios'}), 400
-        
         try:
-            data_inicio_obj = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-            data_fim_obj = datetime.strptime(data_fim, '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
-        
-        # Query para relatório por área
-        query = db.session.query(
-            AreasProducao.nome.label('area'),
-            db.func.sum(LancamentosProducao.quantidade_realizada).label('total_produzido'),
-            db.func.avg(LancamentosProducao.quantidade_realizada).label('media_producao'),
-            db.func.sum(LancamentosProducao.valor_receber).label('total_valor')
-        ).join(
-            LancamentosProducao, AreasProducao.id == LancamentosProducao.area_id
-        ).filter(
-            LancamentosProducao.data >= data_inicio_obj,
-            LancamentosProducao.data <= data_fim_obj
-        ).group_by(AreasProducao.id, AreasProducao.nome)
-        
-        resultados = query.all()
-        
-        relatorio = []
-        for resultado in resultados:
-            relatorio.append({
-                'area': resultado.area,
-                'total_produzido': resultado.total_produzido or 0,
-                'media_producao': float(resultado.media_producao or 0),
-                'total_valor': float(resultado.total_valor or 0)
-            })
-        
-        return jsonify(relatorio), 200
+            data_inicio, data_fim = _periodo_relatorio()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        tabela, _, chave, _ = RELATORIOS[tipo]
+        return jsonify({
+            'data_inicio': data_inicio.isoformat(),
+            'data_fim': data_fim.isoformat(),
+            'itens': analisar_producao(tabela, chave, data_inicio, data_fim)
+        }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@lancamentos_bp.route('/relatorios/producao-<any(colaborador, area):tipo>/export', methods=['GET'])
+@login_required
+@async_job('exportacao-relatorio')
+@read_only
+def export_relatorio(tipo):
+    """Exportar relatório de produção por colaborador ou por área em CSV ou XLSX"""
+    try:
+        formato = request.args.get('format', 'csv')
+        if formato not in FORMATOS:
+            return jsonify({'error': 'format deve ser csv ou xlsx'}), 400
+        
+        try:
+            data_inicio, data_fim = _periodo_relatorio()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = _relatorio_query(tipo, data_inicio, data_fim)
+        rows = query.execution_options(stream_results=True).yield_per(STREAM_CHUNK_SIZE)
+        linhas = (
+            (item[RELATORIOS[tipo][3]], item['total_produzido'], item['media_producao'], item['total_valor'])
+            for item in (_relatorio_row_to_dict(tipo, row) for row in rows)
+        )
+        titulo = 'Colaborador' if tipo == 'colaborador' else 'Área'
+        return stream_export(
+            formato,
+            [titulo, 'Total produzido', 'Média de produção', 'Valor total'],
+            linhas,
+            f'producao-{tipo}_{data_inicio.isoformat()}_{data_fim.isoformat()}',
+            f'Produção por {titulo.lower()}'
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
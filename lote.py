@@ -0,0 +1,176 @@
+from src.models.models import db, LancamentosProducao, AreasProducao, Colaboradores
+from src.utils.calculos import calcular_saldo_valor
+from src.utils.meta_resolver import meta_resolver
+from src.utils import producao_diaria
+from src.utils.recalculo import recalcular_lancamentos
+from src.utils.ausencias import indice_ausencias, mensagem_ausencia
+
+def inserir_lancamentos(candidatos, verificar_ausencias=False):
+    """Insere lançamentos em lote com validação baseada em conjuntos
+
+    candidatos: tuplas (indice, data, area_id, colaborador_id, quantidade_realizada)
+    já convertidas. Áreas e colaboradores são validados com uma consulta IN cada e
+    duplicados com uma única consulta; as linhas válidas são inseridas com
+    executemany e somadas aos consolidados diários. Com verificar_ausencias, linhas
+    em dias de férias, falta, atestado ou licença do colaborador são recusadas
+    (consulta ao índice em memória, sem acesso ao banco). Não faz commit.
+
+    Retorna (quantidade inserida, lista de erros ``{'linha': indice, 'error': ...}``).
+    """
+    erros = []
+    
+    # Verificar existência de áreas e colaboradores com uma consulta IN cada
+    area_ids = {c[2] for c in candidatos}
+    colaborador_ids = {c[3] for c in candidatos}
+    areas_existentes = set()
+    colaboradores_existentes = set()
+    if area_ids:
+        areas_existentes = {
+            row.id for row in db.session.query(AreasProducao.id).filter(AreasProducao.id.in_(area_ids))
+        }
+    if colaborador_ids:
+        colaboradores_existentes = {
+            row.id for row in db.session.query(Colaboradores.id).filter(Colaboradores.id.in_(colaborador_ids))
+        }
+    
+    # Chaves (data, área, colaborador) já lançadas, buscadas em uma única consulta
+    chaves_existentes = set()
+    if candidatos:
+        existentes = db.session.query(
+            LancamentosProducao.data,
+            LancamentosProducao.area_id,
+            LancamentosProducao.colaborador_id
+        ).filter(
+            LancamentosProducao.data.in_({c[1] for c in candidatos}),
+            LancamentosProducao.area_id.in_(area_ids),
+            LancamentosProducao.colaborador_id.in_(colaborador_ids)
+        )
+        chaves_existentes = {(row.data, row.area_id, row.colaborador_id) for row in existentes}
+    
+    novos = []
+    chaves_lote = set()
+    for indice, data_lancamento, area_id, colaborador_id, quantidade_realizada in candidatos:
+        if area_id not in areas_existentes:
+            erros.append({'linha': indice, 'error': 'Área não encontrada'})
+            continue
+        if colaborador_id not in colaboradores_existentes:
+            erros.append({'linha': indice, 'error': 'Colaborador não encontrado'})
+            continue
+        
+        if verificar_ausencias:
+            ausencia = indice_ausencias.ausencia(colaborador_id, data_lancamento)
+            if ausencia:
+                erros.append({'linha': indice, 'error': mensagem_ausencia(ausencia)})
+                continue
+        
+        chave = (data_lancamento, area_id, colaborador_id)
+        if chave in chaves_existentes:
+            erros.append({'linha': indice, 'error': 'Já existe um lançamento para este colaborador, área e data'})
+            continue
+        if chave in chaves_lote:
+            erros.append({'linha': indice, 'error': 'Lançamento duplicado no lote'})
+            continue
+        chaves_lote.add(chave)
+        
+        saldo = 0
+        valor_receber = 0
+        meta = meta_resolver.resolver(area_id, data_lancamento)
+        if meta:
+            saldo, valor_receber = calcular_saldo_valor(
+                quantidade_realizada, meta.meta_quantidade, meta.valor_unitario
+            )
+        
+        novos.append({
+            'data': data_lancamento,
+            'area_id': area_id,
+            'colaborador_id': colaborador_id,
+            'quantidade_realizada': quantidade_realizada,
+            'saldo': saldo,
+            'valor_receber': valor_receber
+        })
+    
+    if novos:
+        db.session.execute(db.insert(LancamentosProducao), novos)
+        producao_diaria.adicionar([
+            (novo['data'], novo['area_id'], novo['colaborador_id'], novo['quantidade_realizada'], novo['valor_receber'])
+            for novo in novos
+        ])
+    
+    return len(novos), erros
+
+def selecionar_lancamentos(ids=None, data_inicio=None, data_fim=None, area_id=None, colaborador_id=None, limite=None):
+    """Linhas (id, data, area_id, colaborador_id, quantidade_realizada, valor_receber) da seleção
+
+    Com limite, no máximo essa quantidade de linhas é lida do banco.
+    """
+    query = db.session.query(
+        LancamentosProducao.id,
+        LancamentosProducao.data,
+        LancamentosProducao.area_id,
+        LancamentosProducao.colaborador_id,
+        LancamentosProducao.quantidade_realizada,
+        LancamentosProducao.valor_receber
+    )
+    if ids is not None:
+        query = query.filter(LancamentosProducao.id.in_(ids))
+    if data_inicio:
+        query = query.filter(LancamentosProducao.data >= data_inicio)
+    if data_fim:
+        query = query.filter(LancamentosProducao.data <= data_fim)
+    if area_id:
+        query = query.filter(LancamentosProducao.area_id == area_id)
+    if colaborador_id:
+        query = query.filter(LancamentosProducao.colaborador_id == colaborador_id)
+    return query.order_by(LancamentosProducao.id).limit(limite).all()
+
+def _linha(row, alteracoes=None):
+    alteracoes = alteracoes or {}
+    return (
+        alteracoes.get('data', row.data),
+        alteracoes.get('area_id', row.area_id),
+        alteracoes.get('colaborador_id', row.colaborador_id),
+        alteracoes.get('quantidade_realizada', row.quantidade_realizada),
+        row.valor_receber
+    )
+
+def atualizar_lancamentos(linhas, alteracoes):
+    """Aplica as mesmas alterações às linhas selecionadas com um único UPDATE
+
+    alteracoes: valores já validados de data, area_id, colaborador_id e/ou
+    quantidade_realizada. Os consolidados diários são ajustados e saldo e
+    valor_receber recalculados em lote para as linhas afetadas. Duplicados
+    gerados pela alteração levantam IntegrityError. Não faz commit.
+
+    Retorna o resumo de recalcular_lancamentos.
+    """
+    ids = [row.id for row in linhas]
+    tabela = LancamentosProducao.__table__
+    db.session.execute(tabela.update().where(tabela.c.id.in_(ids)).values(**alteracoes))
+    # Move as linhas para as novas chaves com o valor atual; o recálculo ajusta o valor
+    producao_diaria.substituir([_linha(row) for row in linhas], [_linha(row, alteracoes) for row in linhas])
+    return recalcular_lancamentos(lancamento_ids=ids)
+
+def remover_lancamentos(linhas):
+    """Remove as linhas selecionadas com um único DELETE e as subtrai dos consolidados; não faz commit
+
+    Retorna a quantidade removida (linhas removidas por outra requisição depois da
+    seleção não são contadas nem subtraídas).
+    """
+    return remover_por_ids([row.id for row in linhas])
+
+def remover_por_ids(ids):
+    """Remove os lançamentos com DELETE ... RETURNING e subtrai dos consolidados as linhas removidas
+
+    Os consolidados usam os valores devolvidos pelo próprio DELETE, e não uma
+    leitura anterior: uma remoção concorrente do mesmo lançamento não é subtraída
+    duas vezes. Retorna a quantidade removida; não faz commit.
+    """
+    tabela = LancamentosProducao.__table__
+    removidas = db.session.execute(
+        tabela.delete().where(tabela.c.id.in_(ids)).returning(
+            tabela.c.data, tabela.c.area_id, tabela.c.colaborador_id,
+            tabela.c.quantidade_realizada, tabela.c.valor_receber
+        )
+    ).all()
+    producao_diaria.remover([tuple(row) for row in removidas])
+    return len(removidas)
@@ -1,77 +1,134 @@
+import gc
 import os
 import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, current_app, send_from_directory
+from flask.cli import with_appcontext
 from flask_cors import CORS
 from flask_login import LoginManager
 from src.models.models import db
-from src.models.user import User
+from src.utils.db_profile import configurar_banco
+from src.utils.metricas import instalar_metricas
+from src.models.migrations import run_migrations
+from src.utils import producao_diaria
+from src.utils.recalculo import recalcular_lancamentos
+from src.utils.importador import importar_xlsx, importar_xml, CHUNK_SIZE
+from src.utils.fechamento import fechar_mes
+from src.utils.gerador import gerar_dados
+from src.utils.meta_resolver import meta_resolver
+from src.utils.versoes import versoes_tabelas, aquecer_listagens
+from src.utils.ausencias import indice_ausencias
+from datetime import datetime
+import click
+from src.utils.user_cache import user_cache
 from src.routes.areas import areas_bp
 from src.routes.colaboradores import colaboradores_bp
 from src.routes.metas import metas_bp
 from src.routes.lancamentos import lancamentos_bp
 from src.routes.observacoes import observacoes_bp
 from src.routes.auth import auth_bp
-from flask import Flask, render_template
+from src.routes.dashboard import dashboard_bp
+from src.routes.fechamentos import fechamentos_bp
+from src.routes.jobs import jobs_bp
 
-app = Flask(__name__)
-app.register_blueprint(lancamento_bp)
+# Fábrica da aplicação.
+#
+# Todos os módulos são importados no carregamento deste arquivo, de modo que com
+# `gunicorn --preload 'src.main:create_app()'` o processo mestre importa, configura
+# e aquece os caches uma única vez e os workers herdam essa memória no fork
+# (copy-on-write). A criação e a migração do esquema não são feitas na
+# inicialização: rode `flask --app src.main migrate-db` antes de subir a aplicação.
 
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+BLUEPRINTS = (
+    auth_bp, areas_bp, colaboradores_bp, metas_bp, lancamentos_bp,
+    observacoes_bp, dashboard_bp, fechamentos_bp, jobs_bp
+)
 
-# Habilitar CORS para todas as rotas
-CORS(app, supports_credentials=True)
-
-# Configurar Flask-Login
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# Registrar blueprints
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(areas_bp, url_prefix='/api')
-app.register_blueprint(colaboradores_bp, url_prefix='/api')
-app.register_blueprint(metas_bp, url_prefix='/api')
-app.register_blueprint(lancamentos_bp, url_prefix='/api')
-app.register_blueprint(observacoes_bp, url_prefix='/api')
-
-# Configuração do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+    # Cache por worker: requisições autenticadas não consultam a tabela users
+    return user_cache.get(int(user_id))
+
+def create_app(config=None):
+    """Cria e configura a aplicação
+
+    config sobrescreve a configuração padrão. Com AQUECER_CACHES (padrão, exceto nos
+    comandos do flask), as metas, versões, ausências e listagens de referência são
+    carregadas antes do fork dos workers.
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Os comandos do flask (migrate-db, gerar-dados...) não usam os caches
+    app.config['AQUECER_CACHES'] = os.environ.get('FLASK_RUN_FROM_CLI') != 'true'
+    if config:
+        app.config.update(config)
+    
+    # Habilitar CORS para todas as rotas
+    CORS(app, supports_credentials=True)
+    
+    # Configurar Flask-Login
+    login_manager.init_app(app)
+    
+    # Registrar blueprints
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint, url_prefix='/api')
     
-    @app.route('/lancar', methods=['GET', 'POST'])
-def lancar():
-    if request.method == 'POST':
-        # Aqui você pega os dados do formulário e salva no banco
-        data = request.form['data']
-        operador = request.form['operador']
-        setor = request.form['setor']
-        area = request.form['area']
-        quantidade = request.form['quantidade']
-        # salvar no banco...
-        return redirect('/dashboard')  # ou qualquer outra página
-
-    return render_template('lancamento.html')
+    # Configuração do banco de dados (DATABASE_URL / DATABASE_READ_URL sobrescrevem o SQLite padrão)
+    configurar_banco(app, db, DEFAULT_DATABASE_URL)
+    instalar_metricas(app, db)
     
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
+    for comando in COMANDOS:
+        app.cli.add_command(comando)
+    
+    app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', serve)
+    
+    if app.config['AQUECER_CACHES']:
+        aquecer_caches(app)
+    return app
+
+def aquecer_caches(app):
+    """Carrega os caches de referência e libera as conexões antes do fork dos workers
+
+    Um banco ainda sem esquema (antes de migrate-db) não impede a inicialização;
+    os caches são então carregados na primeira requisição de cada worker.
+    """
+    with app.app_context():
+        try:
+            meta_resolver.carregar()
+            versoes_tabelas.carregar()
+            indice_ausencias.carregar()
+            aquecer_listagens(app)
+        except Exception as e:
+            app.logger.warning('Caches não aquecidos (banco sem migrate-db?): %s', getattr(e, 'orig', e))
+            meta_resolver.invalidar()
+            indice_ausencias.invalidar()
+        finally:
+            db.session.remove()
+        # Conexões abertas no mestre não podem ser compartilhadas com os workers
+        db.engine.dispose()
+    leitura = app.extensions.get('db_leitura')
+    if leitura is not None:
+        leitura.dispose()
+    # Objetos já criados vão para a geração permanente: o coletor não os percorre
+    # nos workers, evitando cópias das páginas compartilhadas
+    gc.collect()
+    gc.freeze()
+
 def serve(path):
     # Se o path começa com 'api/', não servir arquivos estáticos
     if path.startswith('api/'):
         return "API endpoint not found", 404
         
-    static_folder_path = app.static_folder
+    static_folder_path = current_app.static_folder
     if static_folder_path is None:
             return "Static folder not configured", 404
 
@@ -84,9 +141,126 @@ def serve(path):
         else:
             return "index.html not found", 404
 
+@click.command('migrate-db')
+@with_appcontext
+def migrate_db():
+    """Cria tabelas inexistentes e aplica as migrações de esquema pendentes"""
+    db.create_all()
+    executadas = run_migrations()
+    for version, descricao in executadas:
+        print(f'Migração {version} aplicada: {descricao}')
+    if not executadas:
+        print('Banco de dados já está atualizado')
+
+@click.command('reconstruir-consolidados')
+@with_appcontext
+def reconstruir_consolidados():
+    """Recalcula os consolidados diários de produção a partir dos lançamentos"""
+    producao_diaria.reconstruir()
+    db.session.commit()
+    print('Consolidados diários recalculados')
+
+@click.command('recalcular-lancamentos')
+@with_appcontext
+@click.option('--area-id', type=int, multiple=True, help='Área a recalcular (pode ser repetido)')
+@click.option('--data-inicio', help='Data inicial (YYYY-MM-DD)')
+@click.option('--data-fim', help='Data final (YYYY-MM-DD)')
+@click.option('--dry-run', is_flag=True, help='Apenas mostra as diferenças, sem gravar')
+def recalcular_lancamentos_command(area_id, data_inicio, data_fim, dry_run):
+    """Recalcula saldo e valor a receber dos lançamentos com as metas vigentes"""
+    resumo = recalcular_lancamentos(
+        area_ids=list(area_id) or None,
+        data_inicio=datetime.strptime(data_inicio, '%Y-%m-%d').date() if data_inicio else None,
+        data_fim=datetime.strptime(data_fim, '%Y-%m-%d').date() if data_fim else None,
+        dry_run=dry_run
+    )
+    for alteracao in resumo['alteracoes']:
+        print(
+            f"{alteracao['id']:>8} {alteracao['data']} área {alteracao['area_id']}: "
+            f"saldo {alteracao['saldo_anterior']} -> {alteracao['saldo_novo']}, "
+            f"valor {alteracao['valor_anterior']} -> {alteracao['valor_novo']:.2f}"
+        )
+    print(
+        f"{resumo['lancamentos_alterados']} de {resumo['lancamentos_analisados']} lançamentos alterados; "
+        f"valor total {resumo['valor_total_anterior']:.2f} -> {resumo['valor_total_novo']:.2f}"
+    )
+    if dry_run:
+        db.session.rollback()
+        print('Dry run: nada foi gravado')
+    else:
+        db.session.commit()
+
+@click.command('importar-planilha')
+@with_appcontext
+@click.argument('caminho', type=click.Path(exists=True, dir_okay=False))
+@click.option('--shared-strings', type=click.Path(exists=True, dir_okay=False), help='sharedStrings.xml (quando CAMINHO é um sheetN.xml)')
+@click.option('--planilha', default='', help='Nome da planilha/área (quando CAMINHO é um sheetN.xml)')
+@click.option('--chunk-size', type=int, default=CHUNK_SIZE, show_default=True, help='Linhas gravadas por transação')
+def importar_planilha(caminho, shared_strings, planilha, chunk_size):
+    """Importa a planilha legada (Análise.xlsx ou sheetN.xml extraído)"""
+    def progresso(resumo):
+        print(f"{resumo['linhas_lidas']} linhas lidas, {resumo['inseridos']} inseridas, {resumo['ignorados']} ignoradas")
+    
+    if caminho.lower().endswith('.xml'):
+        resumo = importar_xml(planilha, caminho, shared_strings, chunk_size=chunk_size, progresso=progresso)
+    else:
+        resumo = importar_xlsx(caminho, chunk_size=chunk_size, progresso=progresso)
+    
+    for erro in resumo['erros'][:20]:
+        print(f"Linha {erro['linha']}: {erro['error']}")
+    print(
+        f"Importação concluída: {resumo['inseridos']} lançamentos, {resumo['areas_criadas']} áreas, "
+        f"{resumo['colaboradores_criados']} colaboradores e {resumo['metas_criadas']} metas criadas"
+    )
+
+@click.command('fechar-mes')
+@with_appcontext
+@click.argument('competencia')
+@click.option('--processos', type=int, default=None, help='Processos usados no cálculo (padrão: número de CPUs, até FECHAMENTO_MAX_PROCESSOS)')
+def fechar_mes_command(competencia, processos):
+    """Fecha a competência AAAA-MM; um mês já fechado não é recalculado"""
+    fechamento, criado = fechar_mes(competencia, processos=processos)
+    situacao = 'fechado' if criado else 'já estava fechado'
+    print(
+        f"Mês {fechamento.competencia} {situacao}: {fechamento.quantidade_colaboradores} colaboradores, "
+        f"{fechamento.total_produzido} produzidos, valor total {fechamento.total_valor:.2f}"
+    )
+
+@click.command('gerar-dados')
+@with_appcontext
+@click.option('--areas', type=int, default=7, show_default=True)
+@click.option('--colaboradores', type=int, default=100, show_default=True)
+@click.option('--metas-por-area', type=int, default=2, show_default=True)
+@click.option('--anos', type=float, default=1, show_default=True, help='Anos de lançamentos até ontem')
+@click.option('--observacoes', type=int, default=12, show_default=True, help='Observações por colaborador por ano')
+@click.option('--semente', type=int, default=42, show_default=True)
+@click.option('--prefixo', default='Sintético', show_default=True, help='Prefixo dos nomes criados')
+def gerar_dados_command(areas, colaboradores, metas_por_area, anos, observacoes, semente, prefixo):
+    """Popula o banco com dados sintéticos para benchmark"""
+    def progresso(resumo):
+        print(f"{resumo['lancamentos']} lançamentos gravados")
+    
+    resumo = gerar_dados(
+        areas=areas, colaboradores=colaboradores, metas_por_area=metas_por_area, anos=anos,
+        observacoes=observacoes, semente=semente, prefixo=prefixo, progresso=progresso
+    )
+    print(
+        f"Dados gerados de {resumo['data_inicio']} a {resumo['data_fim']}: {resumo['areas']} áreas, "
+        f"{resumo['colaboradores']} colaboradores, {resumo['metas']} metas, "
+        f"{resumo['lancamentos']} lançamentos e {resumo['observacoes']} observações"
+    )
+
+COMANDOS = (
+    migrate_db, reconstruir_consolidados, recalcular_lancamentos_command, importar_planilha,
+    fechar_mes_command, gerar_dados_command
+)
 
 if __name__ == '__main__':
     import os
+    app = create_app()
+    # Servidor de desenvolvimento: aplica as migrações pendentes antes de subir
+    with app.app_context():
+        db.create_all()
+        run_migrations()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
-
@@ -0,0 +1,78 @@
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date
+from src.models.models import db, Metas
+from src.utils.versoes import versoes_tabelas
+
+MetaVigente = namedtuple('MetaVigente', ['id', 'area_id', 'meta_quantidade', 'valor_unitario', 'data_vigencia'])
+
+def consultar_metas(area_ids=None):
+    """Metas do banco (opcionalmente apenas das áreas informadas) como MetaVigente"""
+    query = db.session.query(
+        Metas.id, Metas.area_id, Metas.meta_quantidade, Metas.valor_unitario, Metas.data_vigencia
+    )
+    if area_ids is not None:
+        query = query.filter(Metas.area_id.in_(area_ids))
+    return [MetaVigente(*meta) for meta in query]
+
+def agrupar_por_area(metas):
+    """Agrupa as metas por área, ordenadas por vigência: {area_id: ([datas], [metas])}"""
+    por_area = {}
+    for meta in sorted(metas, key=lambda m: (m.data_vigencia or date.min, m.id)):
+        datas, vigentes = por_area.setdefault(meta.area_id, ([], []))
+        datas.append(meta.data_vigencia or date.min)
+        vigentes.append(meta)
+    return por_area
+
+class MetaResolver:
+    """Resolve a meta vigente de uma área em uma data, a partir de um cache em memória
+
+    As metas de cada área ficam ordenadas por data de vigência; a meta vigente em
+    uma data é a de maior vigência menor ou igual à data (busca binária). Metas sem
+    data de vigência valem desde sempre. Em caso de empate, vale a criada por último.
+
+    O cache é recarregado quando a versão da tabela metas muda (todas as escritas em
+    metas a incrementam), inclusive quando a alteração foi feita por outro worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_area = None
+        self._versao = None
+
+    def invalidar(self):
+        """Descarta o cache; a próxima consulta recarrega as metas do banco"""
+        self._por_area = None
+
+    def carregar(self, versao=None):
+        """Carrega todas as metas do banco em uma única consulta"""
+        if versao is None:
+            versao = versoes_tabelas.versoes((Metas.__tablename__,))
+        por_area = agrupar_por_area(consultar_metas())
+        self._por_area = por_area
+        self._versao = versao
+        return por_area
+
+    def _metas_por_area(self):
+        versao = versoes_tabelas.versoes((Metas.__tablename__,))
+        por_area = self._por_area
+        if por_area is not None and self._versao == versao:
+            return por_area
+        with self._lock:
+            if self._por_area is not None and self._versao == versao:
+                return self._por_area
+            return self.carregar(versao)
+
+    def resolver(self, area_id, data):
+        """Meta vigente para a área na data informada, ou None se não houver"""
+        entrada = self._metas_por_area().get(int(area_id))
+        if not entrada:
+            return None
+        datas, vigentes = entrada
+        posicao = bisect_right(datas, data) - 1
+        if posicao < 0:
+            return None
+        return vigentes[posicao]
+
+meta_resolver = MetaResolver()
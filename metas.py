@@ -2,17 +2,29 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required
 from datetime import datetime
 from src.models.models import db, Metas, AreasProducao
-from src.utils.decorators import can_manage_metas
+from src.utils.decorators import can_manage_metas, admin_required
+from src.utils.db_profile import read_only
+from src.utils.versoes import versoes_tabelas, conditional_get
+from src.utils.serializers import metas_query, meta_row_to_dict
+from src.utils.meta_resolver import meta_resolver
+from src.utils.recalculo import recalcular_lancamentos
+from src.utils import contadores
 
 metas_bp = Blueprint('metas', __name__)
 
+def _meta_quantidade_invalida(valor):
+    """meta_quantidade precisa ser um inteiro positivo (é o divisor do cálculo do valor a receber)"""
+    return isinstance(valor, bool) or not isinstance(valor, int) or valor <= 0
+
 @metas_bp.route('/metas', methods=['GET'])
 @login_required
+@read_only
+@conditional_get('metas', 'areas_producao')
 def get_metas():
     """Listar todas as metas"""
     try:
-        metas = Metas.query.all()
-        return jsonify([meta.to_dict() for meta in metas]), 200
+        metas = metas_query().all()
+        return jsonify([meta_row_to_dict(meta) for meta in metas]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -28,6 +40,9 @@ def create_meta():
             if not data or field not in data:
                 return jsonify({'error': f'{field} é obrigatório'}), 400
         
+        if _meta_quantidade_invalida(data['meta_quantidade']):
+            return jsonify({'error': 'meta_quantidade deve ser um inteiro maior que zero'}), 400
+        
         # Verificar se a área existe
         area = AreasProducao.query.get(data['area_id'])
         if not area:
@@ -50,7 +65,12 @@ def create_meta():
         )
         
         db.session.add(meta)
+        contadores.metas(novas=[meta.area_id])
+        # A nova meta pode passar a valer para lançamentos já existentes da área
+        recalcular_lancamentos(area_ids=[meta.area_id], data_inicio=data_vigencia)
+        versoes_tabelas.incrementar('metas')
         db.session.commit()
+        meta_resolver.invalidar()
         
         return jsonify(meta.to_dict()), 201
     except Exception as e:
@@ -74,6 +94,7 @@ def update_meta(meta_id):
     try:
         meta = Metas.query.get_or_404(meta_id)
         data = request.get_json()
+        area_anterior = meta.area_id
         
         if 'nome' in data:
             meta.nome = data['nome']
@@ -85,6 +106,8 @@ def update_meta(meta_id):
             meta.area_id = data['area_id']
         
         if 'meta_quantidade' in data:
+            if _meta_quantidade_invalida(data['meta_quantidade']):
+                return jsonify({'error': 'meta_quantidade deve ser um inteiro maior que zero'}), 400
             meta.meta_quantidade = data['meta_quantidade']
         
         if 'valor_unitario' in data:
@@ -96,7 +119,14 @@ def update_meta(meta_id):
             except ValueError:
                 return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
+        # Recalcular os lançamentos armazenados se algo que afeta o pagamento mudou
+        if any(field in data for field in ('area_id', 'meta_quantidade', 'valor_unitario', 'data_vigencia')):
+            recalcular_lancamentos(area_ids=list({area_anterior, meta.area_id}))
+        
+        contadores.metas(anteriores=[area_anterior], novas=[meta.area_id])
+        versoes_tabelas.incrementar('metas')
         db.session.commit()
+        meta_resolver.invalidar()
         
         return jsonify(meta.to_dict()), 200
     except Exception as e:
@@ -110,20 +140,63 @@ def delete_meta(meta_id):
     try:
         meta = Metas.query.get_or_404(meta_id)
         db.session.delete(meta)
+        contadores.metas(anteriores=[meta.area_id])
+        recalcular_lancamentos(area_ids=[meta.area_id], data_inicio=meta.data_vigencia)
+        versoes_tabelas.incrementar('metas')
         db.session.commit()
+        meta_resolver.invalidar()
         
         return jsonify({'message': 'Meta deletada com sucesso'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@metas_bp.route('/metas/recalcular', methods=['POST'])
+@admin_required
+def recalcular_metas():
+    """Recalcular saldo e valor dos lançamentos com as metas vigentes (apenas administradores)
+
+    Parâmetros opcionais: area_id, data_inicio, data_fim e dry_run (apenas
+    retorna as diferenças, sem gravar).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        area_ids = None
+        if data.get('area_id'):
+            area = AreasProducao.query.get(data['area_id'])
+            if not area:
+                return jsonify({'error': 'Área não encontrada'}), 404
+            area_ids = [area.id]
+        
+        try:
+            data_inicio = datetime.strptime(data['data_inicio'], '%Y-%m-%d').date() if data.get('data_inicio') else None
+            data_fim = datetime.strptime(data['data_fim'], '%Y-%m-%d').date() if data.get('data_fim') else None
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+        
+        dry_run = bool(data.get('dry_run', False))
+        resumo = recalcular_lancamentos(
+            area_ids=area_ids, data_inicio=data_inicio, data_fim=data_fim, dry_run=dry_run
+        )
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+        
+        return jsonify(resumo), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @metas_bp.route('/metas/area/<int:area_id>', methods=['GET'])
 @login_required
+@read_only
 def get_metas_by_area(area_id):
     """Obter metas por área"""
     try:
-        metas = Metas.query.filter_by(area_id=area_id).all()
-        return jsonify([meta.to_dict() for meta in metas]), 200
+        metas = metas_query().filter(Metas.area_id == area_id).all()
+        return jsonify([meta_row_to_dict(meta) for meta in metas]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,211 @@
+import hmac
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from bisect import bisect_left
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from flask_login import current_user
+from sqlalchemy import event
+
+# Métricas por rota no formato texto do Prometheus, expostas em /api/_metrics.
+#
+# Cada requisição acumula em g o número e o tempo das instruções SQL (eventos
+# before/after_cursor_execute dos engines de escrita e de leitura); ao final da
+# resposta (inclusive das respostas em streaming) a duração, o status e as
+# consultas são somados aos contadores da rota, com um único lock por requisição.
+# Instruções mais lentas que SLOW_QUERY_SECONDS são guardadas como amostra, com
+# os valores literais substituídos por '?'. As métricas são de cada processo
+# (worker do gunicorn).
+#
+# O endpoint exige o token de METRICS_TOKEN (Authorization: Bearer <token>) ou uma
+# sessão de administrador; acesso anônimo só com METRICS_PUBLIC habilitado.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_QUERY_SECONDS = 0.1
+MAX_AMOSTRAS_LENTAS = 20
+MAX_TAMANHO_SQL = 300
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACOS = re.compile(r'\s+')
+
+def redigir_sql(statement):
+    """Instrução SQL sem valores literais (strings e números viram '?')"""
+    return _ESPACOS.sub(' ', _LITERAIS.sub('?', statement)).strip()[:MAX_TAMANHO_SQL]
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _rotulos(**rotulos):
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos.items()) + '}'
+
+class Metricas:
+    def __init__(self, buckets=BUCKETS, slow_query_seconds=SLOW_QUERY_SECONDS):
+        self.buckets = buckets
+        self.slow_query_seconds = slow_query_seconds
+        self._lock = threading.Lock()
+        # (método, rota) -> [contagens por bucket, soma, contagem]
+        self._duracoes = {}
+        self._status = defaultdict(int)
+        self._consultas = defaultdict(int)
+        self._tempo_consultas = defaultdict(float)
+        # (rota, instrução) -> maior duração; apenas as MAX_AMOSTRAS_LENTAS mais recentes
+        self._lentas = OrderedDict()
+
+    def registrar_requisicao(self, metodo, rota, status, duracao, consultas, tempo_consultas):
+        chave = (metodo, rota)
+        with self._lock:
+            histograma = self._duracoes.get(chave)
+            if histograma is None:
+                histograma = self._duracoes[chave] = [[0] * len(self.buckets), 0.0, 0]
+            posicao = bisect_left(self.buckets, duracao)
+            if posicao < len(self.buckets):
+                histograma[0][posicao] += 1
+            histograma[1] += duracao
+            histograma[2] += 1
+            self._status[(metodo, rota, status)] += 1
+            self._consultas[chave] += consultas
+            self._tempo_consultas[chave] += tempo_consultas
+
+    def registrar_lenta(self, rota, statement, duracao):
+        chave = (rota, redigir_sql(statement))
+        with self._lock:
+            duracao = max(duracao, self._lentas.pop(chave, 0.0))
+            self._lentas[chave] = duracao
+            if len(self._lentas) > MAX_AMOSTRAS_LENTAS:
+                self._lentas.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._duracoes.clear()
+            self._status.clear()
+            self._consultas.clear()
+            self._tempo_consultas.clear()
+            self._lentas.clear()
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        with self._lock:
+            duracoes = {chave: (list(h[0]), h[1], h[2]) for chave, h in self._duracoes.items()}
+            status = dict(self._status)
+            consultas = dict(self._consultas)
+            tempo_consultas = dict(self._tempo_consultas)
+            lentas = list(self._lentas.items())
+
+        linhas = [
+            '# HELP http_request_duration_seconds Duração das requisições por rota',
+            '# TYPE http_request_duration_seconds histogram'
+        ]
+        for (metodo, rota), (contagens, soma, total) in sorted(duracoes.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                linhas.append(
+                    f'http_request_duration_seconds_bucket{_rotulos(method=metodo, endpoint=rota, le=limite)} {acumulado}'
+                )
+            linhas.append(f'http_request_duration_seconds_bucket{_rotulos(method=metodo, endpoint=rota, le="+Inf")} {total}')
+            linhas.append(f'http_request_duration_seconds_sum{_rotulos(method=metodo, endpoint=rota)} {soma}')
+            linhas.append(f'http_request_duration_seconds_count{_rotulos(method=metodo, endpoint=rota)} {total}')
+
+        linhas += ['# HELP http_requests_total Requisições por rota e status', '# TYPE http_requests_total counter']
+        for (metodo, rota, codigo), total in sorted(status.items()):
+            linhas.append(f'http_requests_total{_rotulos(method=metodo, endpoint=rota, status=codigo)} {total}')
+
+        linhas += ['# HELP db_queries_total Instruções SQL executadas por rota', '# TYPE db_queries_total counter']
+        for (metodo, rota), total in sorted(consultas.items()):
+            linhas.append(f'db_queries_total{_rotulos(method=metodo, endpoint=rota)} {total}')
+
+        linhas += [
+            '# HELP db_query_duration_seconds_total Tempo gasto em instruções SQL por rota',
+            '# TYPE db_query_duration_seconds_total counter'
+        ]
+        for (metodo, rota), total in sorted(tempo_consultas.items()):
+            linhas.append(f'db_query_duration_seconds_total{_rotulos(method=metodo, endpoint=rota)} {total}')
+
+        linhas += [
+            f'# HELP db_slow_query_seconds Amostras das últimas instruções SQL acima de {self.slow_query_seconds}s',
+            '# TYPE db_slow_query_seconds gauge'
+        ]
+        for (rota, statement), duracao in lentas:
+            linhas.append(f'db_slow_query_seconds{_rotulos(endpoint=rota, statement=statement)} {duracao}')
+        return '\n'.join(linhas) + '\n'
+
+metricas = Metricas()
+
+def _rota_atual():
+    regra = request.url_rule
+    return regra.rule if regra is not None else 'desconhecida'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context():
+        context._metricas_inicio = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_metricas_inicio', None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    acumulado = g.get('metricas_sql')
+    if acumulado is not None:
+        acumulado[0] += 1
+        acumulado[1] += duracao
+    if duracao >= metricas.slow_query_seconds:
+        metricas.registrar_lenta(_rota_atual(), statement, duracao)
+
+def instrumentar_engine(engine):
+    """Registra os eventos de contagem e tempo de SQL no engine"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def _inicio_requisicao():
+    g.metricas_inicio = time.perf_counter()
+    # [quantidade, tempo] das instruções SQL; lista mutável para ser lida ao fechar a resposta
+    g.metricas_sql = [0, 0.0]
+
+def _fim_requisicao(response):
+    inicio = g.get('metricas_inicio')
+    if inicio is None:
+        return response
+    metodo = request.method
+    rota = _rota_atual()
+    status = response.status_code
+    sql = g.metricas_sql
+
+    def registrar():
+        metricas.registrar_requisicao(metodo, rota, status, time.perf_counter() - inicio, sql[0], sql[1])
+
+    # Respostas em streaming são registradas ao fechar, para incluir a geração do corpo
+    if response.is_streamed:
+        response.call_on_close(registrar)
+    else:
+        registrar()
+    return response
+
+def _acesso_permitido():
+    config = current_app.config
+    if config.get('METRICS_PUBLIC', os.environ.get('METRICS_PUBLIC') == '1'):
+        return True
+    token = config.get('METRICS_TOKEN') or os.environ.get('METRICS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return current_user.is_authenticated and current_user.is_admin()
+
+def exportar_metricas():
+    """Métricas no formato texto do Prometheus (token, administrador ou METRICS_PUBLIC)"""
+    if not _acesso_permitido():
+        return jsonify({'error': 'Acesso negado'}), 403
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def instalar_metricas(app, db):
+    """Instrumenta as requisições e os engines do app e registra /api/_metrics"""
+    metricas.slow_query_seconds = app.config.get('SLOW_QUERY_SECONDS', SLOW_QUERY_SECONDS)
+    with app.app_context():
+        instrumentar_engine(db.engine)
+    leitura = app.extensions.get('db_leitura')
+    if leitura is not None:
+        instrumentar_engine(leitura)
+    app.before_request(_inicio_requisicao)
+    app.after_request(_fim_requisicao)
+    app.add_url_rule('/api/_metrics', 'metricas', exportar_metricas, methods=['GET'])
@@ -0,0 +1,149 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from .models import (
+    db, ProducaoDiariaArea, ProducaoDiariaColaborador, VersaoTabela, FechamentoMensal, FechamentoColaborador, Job
+)
+
+# Migrações de esquema versionadas.
+#
+# db.create_all() cria apenas tabelas inexistentes; alterações em tabelas que já
+# existem em bancos antigos (índices, restrições, colunas) são aplicadas aqui, em
+# ordem de versão, e registradas na tabela schema_migrations. Cada migração deve
+# ser idempotente, pois em um banco novo create_all() já cria o esquema atual.
+
+MIGRATIONS = []
+
+def migration(version, descricao):
+    """Registra uma função de migração com a versão e descrição informadas"""
+    def decorator(f):
+        MIGRATIONS.append((version, descricao, f))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return f
+    return decorator
+
+def _ensure_migrations_table(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, '
+        'descricao VARCHAR(200) NOT NULL, '
+        'aplicada_em TIMESTAMP NOT NULL)'
+    ))
+
+def applied_versions(conn):
+    """Versões já aplicadas no banco"""
+    _ensure_migrations_table(conn)
+    return {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+def run_migrations(engine=None):
+    """Aplica as migrações pendentes, cada uma em sua própria transação
+
+    Retorna a lista de (versão, descrição) aplicadas nesta execução.
+    """
+    engine = engine if engine is not None else db.engine
+    with engine.begin() as conn:
+        aplicadas = applied_versions(conn)
+
+    executadas = []
+    for version, descricao, f in MIGRATIONS:
+        if version in aplicadas:
+            continue
+        with engine.begin() as conn:
+            f(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, descricao, aplicada_em) VALUES (:v, :d, :t)'),
+                {'v': version, 'd': descricao, 't': datetime.utcnow()}
+            )
+        executadas.append((version, descricao))
+    return executadas
+
+@migration(1, 'Índices e restrição de unicidade em lancamentos_producao')
+def _lancamentos_indices(conn):
+    # Lançamentos duplicados impedem a criação do índice único; não são removidos
+    # automaticamente para não descartar dados de produção sem revisão.
+    duplicados = conn.execute(text(
+        'SELECT data, area_id, colaborador_id, COUNT(*) FROM lancamentos_producao '
+        'GROUP BY data, area_id, colaborador_id HAVING COUNT(*) > 1'
+    )).fetchall()
+    if duplicados:
+        chaves = ', '.join(f'({row[0]}, área {row[1]}, colaborador {row[2]})' for row in duplicados[:20])
+        raise RuntimeError(
+            f'Existem {len(duplicados)} lançamentos duplicados por data, área e colaborador. '
+            f'Remova os duplicados antes de migrar: {chaves}'
+        )
+
+    conn.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_lancamentos_data_area_colaborador '
+        'ON lancamentos_producao (data, area_id, colaborador_id)'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_lancamentos_area_data '
+        'ON lancamentos_producao (area_id, data)'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_lancamentos_colaborador_data '
+        'ON lancamentos_producao (colaborador_id, data)'
+    ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_lancamentos_relatorio '
+        'ON lancamentos_producao (data, colaborador_id, area_id, quantidade_realizada, valor_receber)'
+    ))
+
+@migration(2, 'Consolidados diários de produção por área e por colaborador')
+def _producao_diaria(conn):
+    from src.utils.producao_diaria import reconstruir
+    ProducaoDiariaArea.__table__.create(conn, checkfirst=True)
+    ProducaoDiariaColaborador.__table__.create(conn, checkfirst=True)
+    reconstruir(conn)
+
+@migration(3, 'Contadores de versão das tabelas de referência')
+def _versoes_tabelas(conn):
+    VersaoTabela.__table__.create(conn, checkfirst=True)
+
+@migration(4, 'Fechamentos mensais por colaborador')
+def _fechamentos(conn):
+    FechamentoMensal.__table__.create(conn, checkfirst=True)
+    FechamentoColaborador.__table__.create(conn, checkfirst=True)
+
+@migration(5, 'Jobs de relatórios e exportações em segundo plano')
+def _jobs(conn):
+    Job.__table__.create(conn, checkfirst=True)
+
+@migration(6, 'Busca textual (FTS5) nas descrições das observações')
+def _observacoes_fts(conn):
+    # Apenas SQLite; nos demais bancos a busca usa ILIKE (src.utils.busca)
+    if conn.dialect.name != 'sqlite':
+        return
+
+    conn.execute(text(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS observacoes_fts USING fts5('
+        "descricao, content='observacoes_colaborador', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    ))
+    conn.execute(text(
+        'CREATE TRIGGER IF NOT EXISTS observacoes_fts_insert AFTER INSERT ON observacoes_colaborador BEGIN '
+        'INSERT INTO observacoes_fts (rowid, descricao) VALUES (new.id, new.descricao); END'
+    ))
+    conn.execute(text(
+        'CREATE TRIGGER IF NOT EXISTS observacoes_fts_delete AFTER DELETE ON observacoes_colaborador BEGIN '
+        "INSERT INTO observacoes_fts (observacoes_fts, rowid, descricao) VALUES ('delete', old.id, old.descricao); END"
+    ))
+    conn.execute(text(
+        'CREATE TRIGGER IF NOT EXISTS observacoes_fts_update AFTER UPDATE OF descricao ON observacoes_colaborador BEGIN '
+        "INSERT INTO observacoes_fts (observacoes_fts, rowid, descricao) VALUES ('delete', old.id, old.descricao); "
+        'INSERT INTO observacoes_fts (rowid, descricao) VALUES (new.id, new.descricao); END'
+    ))
+    # Indexa as observações já existentes
+    conn.execute(text("INSERT INTO observacoes_fts (observacoes_fts) VALUES ('rebuild')"))
+
+@migration(7, 'Contadores de metas, lançamentos e observações em áreas e colaboradores')
+def _contadores(conn):
+    from src.utils.contadores import reconstruir
+    for tabela, colunas in (
+        ('areas_producao', ('total_metas', 'total_lancamentos')),
+        ('colaboradores', ('total_lancamentos', 'total_observacoes')),
+    ):
+        existentes = {coluna['name'] for coluna in inspect(conn).get_columns(tabela)}
+        for coluna in colunas:
+            if coluna not in existentes:
+                conn.execute(text(f'ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER NOT NULL DEFAULT 0'))
+    reconstruir(conn)
@@ -1,13 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import date
+import json
+from src.utils.db_profile import RoutingSession
 
-db = SQLAlchemy()
+# SELECTs de rotas @read_only usam o engine de leitura (ver src.utils.db_profile)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class AreasProducao(db.Model):
     __tablename__ = 'areas_producao'
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False, unique=True)
+    # Contadores mantidos a cada escrita (src.utils.contadores)
+    total_metas = db.Column(db.Integer, nullable=False, default=0)
+    total_lancamentos = db.Column(db.Integer, nullable=False, default=0)
     
     # Relacionamentos
     metas = db.relationship('Metas', backref='area', lazy=True)
@@ -19,7 +25,9 @@ class AreasProducao(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
-            'nome': self.nome
+            'nome': self.nome,
+            'total_metas': self.total_metas or 0,
+            'total_lancamentos': self.total_lancamentos or 0
         }
 
 class Colaboradores(db.Model):
@@ -27,6 +35,9 @@ class Colaboradores(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(200), nullable=False, unique=True)
+    # Contadores mantidos a cada escrita (src.utils.contadores)
+    total_lancamentos = db.Column(db.Integer, nullable=False, default=0)
+    total_observacoes = db.Column(db.Integer, nullable=False, default=0)
     
     # Relacionamentos
     lancamentos = db.relationship('LancamentosProducao', backref='colaborador', lazy=True)
@@ -38,7 +49,9 @@ class Colaboradores(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
-            'nome': self.nome
+            'nome': self.nome,
+            'total_lancamentos': self.total_lancamentos or 0,
+            'total_observacoes': self.total_observacoes or 0
         }
 
 class Metas(db.Model):
@@ -66,6 +79,14 @@ class Metas(db.Model):
 
 class LancamentosProducao(db.Model):
     __tablename__ = 'lancamentos_producao'
+    __table_args__ = (
+        # Um lançamento por colaborador, área e data; também atende filtros por período
+        db.Index('uq_lancamentos_data_area_colaborador', 'data', 'area_id', 'colaborador_id', unique=True),
+        db.Index('ix_lancamentos_area_data', 'area_id', 'data'),
+        db.Index('ix_lancamentos_colaborador_data', 'colaborador_id', 'data'),
+        # Índice de cobertura para os relatórios por período (dispensa leitura da tabela)
+        db.Index('ix_lancamentos_relatorio', 'data', 'colaborador_id', 'area_id', 'quantidade_realizada', 'valor_receber'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     data = db.Column(db.Date, nullable=False)
@@ -113,3 +134,124 @@ class ObservacoesColaborador(db.Model):
             'descricao': self.descricao
         }
 
+
+class ProducaoDiariaArea(db.Model):
+    """Consolidado diário de lançamentos por área, mantido a cada escrita em lançamentos"""
+    __tablename__ = 'producao_diaria_area'
+    
+    data = db.Column(db.Date, primary_key=True)
+    area_id = db.Column(db.Integer, db.ForeignKey('areas_producao.id'), primary_key=True)
+    quantidade_lancamentos = db.Column(db.Integer, nullable=False, default=0)
+    soma_quantidade = db.Column(db.Integer, nullable=False, default=0)
+    soma_valor = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ProducaoDiariaArea {self.data} - {self.area_id}>'
+
+class ProducaoDiariaColaborador(db.Model):
+    """Consolidado diário de lançamentos por colaborador, mantido a cada escrita em lançamentos"""
+    __tablename__ = 'producao_diaria_colaborador'
+    
+    data = db.Column(db.Date, primary_key=True)
+    colaborador_id = db.Column(db.Integer, db.ForeignKey('colaboradores.id'), primary_key=True)
+    quantidade_lancamentos = db.Column(db.Integer, nullable=False, default=0)
+    soma_quantidade = db.Column(db.Integer, nullable=False, default=0)
+    soma_valor = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ProducaoDiariaColaborador {self.data} - {self.colaborador_id}>'
+
+class VersaoTabela(db.Model):
+    """Contador de versão dos dados de referência, incrementado a cada escrita na tabela"""
+    __tablename__ = 'versoes_tabelas'
+    
+    tabela = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<VersaoTabela {self.tabela} - {self.versao}>'
+
+class FechamentoMensal(db.Model):
+    """Fechamento de um mês (competência AAAA-MM); imutável depois de gravado"""
+    __tablename__ = 'fechamentos_mensais'
+    
+    competencia = db.Column(db.String(7), primary_key=True)
+    data_inicio = db.Column(db.Date, nullable=False)
+    data_fim = db.Column(db.Date, nullable=False)
+    fechado_em = db.Column(db.DateTime, nullable=False)
+    quantidade_colaboradores = db.Column(db.Integer, nullable=False, default=0)
+    total_produzido = db.Column(db.Integer, nullable=False, default=0)
+    total_valor = db.Column(db.Float, nullable=False, default=0)
+    # Resposta JSON completa do fechamento, servida sem nova serialização
+    resultado = db.Column(db.Text, nullable=False)
+    
+    colaboradores = db.relationship('FechamentoColaborador', backref='fechamento', lazy=True)
+    
+    def __repr__(self):
+        return f'<FechamentoMensal {self.competencia}>'
+    
+    def to_dict(self):
+        return {
+            'competencia': self.competencia,
+            'data_inicio': self.data_inicio.isoformat() if self.data_inicio else None,
+            'data_fim': self.data_fim.isoformat() if self.data_fim else None,
+            'fechado_em': self.fechado_em.isoformat() if self.fechado_em else None,
+            'quantidade_colaboradores': self.quantidade_colaboradores,
+            'total_produzido': self.total_produzido,
+            'total_valor': self.total_valor
+        }
+
+class FechamentoColaborador(db.Model):
+    """Linha do fechamento mensal de um colaborador"""
+    __tablename__ = 'fechamentos_colaboradores'
+    
+    competencia = db.Column(db.String(7), db.ForeignKey('fechamentos_mensais.competencia'), primary_key=True)
+    colaborador_id = db.Column(db.Integer, db.ForeignKey('colaboradores.id'), primary_key=True)
+    colaborador_nome = db.Column(db.String(200), nullable=False)
+    quantidade_lancamentos = db.Column(db.Integer, nullable=False, default=0)
+    total_produzido = db.Column(db.Integer, nullable=False, default=0)
+    media_producao = db.Column(db.Float, nullable=False, default=0)
+    valor_receber = db.Column(db.Float, nullable=False, default=0)
+    ferias = db.Column(db.Integer, nullable=False, default=0)
+    faltas = db.Column(db.Integer, nullable=False, default=0)
+    treinamentos = db.Column(db.Integer, nullable=False, default=0)
+    outras_observacoes = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<FechamentoColaborador {self.competencia} - {self.colaborador_id}>'
+
+class Job(db.Model):
+    """Execução em segundo plano de um relatório ou exportação"""
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    # Hash do tipo, dos parâmetros e das versões dos dados de entrada
+    chave = db.Column(db.String(64), nullable=False, index=True)
+    parametros = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pendente')
+    usuario_id = db.Column(db.Integer)
+    criado_em = db.Column(db.DateTime, nullable=False)
+    iniciado_em = db.Column(db.DateTime)
+    concluido_em = db.Column(db.DateTime)
+    erro = db.Column(db.Text)
+    # Arquivo com o corpo gerado, no diretório de jobs (src.utils.fila_jobs)
+    arquivo = db.Column(db.String(500))
+    mimetype = db.Column(db.String(100))
+    nome_arquivo = db.Column(db.String(200))
+    
+    def __repr__(self):
+        return f'<Job {self.id} - {self.tipo} - {self.status}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'status': self.status,
+            'parametros': json.loads(self.parametros) if self.parametros else None,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None,
+            'erro': self.erro,
+            'resultado_url': f'/api/jobs/{self.id}/resultado' if self.status == 'concluido' else None
+        }
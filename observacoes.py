@@ -3,16 +3,28 @@ from flask_login import login_required
 from datetime import datetime
 from src.models.models import db, ObservacoesColaborador, Colaboradores
 from src.utils.decorators import can_manage_observacoes
+from src.utils.db_profile import read_only
+from src.utils.serializers import observacoes_query, observacao_row_to_dict
+from src.utils.versoes import versoes_tabelas
+from src.utils.pagination import parse_limit, encode_offset_cursor, decode_offset_cursor
+from src.utils.busca import filtrar_busca
+from src.utils import contadores
 
 observacoes_bp = Blueprint('observacoes', __name__)
 
 @observacoes_bp.route('/observacoes', methods=['GET'])
 @login_required
+@read_only
 def get_observacoes():
-    """Listar observações com filtros opcionais"""
+    """Listar observações com filtros opcionais
+
+    Com ``q``, busca as palavras na descrição (sem diferenciar acentos) e retorna
+    ``{'items': [...], 'next_cursor': ...}`` ordenado por relevância, com ``limit``
+    e ``cursor`` para as páginas seguintes.
+    """
     try:
         # Aplicar filtros se fornecidos
-        query = ObservacoesColaborador.query
+        query = observacoes_query()
         
         data_inicio = request.args.get('data_inicio')
         data_fim = request.args.get('data_fim')
@@ -39,8 +51,30 @@ def get_observacoes():
         if tipo_observacao:
             query = query.filter(ObservacoesColaborador.tipo_observacao == tipo_observacao)
         
+        q = request.args.get('q')
+        if q is not None:
+            query = filtrar_busca(query, q)
+            if query is None:
+                return jsonify({'error': 'q deve conter ao menos uma palavra'}), 400
+            
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                cursor = request.args.get('cursor')
+                offset = decode_offset_cursor(cursor) if cursor else 0
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            resultados = query.offset(offset).limit(limit + 1).all()
+            next_cursor = encode_offset_cursor(offset + limit) if len(resultados) > limit else None
+            items = [
+                dict(observacao_row_to_dict(row), relevancia=row.relevancia, trecho=row.trecho)
+                for row in resultados[:limit]
+            ]
+            return jsonify({'items': items, 'next_cursor': next_cursor}), 200
+        
         observacoes = query.order_by(ObservacoesColaborador.data.desc()).all()
-        return jsonify([observacao.to_dict() for observacao in observacoes]), 200
+        return jsonify([observacao_row_to_dict(observacao) for observacao in observacoes]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -80,6 +114,8 @@ def create_observacao():
         )
         
         db.session.add(observacao)
+        contadores.observacoes(novas=[observacao.colaborador_id])
+        versoes_tabelas.incrementar('observacoes_colaborador')
         db.session.commit()
         
         return jsonify(observacao.to_dict()), 201
@@ -104,6 +140,7 @@ def update_observacao(observacao_id):
     try:
         observacao = ObservacoesColaborador.query.get_or_404(observacao_id)
         data = request.get_json()
+        colaborador_anterior = observacao.colaborador_id
         
         # Verificar se o colaborador existe (se fornecido)
         if 'colaborador_id' in data:
@@ -130,6 +167,8 @@ def update_observacao(observacao_id):
         if 'descricao' in data:
             observacao.descricao = data['descricao']
         
+        contadores.observacoes(anteriores=[colaborador_anterior], novas=[observacao.colaborador_id])
+        versoes_tabelas.incrementar('observacoes_colaborador')
         db.session.commit()
         
         return jsonify(observacao.to_dict()), 200
@@ -144,6 +183,8 @@ def delete_observacao(observacao_id):
     try:
         observacao = ObservacoesColaborador.query.get_or_404(observacao_id)
         db.session.delete(observacao)
+        contadores.observacoes(anteriores=[observacao.colaborador_id])
+        versoes_tabelas.incrementar('observacoes_colaborador')
         db.session.commit()
         
         return jsonify({'message': 'Observação deletada com sucesso'}), 200
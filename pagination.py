@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+from flask import Response, stream_with_context
+
+# Limites de paginação
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Quantidade de linhas buscadas por vez do cursor do servidor no modo streaming
+STREAM_CHUNK_SIZE = 1000
+
+def encode_cursor(data, row_id):
+    """Gera um cursor opaco a partir da chave (data, id) da última linha da página"""
+    raw = f'{data.isoformat()}:{row_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodifica um cursor gerado por encode_cursor, retornando (data, id)"""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode('utf-8')
+        data_str, row_id = raw.split(':', 1)
+        return datetime.strptime(data_str, '%Y-%m-%d').date(), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Cursor inválido')
+
+def encode_offset_cursor(offset):
+    """Cursor opaco para resultados sem chave de ordenação estável (ex.: busca por relevância)"""
+    return base64.urlsafe_b64encode(f'o:{offset}'.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_offset_cursor(cursor):
+    """Decodifica um cursor gerado por encode_offset_cursor, retornando o deslocamento"""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        prefixo, offset = base64.urlsafe_b64decode(cursor + padding).decode('utf-8').split(':', 1)
+        if prefixo != 'o' or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Cursor inválido')
+
+def parse_limit(value):
+    """Converte o parâmetro limit, aplicando o valor padrão e o máximo permitido"""
+    if value is None or value == '':
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit deve ser um número inteiro')
+    if limit < 1:
+        raise ValueError('limit deve ser maior que zero')
+    return min(limit, MAX_LIMIT)
+
+def keyset_filter(data_column, id_column, cursor):
+    """Condição para buscar as linhas seguintes ao cursor na ordem (data DESC, id DESC)"""
+    data, row_id = decode_cursor(cursor)
+    return (data_column < data) | ((data_column == data) & (id_column < row_id))
+
+def stream_json_array(rows, serialize):
+    """Resposta em streaming com um array JSON, enviado em partes conforme as linhas são lidas"""
+    def generate():
+        yield '['
+        first = True
+        for row in rows:
+            if not first:
+                yield ','
+            first = False
+            yield json.dumps(serialize(row), ensure_ascii=False)
+        yield ']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def stream_ndjson(rows, serialize):
+    """Resposta em streaming no formato NDJSON (um objeto JSON por linha)"""
+    def generate():
+        for row in rows:
+            yield json.dumps(serialize(row), ensure_ascii=False) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
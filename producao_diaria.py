@@ -0,0 +1,111 @@
+from collections import defaultdict
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.models import db, LancamentosProducao, ProducaoDiariaArea, ProducaoDiariaColaborador
+from src.utils.versoes import versoes_tabelas
+from src.utils import contadores
+
+# Manutenção incremental dos consolidados diários usados pelos relatórios.
+#
+# As rotas de escrita de lançamentos chamam adicionar()/remover()/substituir() com os valores
+# gravados (antes do commit), de modo que os consolidados são atualizados na mesma
+# transação do lançamento. Cada linha é a tupla
+# (data, area_id, colaborador_id, quantidade_realizada, valor_receber).
+# Toda alteração também incrementa a versão de lancamentos_producao, usada para
+# invalidar resultados em cache que dependem dos lançamentos, e ajusta os
+# contadores de lançamentos de áreas e colaboradores (src.utils.contadores).
+
+def linha_lancamento(lancamento):
+    """Tupla com os campos do lançamento relevantes para os consolidados"""
+    return (
+        lancamento.data,
+        lancamento.area_id,
+        lancamento.colaborador_id,
+        lancamento.quantidade_realizada,
+        lancamento.valor_receber
+    )
+
+def adicionar(linhas):
+    """Soma os lançamentos informados aos consolidados"""
+    substituir([], linhas)
+
+def remover(linhas):
+    """Subtrai os lançamentos informados dos consolidados"""
+    substituir(linhas, [])
+
+def substituir(anteriores, novas):
+    """Troca os valores anteriores dos lançamentos pelos novos, em um único ajuste"""
+    por_area = defaultdict(lambda: [0, 0, 0.0])
+    por_colaborador = defaultdict(lambda: [0, 0, 0.0])
+    for sinal, linhas in ((-1, anteriores), (1, novas)):
+        for data, area_id, colaborador_id, quantidade, valor in linhas:
+            for acumulado in (por_area[(data, area_id)], por_colaborador[(data, colaborador_id)]):
+                acumulado[0] += sinal
+                acumulado[1] += sinal * (quantidade or 0)
+                acumulado[2] += sinal * (valor or 0)
+
+    _upsert(ProducaoDiariaArea.__table__, 'area_id', por_area)
+    _upsert(ProducaoDiariaColaborador.__table__, 'colaborador_id', por_colaborador)
+    if por_area:
+        versoes_tabelas.incrementar(LancamentosProducao.__tablename__)
+        contadores.lancamentos(anteriores, novas)
+
+    if anteriores:
+        _remover_vazios(ProducaoDiariaArea, {data for data, _ in por_area})
+        _remover_vazios(ProducaoDiariaColaborador, {data for data, _ in por_colaborador})
+
+def _insert(table):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+def _upsert(table, chave, deltas):
+    if not deltas:
+        return
+
+    stmt = _insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.data, table.c[chave]],
+        set_={
+            'quantidade_lancamentos': table.c.quantidade_lancamentos + stmt.excluded.quantidade_lancamentos,
+            'soma_quantidade': table.c.soma_quantidade + stmt.excluded.soma_quantidade,
+            'soma_valor': table.c.soma_valor + stmt.excluded.soma_valor
+        }
+    )
+    db.session.execute(stmt, [
+        {
+            'data': data,
+            chave: valor_chave,
+            'quantidade_lancamentos': quantidade_lancamentos,
+            'soma_quantidade': soma_quantidade,
+            'soma_valor': soma_valor
+        }
+        for (data, valor_chave), (quantidade_lancamentos, soma_quantidade, soma_valor) in deltas.items()
+    ])
+
+def _remover_vazios(model, datas):
+    db.session.execute(
+        db.delete(model).where(model.data.in_(datas), model.quantidade_lancamentos <= 0)
+    )
+
+def reconstruir(conn=None):
+    """Recalcula os consolidados a partir de lancamentos_producao
+
+    Aceita uma conexão (usada pelas migrações); por padrão usa a sessão atual.
+    """
+    conn = conn if conn is not None else db.session
+    for model, chave in ((ProducaoDiariaArea, 'area_id'), (ProducaoDiariaColaborador, 'colaborador_id')):
+        coluna_chave = getattr(LancamentosProducao, chave)
+        conn.execute(db.delete(model))
+        conn.execute(
+            db.insert(model.__table__).from_select(
+                ['data', chave, 'quantidade_lancamentos', 'soma_quantidade', 'soma_valor'],
+                db.select(
+                    LancamentosProducao.data,
+                    coluna_chave,
+                    db.func.count(),
+                    db.func.coalesce(db.func.sum(LancamentosProducao.quantidade_realizada), 0),
+                    db.func.coalesce(db.func.sum(LancamentosProducao.valor_receber), 0)
+                ).group_by(LancamentosProducao.data, coluna_chave)
+            )
+        )
@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from flask import current_app
+from sqlalchemy import event
+from src.models.models import db
+
+class QueryCounter:
+    """Acumula as instruções SQL executadas enquanto o contador está ativo"""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+def _engines(engine):
+    if engine is None:
+        # Engine principal e engine de leitura das rotas @read_only
+        leitura = current_app.extensions.get('db_leitura')
+        return [db.engine] + ([leitura] if leitura is not None else [])
+    if isinstance(engine, (list, tuple)):
+        return list(engine)
+    return [engine]
+
+@contextmanager
+def count_queries(engine=None):
+    """Conta as consultas executadas dentro do bloco
+
+    engine pode ser um engine ou uma lista de engines; por padrão conta o engine
+    principal e o de leitura do app atual.
+
+    Exemplo:
+        with count_queries() as counter:
+            client.get('/api/lancamentos')
+        print(counter.count)
+    """
+    engines = _engines(engine)
+    counter = QueryCounter()
+    for item in engines:
+        event.listen(item, 'before_cursor_execute', counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for item in engines:
+            event.remove(item, 'before_cursor_execute', counter._before_cursor_execute)
+
+@contextmanager
+def assert_max_queries(max_queries, engine=None):
+    """Falha com AssertionError se o bloco executar mais que max_queries consultas
+
+    Usado para garantir que uma rota de listagem executa um número constante de
+    consultas, independente da quantidade de linhas retornadas.
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listagem = '\n'.join(counter.statements)
+        raise AssertionError(
+            f'Esperado no máximo {max_queries} consultas, executadas {counter.count}:\n{listagem}'
+        )
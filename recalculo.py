@@ -0,0 +1,138 @@
+import numpy as np
+from sqlalchemy import bindparam
+from src.models.models import db, LancamentosProducao
+from src.utils import producao_diaria
+from src.utils.meta_resolver import consultar_metas, agrupar_por_area
+
+# Recalculo em lote de saldo/valor_receber dos lançamentos armazenados.
+#
+# Os lançamentos afetados são lidos como colunas, a meta vigente de cada linha é
+# encontrada com np.searchsorted (uma chamada por área) e a fórmula de pagamento
+# de calculos.calcular_saldo_valor é aplicada de forma vetorizada. Somente as
+# linhas alteradas são gravadas, com um único UPDATE executado em lote.
+
+# Quantidade máxima de alterações devolvidas no resumo (diff)
+MAX_ALTERACOES_RESUMO = 100
+
+def _filtrar(query, area_ids=None, data_inicio=None, data_fim=None, lancamento_ids=None):
+    if area_ids is not None:
+        query = query.filter(LancamentosProducao.area_id.in_(area_ids))
+    if lancamento_ids is not None:
+        query = query.filter(LancamentosProducao.id.in_(lancamento_ids))
+    if data_inicio:
+        query = query.filter(LancamentosProducao.data >= data_inicio)
+    if data_fim:
+        query = query.filter(LancamentosProducao.data <= data_fim)
+    return query
+
+def calcular_vetorizado(quantidades, meta_quantidades, valores_unitarios, tem_meta):
+    """Versão vetorizada de calcular_saldo_valor; linhas sem meta (ou com meta <= 0) ficam com saldo e valor zero"""
+    tem_meta = tem_meta & (meta_quantidades > 0)
+    meta_segura = np.where(tem_meta, meta_quantidades, 1)
+    saldo = quantidades - meta_segura
+    valor = np.where(
+        quantidades >= meta_segura,
+        valores_unitarios + saldo * (valores_unitarios / meta_segura),
+        (quantidades / meta_segura) * valores_unitarios
+    )
+    return np.where(tem_meta, saldo, 0).astype(np.int64), np.where(tem_meta, valor, 0.0)
+
+def recalcular_lancamentos(area_ids=None, data_inicio=None, data_fim=None, lancamento_ids=None, dry_run=False):
+    """Recalcula saldo e valor_receber com a meta vigente na data de cada lançamento
+
+    Não faz commit: as alterações (e o ajuste dos consolidados diários) ficam na
+    transação da sessão atual. Com dry_run=True nada é gravado. Retorna um resumo
+    com os totais e as primeiras alterações encontradas.
+    """
+    query = db.session.query(
+        LancamentosProducao.id,
+        LancamentosProducao.data,
+        LancamentosProducao.area_id,
+        LancamentosProducao.colaborador_id,
+        LancamentosProducao.quantidade_realizada,
+        LancamentosProducao.saldo,
+        LancamentosProducao.valor_receber
+    )
+    rows = _filtrar(query, area_ids, data_inicio, data_fim, lancamento_ids).all()
+
+    resumo = {
+        'lancamentos_analisados': len(rows),
+        'lancamentos_alterados': 0,
+        'valor_total_anterior': 0.0,
+        'valor_total_novo': 0.0,
+        'aplicado': False,
+        'alteracoes': []
+    }
+    if not rows:
+        return resumo
+
+    ids, datas, areas, colaboradores, quantidades, saldos, valores = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    areas = np.array(areas, dtype=np.int64)
+    datas_ord = np.array([data.toordinal() for data in datas], dtype=np.int64)
+    quantidades = np.array(quantidades, dtype=np.float64)
+    saldos_anteriores = np.array(saldos, dtype=np.float64)
+    valores_anteriores = np.array(valores, dtype=np.float64)
+
+    # Meta vigente de cada linha: busca binária por área sobre as datas de vigência
+    meta_quantidades = np.zeros(len(rows), dtype=np.float64)
+    valores_unitarios = np.zeros(len(rows), dtype=np.float64)
+    tem_meta = np.zeros(len(rows), dtype=bool)
+    metas_por_area = agrupar_por_area(consultar_metas(np.unique(areas).tolist()))
+    for area_id, (vigencias, metas) in metas_por_area.items():
+        mascara = areas == area_id
+        if not mascara.any():
+            continue
+        vigencias_ord = np.array([vigencia.toordinal() for vigencia in vigencias], dtype=np.int64)
+        posicoes = np.searchsorted(vigencias_ord, datas_ord[mascara], side='right') - 1
+        vigente = posicoes >= 0
+        posicoes = np.clip(posicoes, 0, None)
+        meta_quantidades[mascara] = np.array([m.meta_quantidade for m in metas], dtype=np.float64)[posicoes]
+        valores_unitarios[mascara] = np.array([m.valor_unitario for m in metas], dtype=np.float64)[posicoes]
+        tem_meta[mascara] = vigente
+
+    saldos_novos, valores_novos = calcular_vetorizado(quantidades, meta_quantidades, valores_unitarios, tem_meta)
+
+    # Valores nulos (NaN) na base sempre contam como alterados
+    alterados = (saldos_anteriores != saldos_novos) | ~np.isclose(valores_anteriores, valores_novos)
+    indices = np.flatnonzero(alterados)
+
+    resumo['lancamentos_alterados'] = int(indices.size)
+    resumo['valor_total_anterior'] = float(np.nansum(valores_anteriores))
+    resumo['valor_total_novo'] = float(valores_novos.sum())
+    resumo['alteracoes'] = [
+        {
+            'id': int(ids[i]),
+            'data': datas[i].isoformat(),
+            'area_id': int(areas[i]),
+            'colaborador_id': colaboradores[i],
+            'saldo_anterior': rows[i].saldo,
+            'saldo_novo': int(saldos_novos[i]),
+            'valor_anterior': rows[i].valor_receber,
+            'valor_novo': float(valores_novos[i])
+        }
+        for i in indices[:MAX_ALTERACOES_RESUMO]
+    ]
+
+    if dry_run or not indices.size:
+        return resumo
+
+    tabela = LancamentosProducao.__table__
+    db.session.execute(
+        tabela.update().where(tabela.c.id == bindparam('b_id')).values(
+            saldo=bindparam('b_saldo'),
+            valor_receber=bindparam('b_valor')
+        ),
+        [
+            {'b_id': b_id, 'b_saldo': b_saldo, 'b_valor': b_valor}
+            for b_id, b_saldo, b_valor in zip(
+                ids[indices].tolist(), saldos_novos[indices].tolist(), valores_novos[indices].tolist()
+            )
+        ]
+    )
+    producao_diaria.substituir(
+        [(datas[i], rows[i].area_id, colaboradores[i], rows[i].quantidade_realizada, rows[i].valor_receber) for i in indices],
+        [(datas[i], rows[i].area_id, colaboradores[i], rows[i].quantidade_realizada, float(valores_novos[i])) for i in indices]
+    )
+    resumo['aplicado'] = True
+    return resumo
@@ -0,0 +1,88 @@
+from src.models.models import db, AreasProducao, Colaboradores, Metas, LancamentosProducao, ObservacoesColaborador
+
+# Serialização das rotas de listagem a partir de projeções de colunas com JOIN.
+# As linhas retornadas são tuplas nomeadas, sem hidratar objetos do ORM, de modo
+# que a listagem executa sempre uma única consulta, independente do número de linhas.
+# Os dicionários gerados têm o mesmo formato de to_dict() dos modelos.
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def lancamentos_query():
+    """Projeção de LancamentosProducao com os nomes de área e colaborador"""
+    return db.session.query(
+        LancamentosProducao.id,
+        LancamentosProducao.data,
+        LancamentosProducao.area_id,
+        AreasProducao.nome.label('area_nome'),
+        LancamentosProducao.colaborador_id,
+        Colaboradores.nome.label('colaborador_nome'),
+        LancamentosProducao.quantidade_realizada,
+        LancamentosProducao.saldo,
+        LancamentosProducao.valor_receber
+    ).outerjoin(
+        AreasProducao, AreasProducao.id == LancamentosProducao.area_id
+    ).outerjoin(
+        Colaboradores, Colaboradores.id == LancamentosProducao.colaborador_id
+    )
+
+def lancamento_row_to_dict(row):
+    return {
+        'id': row.id,
+        'data': _isoformat(row.data),
+        'area_id': row.area_id,
+        'area_nome': row.area_nome,
+        'colaborador_id': row.colaborador_id,
+        'colaborador_nome': row.colaborador_nome,
+        'quantidade_realizada': row.quantidade_realizada,
+        'saldo': row.saldo,
+        'valor_receber': row.valor_receber
+    }
+
+def metas_query():
+    """Projeção de Metas com o nome da área"""
+    return db.session.query(
+        Metas.id,
+        Metas.nome,
+        Metas.area_id,
+        AreasProducao.nome.label('area_nome'),
+        Metas.meta_quantidade,
+        Metas.valor_unitario,
+        Metas.data_vigencia
+    ).outerjoin(
+        AreasProducao, AreasProducao.id == Metas.area_id
+    )
+
+def meta_row_to_dict(row):
+    return {
+        'id': row.id,
+        'nome': row.nome,
+        'area_id': row.area_id,
+        'area_nome': row.area_nome,
+        'meta_quantidade': row.meta_quantidade,
+        'valor_unitario': row.valor_unitario,
+        'data_vigencia': _isoformat(row.data_vigencia)
+    }
+
+def observacoes_query():
+    """Projeção de ObservacoesColaborador com o nome do colaborador"""
+    return db.session.query(
+        ObservacoesColaborador.id,
+        ObservacoesColaborador.colaborador_id,
+        Colaboradores.nome.label('colaborador_nome'),
+        ObservacoesColaborador.data,
+        ObservacoesColaborador.tipo_observacao,
+        ObservacoesColaborador.descricao
+    ).outerjoin(
+        Colaboradores, Colaboradores.id == ObservacoesColaborador.colaborador_id
+    )
+
+def observacao_row_to_dict(row):
+    return {
+        'id': row.id,
+        'colaborador_id': row.colaborador_id,
+        'colaborador_nome': row.colaborador_nome,
+        'data': _isoformat(row.data),
+        'tipo_observacao': row.tipo_observacao,
+        'descricao': row.descricao
+    }
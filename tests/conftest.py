@@ -0,0 +1,145 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+import pytest
+
+# Os módulos são importados como src.models.*, src.routes.* e src.utils.* (ver
+# main.py), mas ficam na raiz do repositório. Antes de importar a aplicação, a
+# estrutura do pacote src é montada em um diretório temporário com links
+# simbólicos para os arquivos do repositório.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELOS = ('models', 'user', 'migrations')
+# main.py fica em src/; read_excel.py é um script
+FORA_DOS_PACOTES = ('main', 'read_excel')
+
+def _montar_pacote(destino):
+    for pacote in ('src', 'src/models', 'src/routes', 'src/utils'):
+        os.makedirs(os.path.join(destino, pacote))
+        open(os.path.join(destino, pacote, '__init__.py'), 'w').close()
+    for nome in sorted(os.listdir(RAIZ)):
+        modulo, extensao = os.path.splitext(nome)
+        if extensao != '.py' or modulo in FORA_DOS_PACOTES:
+            continue
+        with open(os.path.join(RAIZ, nome), encoding='utf-8') as arquivo:
+            rotas = '= Blueprint(' in arquivo.read()
+        pacote = 'models' if modulo in MODELOS else 'routes' if rotas else 'utils'
+        os.symlink(os.path.join(RAIZ, nome), os.path.join(destino, 'src', pacote, nome))
+    os.symlink(os.path.join(RAIZ, 'main.py'), os.path.join(destino, 'src', 'main.py'))
+
+_PACOTE = tempfile.mkdtemp(prefix='sys-src-')
+_montar_pacote(_PACOTE)
+atexit.register(shutil.rmtree, _PACOTE, True)
+sys.path.insert(0, _PACOTE)
+
+from src.main import create_app
+from src.models.models import db
+from src.models.migrations import run_migrations
+from src.models.user import User
+from src.routes.dashboard import limpar_cache as limpar_cache_dashboard
+from src.utils.ausencias import indice_ausencias
+from src.utils.meta_resolver import meta_resolver
+from src.utils.metricas import metricas
+from src.utils.user_cache import user_cache
+from src.utils.versoes import versoes_tabelas, limpar_listagens
+
+SENHA = 'senha-teste'
+
+def pytest_configure(config):
+    # Query.get() ainda é usado pelas rotas
+    config.addinivalue_line('filterwarnings', 'ignore::sqlalchemy.exc.LegacyAPIWarning')
+
+def _limpar_caches():
+    # Caches por processo que sobrevivem de um app (banco) para o outro
+    versoes_tabelas.invalidar()
+    limpar_listagens()
+    limpar_cache_dashboard()
+    meta_resolver.invalidar()
+    indice_ausencias.invalidar()
+    user_cache.clear()
+    metricas.limpar()
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App com um banco SQLite novo, migrado, e engine de leitura separado"""
+    for variavel in ('DATABASE_READ_URL', 'WRITE_BEHIND', 'METRICS_TOKEN', 'METRICS_PUBLIC'):
+        monkeypatch.delenv(variavel, raising=False)
+    app = create_app({
+        'TESTING': True,
+        'AQUECER_CACHES': False,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+        'JOBS_DIR': str(tmp_path / 'jobs')
+    })
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+    _limpar_caches()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    leitura = app.extensions.get('db_leitura')
+    if leitura is not None:
+        leitura.dispose()
+
+@pytest.fixture
+def criar_usuario(app):
+    """Cria um usuário com o papel informado e devolve um cliente autenticado"""
+    def criar(username, role='user'):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@teste', role=role)
+            user.set_password(SENHA)
+            db.session.add(user)
+            db.session.commit()
+        return login(app, username)
+    return criar
+
+def login(app, username):
+    cliente = app.test_client()
+    resposta = cliente.post('/api/login', json={'username': username, 'password': SENHA})
+    assert resposta.status_code == 200, resposta.get_json()
+    return cliente
+
+@pytest.fixture
+def admin(criar_usuario):
+    return criar_usuario('admin', role='admin')
+
+@pytest.fixture
+def popular(admin):
+    """Cria duas áreas com meta, dois colaboradores e um lançamento por área e colaborador por dia"""
+    def popular(dias=5, mes='2024-03'):
+        areas = [admin.post('/api/areas', json={'nome': nome}).get_json()['id'] for nome in ('Alça', 'Fundo')]
+        colaboradores = [
+            admin.post('/api/colaboradores', json={'nome': nome}).get_json()['id'] for nome in ('Maria', 'Jaine')
+        ]
+        for area_id, meta_quantidade, valor_unitario in zip(areas, (160, 280), (350, 200)):
+            resposta = admin.post('/api/metas', json={
+                'nome': f'Meta {area_id}', 'area_id': area_id, 'meta_quantidade': meta_quantidade,
+                'valor_unitario': valor_unitario, 'data_vigencia': '2024-01-01'
+            })
+            assert resposta.status_code == 201, resposta.get_json()
+        lancamentos = [
+            {'data': f'{mes}-{dia:02d}', 'area_id': area_id, 'colaborador_id': colaborador_id,
+             'quantidade_realizada': 100 + dia * 10}
+            for dia in range(1, dias + 1) for area_id in areas for colaborador_id in colaboradores
+        ]
+        if lancamentos:
+            resposta = admin.post('/api/lancamentos/bulk', json=lancamentos)
+            assert resposta.status_code in (200, 201), resposta.get_json()
+        return {'areas': areas, 'colaboradores': colaboradores}
+    return popular
+
+@pytest.fixture
+def aguardar_job():
+    """Consulta o job até ele terminar e devolve a última situação"""
+    def aguardar(cliente, job_id, timeout=30):
+        limite = time.monotonic() + timeout
+        while True:
+            job = cliente.get(f'/api/jobs/{job_id}').get_json()
+            if job['status'] in ('concluido', 'erro') or time.monotonic() > limite:
+                return job
+            time.sleep(0.05)
+    return aguardar
@@ -0,0 +1,59 @@
+from datetime import date
+from src.utils.ausencias import Ausencia, agrupar_intervalos, indice_ausencias
+
+def test_agrupa_dias_consecutivos_do_mesmo_tipo():
+    por_colaborador = agrupar_intervalos([
+        (1, date(2024, 3, 2), 'férias'),
+        (1, date(2024, 3, 1), 'férias'),
+        (1, date(2024, 3, 3), 'falta'),
+        (1, date(2024, 3, 5), 'falta'),
+        (2, date(2024, 3, 1), 'atestado'),
+    ])
+    assert por_colaborador[1][1] == [
+        Ausencia('férias', date(2024, 3, 1), date(2024, 3, 2)),
+        Ausencia('falta', date(2024, 3, 3), date(2024, 3, 3)),
+        Ausencia('falta', date(2024, 3, 5), date(2024, 3, 5)),
+    ]
+    assert por_colaborador[2][1] == [Ausencia('atestado', date(2024, 3, 1), date(2024, 3, 1))]
+
+def _observacao(admin, colaborador_id, data, tipo):
+    resposta = admin.post('/api/observacoes', json={
+        'colaborador_id': colaborador_id, 'data': data, 'tipo_observacao': tipo, 'descricao': ''
+    })
+    assert resposta.status_code == 201
+    return resposta.get_json()['id']
+
+def test_lancamento_rejeitado_no_dia_de_ausencia(admin, popular):
+    dados = popular(dias=0)
+    area_id, colaborador_id = dados['areas'][0], dados['colaboradores'][0]
+    _observacao(admin, colaborador_id, '2024-04-01', 'férias')
+    _observacao(admin, colaborador_id, '2024-04-02', 'férias')
+    
+    lancamento = {'data': '2024-04-02', 'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': 10}
+    resposta = admin.post('/api/lancamentos', json=lancamento)
+    assert resposta.status_code == 400
+    assert resposta.get_json()['error'] == 'Colaborador ausente (férias) de 2024-04-01 a 2024-04-02'
+    
+    # Treinamento não é ausência
+    _observacao(admin, colaborador_id, '2024-04-03', 'treinamento')
+    assert admin.post('/api/lancamentos', json=dict(lancamento, data='2024-04-03')).status_code == 201
+
+def test_indice_acompanha_as_escritas(app, admin, popular):
+    dados = popular(dias=0)
+    colaborador_id = dados['colaboradores'][0]
+    observacao_id = _observacao(admin, colaborador_id, '2024-04-01', 'falta')
+    with app.app_context():
+        assert not indice_ausencias.presente(colaborador_id, date(2024, 4, 1))
+    
+    admin.delete(f'/api/observacoes/{observacao_id}')
+    with app.app_context():
+        assert indice_ausencias.presente(colaborador_id, date(2024, 4, 1))
+
+def test_presentes_e_ausentes_na_data(admin, popular):
+    dados = popular(dias=0)
+    maria, jaine = dados['colaboradores']
+    _observacao(admin, jaine, '2024-04-01', 'licença')
+    
+    resposta = admin.get('/api/colaboradores/presentes?data=2024-04-01').get_json()
+    assert [colaborador['id'] for colaborador in resposta['presentes']] == [maria]
+    assert [(colaborador['id'], colaborador['tipo_observacao']) for colaborador in resposta['ausentes']] == [(jaine, 'licença')]
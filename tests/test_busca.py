@@ -0,0 +1,52 @@
+from src.utils.busca import _filtrar_like
+from src.utils.serializers import observacoes_query
+
+def _observacao(admin, colaborador_id, descricao, data='2024-04-01'):
+    resposta = admin.post('/api/observacoes', json={
+        'colaborador_id': colaborador_id, 'data': data, 'tipo_observacao': 'outros', 'descricao': descricao
+    })
+    assert resposta.status_code == 201
+    return resposta.get_json()['id']
+
+def _buscar(admin, texto):
+    resposta = admin.get('/api/observacoes', query_string={'q': texto})
+    assert resposta.status_code == 200
+    return [item['id'] for item in resposta.get_json()['items']]
+
+def test_busca_ignora_acentos_e_aceita_prefixos(admin, popular):
+    colaborador_id = popular(dias=0)['colaboradores'][0]
+    manutencao = _observacao(admin, colaborador_id, 'Máquina parada para Manutenção preventiva')
+    _observacao(admin, colaborador_id, 'Treinamento de segurança')
+    
+    assert _buscar(admin, 'manutencao') == [manutencao]
+    assert _buscar(admin, 'maqu prev') == [manutencao]
+    assert _buscar(admin, 'manutencao segurança') == []
+
+def test_triggers_mantem_o_indice(admin, popular):
+    colaborador_id = popular(dias=0)['colaboradores'][0]
+    observacao_id = _observacao(admin, colaborador_id, 'Atraso no transporte')
+    assert _buscar(admin, 'transporte') == [observacao_id]
+    
+    admin.put(f'/api/observacoes/{observacao_id}', json={'descricao': 'Consulta médica'})
+    assert _buscar(admin, 'transporte') == []
+    assert _buscar(admin, 'medica') == [observacao_id]
+    
+    admin.delete(f'/api/observacoes/{observacao_id}')
+    assert _buscar(admin, 'medica') == []
+
+def test_operadores_do_fts_sao_tratados_como_texto(admin, popular):
+    colaborador_id = popular(dias=0)['colaboradores'][0]
+    _observacao(admin, colaborador_id, 'Falta de material')
+    assert admin.get('/api/observacoes', query_string={'q': 'material" OR NEAR('}).status_code == 200
+
+def test_busca_sem_fts_nao_trata_sublinhado_como_curinga(app, admin, popular):
+    colaborador_id = popular(dias=0)['colaboradores'][0]
+    exato = _observacao(admin, colaborador_id, 'Erro no campo lote_b do sistema')
+    _observacao(admin, colaborador_id, 'Erro no campo loteXb do sistema')
+    desconto = _observacao(admin, colaborador_id, 'Desconto de 50% aplicado')
+    
+    # Caminho usado nos bancos sem FTS5
+    with app.app_context():
+        assert [row.id for row in _filtrar_like(observacoes_query(), ['lote_b'])] == [exato]
+        assert [row.id for row in _filtrar_like(observacoes_query(), ['de%'])] == []
+        assert [row.id for row in _filtrar_like(observacoes_query(), ['50%'])] == [desconto]
@@ -0,0 +1,64 @@
+import pytest
+from src.utils.query_counter import assert_max_queries, count_queries
+
+# Listagens e relatórios executam um número constante de consultas, independente do
+# tamanho da página ou da quantidade de linhas agrupadas. Os contadores incluem o
+# engine principal e o de leitura (rotas @read_only).
+
+LIMITE_CONSULTAS = 3
+
+ROTAS = (
+    '/api/lancamentos?limit=5',
+    '/api/lancamentos?limit=200',
+    '/api/lancamentos',
+    '/api/relatorios/producao-colaborador?data_inicio=2024-03-01&data_fim=2024-03-31',
+    '/api/relatorios/producao-area?data_inicio=2024-03-01&data_fim=2024-03-31',
+    '/api/relatorios/producao-colaborador?periodo=a:2024-03-01:2024-03-15&periodo=b:2024-03-16:2024-03-31',
+)
+
+def _consultas(app, cliente, rota):
+    with app.app_context(), assert_max_queries(LIMITE_CONSULTAS) as contador:
+        resposta = cliente.get(rota)
+        assert resposta.status_code == 200, resposta.get_json()
+        resposta.get_data()
+    return contador.count
+
+def _mais_colaboradores(admin, areas, quantidade):
+    lancamentos = []
+    for indice in range(quantidade):
+        colaborador_id = admin.post('/api/colaboradores', json={'nome': f'Extra {indice}'}).get_json()['id']
+        lancamentos += [
+            {'data': f'2024-03-{dia:02d}', 'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': 150}
+            for dia in range(1, 31) for area_id in areas
+        ]
+    assert admin.post('/api/lancamentos/bulk', json=lancamentos).status_code in (200, 201)
+
+@pytest.mark.parametrize('rota', ROTAS)
+def test_consultas_nao_crescem_com_as_linhas(app, admin, popular, rota):
+    dados = popular(dias=3)
+    admin.get(rota)
+    antes = _consultas(app, admin, rota)
+    
+    _mais_colaboradores(admin, dados['areas'], 15)
+    admin.get(rota)
+    depois = _consultas(app, admin, rota)
+    
+    assert 0 < antes == depois
+
+def test_conta_engine_de_leitura(app, admin, popular):
+    popular(dias=1)
+    with app.app_context():
+        leitura = app.extensions['db_leitura']
+        assert leitura is not None
+        with count_queries(leitura) as somente_leitura, count_queries() as todos:
+            admin.get('/api/lancamentos?limit=5')
+    assert somente_leitura.count > 0
+    assert todos.count >= somente_leitura.count
+
+def test_assert_max_queries_falha_acima_do_limite(app):
+    with app.app_context():
+        from src.models.models import db
+        with pytest.raises(AssertionError):
+            with assert_max_queries(1):
+                db.session.execute(db.text('SELECT 1'))
+                db.session.execute(db.text('SELECT 2'))
@@ -0,0 +1,87 @@
+from src.models.models import db, AreasProducao, Colaboradores
+from src.utils import contadores
+from src.utils.gerador import gerar_dados
+
+def _totais(app):
+    with app.app_context():
+        db.session.expire_all()
+        return (
+            [(a.id, a.total_metas, a.total_lancamentos) for a in AreasProducao.query.order_by(AreasProducao.id)],
+            [(c.id, c.total_lancamentos, c.total_observacoes) for c in Colaboradores.query.order_by(Colaboradores.id)]
+        )
+
+def _reconstruidos(app):
+    with app.app_context():
+        contadores.reconstruir()
+        db.session.expire_all()
+        totais = (
+            [(a.id, a.total_metas, a.total_lancamentos) for a in AreasProducao.query.order_by(AreasProducao.id)],
+            [(c.id, c.total_lancamentos, c.total_observacoes) for c in Colaboradores.query.order_by(Colaboradores.id)]
+        )
+        db.session.rollback()
+        return totais
+
+def test_contadores_acompanham_todas_as_escritas(app, admin, popular):
+    dados = popular(dias=4)
+    (alca, fundo), (maria, jaine) = dados['areas'], dados['colaboradores']
+    assert _totais(app) == ([(alca, 1, 8), (fundo, 1, 8)], [(maria, 8, 0), (jaine, 8, 0)])
+    
+    observacao_id = admin.post('/api/observacoes', json={
+        'colaborador_id': maria, 'data': '2024-04-10', 'tipo_observacao': 'outros'
+    }).get_json()['id']
+    admin.put(f'/api/observacoes/{observacao_id}', json={'colaborador_id': jaine})
+    meta_id = admin.post('/api/metas', json={
+        'nome': 'Nova', 'area_id': alca, 'meta_quantidade': 10, 'valor_unitario': 1, 'data_vigencia': '2025-01-01'
+    }).get_json()['id']
+    admin.put(f'/api/metas/{meta_id}', json={'area_id': fundo})
+    lancamento_id = admin.post('/api/lancamentos', json={
+        'data': '2024-04-01', 'area_id': alca, 'colaborador_id': maria, 'quantidade_realizada': 5
+    }).get_json()['id']
+    admin.put(f'/api/lancamentos/{lancamento_id}', json={'area_id': fundo, 'colaborador_id': jaine})
+    admin.patch('/api/lancamentos', json={
+        'filtro': {'data_inicio': '2024-03-01', 'data_fim': '2024-03-02', 'area_id': alca, 'colaborador_id': maria},
+        'alteracoes': {'data': '2024-05-01'}
+    })
+    admin.delete('/api/lancamentos', json={'filtro': {'data_inicio': '2024-03-04', 'data_fim': '2024-03-04'}})
+    
+    assert _totais(app) == ([(alca, 1, 6), (fundo, 2, 7)], [(maria, 6, 0), (jaine, 7, 1)])
+    assert _totais(app) == _reconstruidos(app)
+    
+    admin.delete(f'/api/metas/{meta_id}')
+    admin.delete(f'/api/observacoes/{observacao_id}')
+    assert _totais(app) == ([(alca, 1, 6), (fundo, 1, 7)], [(maria, 6, 0), (jaine, 7, 0)])
+
+def test_contadores_com_escrita_agrupada(app, admin, popular):
+    app.config['WRITE_BEHIND'] = True
+    dados = popular(dias=0)
+    for dia in range(1, 6):
+        admin.post('/api/lancamentos', json={
+            'data': f'2024-04-{dia:02d}', 'area_id': dados['areas'][0], 'colaborador_id': dados['colaboradores'][0],
+            'quantidade_realizada': dia
+        })
+    assert _totais(app)[0][0][2] == 5
+    assert _totais(app) == _reconstruidos(app)
+
+def test_contadores_do_gerador(app):
+    with app.app_context():
+        gerar_dados(areas=2, colaboradores=5, anos=0.05, observacoes=20, prefixo='Teste')
+    totais = _totais(app)
+    assert sum(total for _, _, total in totais[0]) > 0
+    assert totais == _reconstruidos(app)
+
+def test_exclusao_bloqueada_pelos_contadores(admin, popular):
+    dados = popular(dias=1)
+    vazia = admin.post('/api/areas', json={'nome': 'Vazia'}).get_json()['id']
+    sem_lancamentos = admin.post('/api/colaboradores', json={'nome': 'Novo'}).get_json()['id']
+    
+    assert admin.delete(f"/api/areas/{dados['areas'][0]}").status_code == 400
+    assert admin.delete(f"/api/colaboradores/{dados['colaboradores'][0]}").status_code == 400
+    assert admin.delete(f'/api/areas/{vazia}').status_code == 200
+    assert admin.delete(f'/api/colaboradores/{sem_lancamentos}').status_code == 200
+
+def test_totais_nas_listagens(admin, popular):
+    popular(dias=2)
+    areas = admin.get('/api/areas').get_json()
+    colaboradores = admin.get('/api/colaboradores').get_json()
+    assert {(area['total_metas'], area['total_lancamentos']) for area in areas} == {(1, 4)}
+    assert {(c['total_lancamentos'], c['total_observacoes']) for c in colaboradores} == {(4, 0)}
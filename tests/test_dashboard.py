@@ -0,0 +1,34 @@
+def _area(resumo, area_id):
+    return next(area for area in resumo['areas'] if area['area_id'] == area_id)
+
+def test_resumo_do_dia_e_do_mes(admin, popular):
+    dados = popular(dias=3)
+    resumo = admin.get('/api/dashboard/summary', query_string={'data': '2024-03-03'}).get_json()
+    
+    assert resumo['totais'] == {'areas': 2, 'colaboradores': 2, 'metas': 2, 'lancamentos': 12}
+    alca = _area(resumo, dados['areas'][0])
+    assert (alca['hoje']['lancamentos'], alca['hoje']['quantidade'], alca['hoje']['meta_esperada']) == (2, 260, 320)
+    assert alca['hoje']['atingimento'] == 81.25
+    assert alca['mes']['quantidade'] == 2 * (110 + 120 + 130)
+    assert alca['meta_quantidade'] == 160
+    assert len(resumo['top_produtores']) == 2
+
+def test_escritas_aparecem_no_resumo_sem_esperar(admin, popular):
+    dados = popular(dias=2)
+    alca, _ = dados['areas']
+    maria, _ = dados['colaboradores']
+    parametros = {'data': '2024-03-02'}
+    antes = admin.get('/api/dashboard/summary', query_string=parametros).get_json()
+    assert admin.get('/api/dashboard/summary', query_string=parametros).get_json() == antes
+    
+    lancamento = admin.get('/api/lancamentos', query_string={
+        'data_inicio': '2024-03-02', 'data_fim': '2024-03-02', 'area_id': alca, 'colaborador_id': maria, 'limit': 1
+    }).get_json()['items'][0]
+    assert admin.put(f"/api/lancamentos/{lancamento['id']}", json={'quantidade_realizada': 500}).status_code == 200
+    
+    depois = admin.get('/api/dashboard/summary', query_string=parametros).get_json()
+    assert _area(depois, alca)['hoje']['quantidade'] == _area(antes, alca)['hoje']['quantidade'] - 120 + 500
+    
+    admin.post('/api/observacoes', json={'colaborador_id': maria, 'data': '2024-03-01', 'tipo_observacao': 'falta'})
+    resumo = admin.get('/api/dashboard/summary', query_string=parametros).get_json()
+    assert resumo['observacoes_recentes']['total'] == 1
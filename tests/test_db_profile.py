@@ -0,0 +1,25 @@
+from src.main import create_app
+from src.models.models import db
+
+def _criar(config=None):
+    app = create_app(dict({'TESTING': True, 'AQUECER_CACHES': False}, **(config or {})))
+    with app.app_context():
+        url = db.engine.url
+        db.engine.dispose()
+    app.extensions['db_leitura'].dispose()
+    return url
+
+def test_configuracao_explicita_tem_precedencia_sobre_o_ambiente(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'ambiente.db'}")
+    url = _criar({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'config.db'}"})
+    assert url.database == str(tmp_path / 'config.db')
+
+def test_ambiente_vale_sem_configuracao(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'ambiente.db'}")
+    assert _criar().database == str(tmp_path / 'ambiente.db')
+
+def test_engine_de_leitura_somente_leitura(app):
+    leitura = app.extensions['db_leitura']
+    with leitura.connect() as conexao:
+        assert conexao.exec_driver_sql('PRAGMA query_only').scalar() == 1
+        assert conexao.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
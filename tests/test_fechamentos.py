@@ -0,0 +1,51 @@
+from datetime import date
+from src.models.models import db, AreasProducao, Colaboradores, LancamentosProducao
+from src.utils.fechamento import fechar_mes, limitar_processos, _calcular_todos
+
+def test_fechamento_pela_api_executa_como_job(admin, popular, aguardar_job):
+    popular(dias=5)
+    resposta = admin.post('/api/fechamentos', json={'competencia': '2024-03', 'processos': 1000})
+    assert resposta.status_code == 202
+    
+    job = aguardar_job(admin, resposta.get_json()['id'])
+    assert job['status'] == 'concluido', job
+    resultado = admin.get(job['resultado_url']).get_json()
+    assert resultado['quantidade_colaboradores'] == 2
+    assert resultado['total_produzido'] == sum(4 * (100 + dia * 10) for dia in range(1, 6))
+    
+    # Mês já fechado: devolvido diretamente, sem novo job
+    resposta = admin.post('/api/fechamentos', json={'competencia': '2024-03'})
+    assert resposta.status_code == 200
+    assert resposta.get_json()['total_produzido'] == resultado['total_produzido']
+
+def test_fechamento_valida_competencia(admin):
+    assert admin.post('/api/fechamentos', json={'competencia': '03/2024'}).status_code == 400
+    proximo_ano = date.today().year + 1
+    assert admin.post('/api/fechamentos', json={'competencia': f'{proximo_ano}-01'}).status_code == 400
+
+def test_processos_limitados_pela_configuracao(app):
+    app.config['FECHAMENTO_MAX_PROCESSOS'] = 2
+    with app.app_context():
+        assert limitar_processos(1000) == 2
+        assert limitar_processos(None) <= 2
+        assert limitar_processos(-5) == 1
+
+def test_calculo_em_processos_igual_ao_sequencial(app):
+    with app.app_context():
+        db.session.execute(db.insert(Colaboradores), [{'nome': f'Colaborador {i:03d}'} for i in range(120)])
+        db.session.add(AreasProducao(nome='Área'))
+        db.session.flush()
+        area_id = AreasProducao.query.first().id
+        db.session.execute(db.insert(LancamentosProducao), [
+            {'data': date(2024, 3, 1 + i % 28), 'area_id': area_id, 'colaborador_id': colaborador_id,
+             'quantidade_realizada': i, 'saldo': 0, 'valor_receber': float(i)}
+            for i, (colaborador_id,) in enumerate(db.session.query(Colaboradores.id))
+        ])
+        db.session.commit()
+        
+        sequencial = _calcular_todos(date(2024, 3, 1), date(2024, 3, 31), 1)
+        paralelo = _calcular_todos(date(2024, 3, 1), date(2024, 3, 31), 2)
+        assert sorted(sequencial, key=lambda l: l['colaborador_id']) == sorted(paralelo, key=lambda l: l['colaborador_id'])
+        
+        fechamento, criado = fechar_mes('2024-03', processos=2)
+        assert criado and fechamento.quantidade_colaboradores == 120
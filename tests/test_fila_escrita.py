@@ -0,0 +1,102 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import pytest
+from flask import Flask
+from src.models.models import db, LancamentosProducao, ProducaoDiariaArea, ProducaoDiariaColaborador
+from src.utils.fila_escrita import fila_escrita
+
+@pytest.fixture(params=[False, True], ids=['direto', 'write-behind'])
+def modo(request, app):
+    app.config['WRITE_BEHIND'] = request.param
+    return request.param
+
+def _paralelo(app, admin, requisicoes, threads=16):
+    cookie = admin.get_cookie('session').value
+    def enviar(requisicao):
+        metodo, rota, corpo = requisicao
+        cliente = app.test_client()
+        cliente.set_cookie('session', cookie)
+        resposta = cliente.open(rota, method=metodo, json=corpo)
+        return resposta.status_code, resposta.get_json()
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(enviar, requisicoes))
+
+def _consolidados_consistentes(app):
+    with app.app_context():
+        linhas = db.session.query(db.func.count(), db.func.sum(LancamentosProducao.quantidade_realizada)).one()
+        for consolidado in (ProducaoDiariaArea, ProducaoDiariaColaborador):
+            assert db.session.query(
+                db.func.sum(consolidado.quantidade_lancamentos), db.func.sum(consolidado.soma_quantidade)
+            ).one() == tuple(linhas)
+        return linhas[0]
+
+def test_escritas_concorrentes(app, admin, popular, modo):
+    dados = popular(dias=0)
+    area_id, colaborador_id = dados['areas'][0], dados['colaboradores'][0]
+    # Cada data é enviada duas vezes: exatamente uma das duas é gravada
+    requisicoes = [
+        ('POST', '/api/lancamentos', {
+            'data': (date(2025, 1, 1) + timedelta(days=indice // 2)).isoformat(),
+            'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': indice
+        })
+        for indice in range(200)
+    ]
+    resultados = _paralelo(app, admin, requisicoes)
+    
+    status = [codigo for codigo, _ in resultados]
+    assert status.count(201) == 100
+    assert status.count(400) == 100
+    assert all(corpo['error'] == 'Já existe um lançamento para este colaborador, área e data'
+               for codigo, corpo in resultados if codigo == 400)
+    assert _consolidados_consistentes(app) == 100
+    
+    criados = [corpo['id'] for codigo, corpo in resultados if codigo == 201]
+    alteracoes = [('PUT', f'/api/lancamentos/{id}', {'quantidade_realizada': 1}) for id in criados[:50]]
+    remocoes = [('DELETE', f'/api/lancamentos/{id}', None) for id in criados[50:]]
+    assert {codigo for codigo, _ in _paralelo(app, admin, alteracoes + remocoes)} == {200}
+    assert _consolidados_consistentes(app) == 50
+    with app.app_context():
+        assert db.session.query(db.func.sum(LancamentosProducao.quantidade_realizada)).scalar() == 50
+
+def test_erro_de_uma_escrita_nao_desfaz_o_lote(app, admin, popular):
+    app.config['WRITE_BEHIND'] = True
+    app.config['WRITE_BEHIND_WINDOW_MS'] = 200
+    dados = popular(dias=0)
+    area_id, colaborador_id = dados['areas'][0], dados['colaboradores'][0]
+    lancamento = {'data': '2025-01-01', 'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': 1}
+    admin.post('/api/lancamentos', json=lancamento)
+    
+    requisicoes = [('POST', '/api/lancamentos', lancamento)] + [
+        ('POST', '/api/lancamentos', dict(lancamento, data=f'2025-02-{dia:02d}')) for dia in range(1, 11)
+    ]
+    status = [codigo for codigo, _ in _paralelo(app, admin, requisicoes)]
+    assert status == [400] + [201] * 10
+    assert _consolidados_consistentes(app) == 11
+
+def test_lancamento_removido_antes_da_gravacao_responde_404(app, admin, popular, modo):
+    popular(dias=1)
+    lancamento_id = admin.get('/api/lancamentos', query_string={'limit': 1}).get_json()['items'][0]['id']
+    
+    # As remoções concorrentes passam pela verificação inicial; só uma encontra o lançamento ao gravar
+    resultados = _paralelo(app, admin, [('DELETE', f'/api/lancamentos/{lancamento_id}', None)] * 16)
+    status = [codigo for codigo, _ in resultados]
+    assert status.count(200) == 1
+    assert set(status) == {200, 404}
+    assert _consolidados_consistentes(app) == 3
+    
+    assert admin.put(f'/api/lancamentos/{lancamento_id}', json={'quantidade_realizada': 1}).status_code == 404
+    assert admin.delete(f'/api/lancamentos/{lancamento_id}').status_code == 404
+
+def _threads_de_escrita():
+    return [thread for thread in threading.enumerate() if thread.name == 'fila-escrita']
+
+def test_fila_de_outro_app_encerra_a_thread_anterior(app):
+    fila_escrita._obter_fila(app)
+    fila_escrita._obter_fila(Flask('outro'))
+    
+    limite = time.monotonic() + 5
+    while len(_threads_de_escrita()) > 1 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert len(_threads_de_escrita()) == 1
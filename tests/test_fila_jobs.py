@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timedelta
+from src.models.models import db, Job
+from src.utils.fila_jobs import RETENCAO_DIAS
+
+ROTA = '/api/relatorios/producao-area?data_inicio=2024-03-01&data_fim=2024-03-31'
+
+def _enviar(cliente, rota=ROTA):
+    resposta = cliente.get(rota + '&async=1')
+    assert resposta.status_code in (200, 202), resposta.get_json()
+    return resposta.get_json()
+
+def test_resultado_do_job_igual_ao_sincrono(admin, popular, aguardar_job):
+    popular(dias=3)
+    job = aguardar_job(admin, _enviar(admin)['id'])
+    assert job['status'] == 'concluido', job
+    assert admin.get(job['resultado_url']).get_json() == admin.get(ROTA).get_json()
+
+def test_mesmo_pedido_reaproveita_o_job_ate_os_dados_mudarem(admin, popular, aguardar_job):
+    dados = popular(dias=3)
+    primeiro = aguardar_job(admin, _enviar(admin)['id'])
+    
+    repetido = admin.get(ROTA + '&async=1')
+    assert repetido.status_code == 200
+    assert repetido.get_json()['id'] == primeiro['id']
+    
+    admin.post('/api/lancamentos', json={
+        'data': '2024-03-20', 'area_id': dados['areas'][0], 'colaborador_id': dados['colaboradores'][0],
+        'quantidade_realizada': 10
+    })
+    assert _enviar(admin)['id'] != primeiro['id']
+
+def test_jobs_nao_sao_compartilhados_entre_usuarios(popular, criar_usuario, aguardar_job):
+    popular(dias=3)
+    ana = criar_usuario('ana')
+    bia = criar_usuario('bia')
+    
+    job_ana = aguardar_job(ana, _enviar(ana)['id'])
+    assert job_ana['status'] == 'concluido'
+    
+    # O mesmo pedido de outro usuário gera um job próprio, sem expor o da ana
+    resposta = bia.get(ROTA + '&async=1')
+    job_bia = resposta.get_json()
+    assert job_bia['id'] != job_ana['id']
+    job_bia = aguardar_job(bia, job_bia['id'])
+    assert job_bia['status'] == 'concluido'
+    assert bia.get(job_bia['resultado_url']).status_code == 200
+    
+    assert bia.get(f"/api/jobs/{job_ana['id']}").status_code == 404
+    assert bia.get(f"/api/jobs/{job_ana['id']}/resultado").status_code == 404
+    assert ana.get(f"/api/jobs/{job_bia['id']}").status_code == 404
+
+def test_administrador_acessa_jobs_de_outros_usuarios(admin, popular, criar_usuario, aguardar_job):
+    popular(dias=1)
+    ana = criar_usuario('ana')
+    job = aguardar_job(ana, _enviar(ana)['id'])
+    assert admin.get(f"/api/jobs/{job['id']}").status_code == 200
+
+EXPORTACAO = '/api/lancamentos/export?format=csv&data_inicio=2024-03-01&data_fim=2024-03-31'
+
+def test_resultado_gravado_em_arquivo_e_enviado_em_streaming(app, admin, popular, aguardar_job):
+    popular(dias=3)
+    job = aguardar_job(admin, admin.get(EXPORTACAO + '&async=1').get_json()['id'])
+    assert job['status'] == 'concluido', job
+    
+    with app.app_context():
+        arquivo = db.session.get(Job, job['id']).arquivo
+    assert os.path.dirname(arquivo) == app.config['JOBS_DIR']
+    assert os.listdir(app.config['JOBS_DIR']) == [job['id']]
+    
+    resposta = admin.get(job['resultado_url'])
+    assert resposta.status_code == 200
+    assert resposta.is_streamed
+    assert 'attachment' in resposta.headers['Content-Disposition']
+    with open(arquivo, 'rb') as conteudo:
+        assert resposta.get_data() == conteudo.read() == admin.get(EXPORTACAO).get_data()
+    
+    os.remove(arquivo)
+    assert admin.get(job['resultado_url']).status_code == 410
+
+def test_jobs_antigos_removidos_com_o_arquivo(app, admin, popular, aguardar_job):
+    popular(dias=1)
+    antigo = aguardar_job(admin, _enviar(admin)['id'])
+    with app.app_context():
+        job = db.session.get(Job, antigo['id'])
+        arquivo = job.arquivo
+        job.criado_em = datetime.utcnow() - timedelta(days=RETENCAO_DIAS + 1)
+        db.session.commit()
+    
+    # Um novo job remove os vencidos
+    novo = aguardar_job(admin, admin.get(EXPORTACAO + '&async=1').get_json()['id'])
+    assert novo['status'] == 'concluido'
+    assert not os.path.exists(arquivo)
+    assert admin.get(f"/api/jobs/{antigo['id']}").status_code == 404
@@ -0,0 +1,111 @@
+import io
+import os
+from datetime import date
+from xml.sax.saxutils import escape
+from src.models.models import db, AreasProducao, Colaboradores, Metas, LancamentosProducao, ProducaoDiariaArea
+from src.utils.importador import EXCEL_EPOCH, importar_xml
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+def _celula(coluna, valor):
+    referencia = f'{chr(ord("A") + coluna)}1'
+    if isinstance(valor, str):
+        return f'<c r="{referencia}" t="inlineStr"><is><t>{escape(valor)}</t></is></c>'
+    return f'<c r="{referencia}"><v>{valor}</v></c>'
+
+def _planilha(linhas):
+    """sheetN.xml com as linhas informadas (textos como inlineStr)"""
+    corpo = ''.join(
+        '<row>' + ''.join(_celula(coluna, valor) for coluna, valor in enumerate(linha) if valor is not None) + '</row>'
+        for linha in linhas
+    )
+    return io.BytesIO(f'<worksheet xmlns="{NS}"><sheetData>{corpo}</sheetData></worksheet>'.encode('utf-8'))
+
+def _serial(dia):
+    return (date(2024, 3, dia) - EXCEL_EPOCH).days
+
+# Dois blocos lado a lado: Maria na área da planilha (Alça) e Jaine na área do rótulo (Fundo)
+PLANILHA_ALCA = [
+    [None, None, None, None, None, None, 'Área: Fundo'],
+    ['Colaborador: Maria Biato', None, None, None, None, None, 'Colaborador: Jaine'],
+    ['Data', 'Meta', 'Realizado', 'Saldo', 'Valor', None, 'Data', 'Meta', 'Realizado', 'Saldo', 'Valor'],
+    [_serial(1), 160, 160, 0, 350, None, _serial(1), 280, 300, 20, 214.28],
+    [_serial(2), 160, 200, 40, 437.5, None, _serial(2), 280, 'falta', None, None],
+    [_serial(3), 160, 80, -80, 175, None, _serial(3), 280, 140, -140, 100],
+    [_serial(1), 160, 999, None, None, None, None],  # duplicado: mesmo colaborador, área e data
+    ['Média:', None, 146.7, None, None, None, 'Média:', None, 220],
+    [_serial(4), 160, 500, None, None, None, _serial(4), 280, 500],  # fora dos blocos
+]
+
+def _importar_metas():
+    with open(os.path.join(RAIZ, 'sheet1.xml'), 'rb') as sheet, open(os.path.join(RAIZ, 'sharedStrings.xml'), 'rb') as textos:
+        return importar_xml('Metas', sheet, textos)
+
+def test_importa_metas_da_planilha(app):
+    with app.app_context():
+        resumo = _importar_metas()
+        assert resumo['metas_criadas'] == 9  # "Acessório Montagem Fundo" aparece duas vezes
+        assert resumo['areas_criadas'] == 9
+        metas = {nome: (meta_quantidade, valor) for nome, meta_quantidade, valor in db.session.query(
+            AreasProducao.nome, Metas.meta_quantidade, Metas.valor_unitario
+        ).join(Metas, Metas.area_id == AreasProducao.id)}
+        assert metas['Alça'] == (160, 350.0)
+        assert metas['Mesa de Dobra'] == (800, 150.0)
+        assert metas['Acessório Montagem Fundo'] == (1900, 200.0)
+        assert AreasProducao.query.filter_by(nome='Alça').one().total_metas == 1
+        
+        # Re-executar não duplica nada
+        resumo = _importar_metas()
+        assert resumo['metas_criadas'] == resumo['areas_criadas'] == 0
+        assert Metas.query.count() == 9
+
+def test_importa_lancamentos_em_blocos(app):
+    with app.app_context():
+        _importar_metas()
+        progresso = []
+        resumo = importar_xml('Alça ', _planilha(PLANILHA_ALCA), chunk_size=2, progresso=lambda r: progresso.append(r['linhas_lidas']))
+        
+        assert resumo['linhas_lidas'] == 6
+        assert resumo['inseridos'] == 5
+        assert resumo['ignorados'] == 1 and len(resumo['erros']) == 1
+        assert resumo['areas_criadas'] == 0
+        assert resumo['colaboradores_criados'] == 2
+        assert progresso == [2, 4, 6]
+        
+        assert sorted(nome for nome, in db.session.query(Colaboradores.nome)) == ['Jaine', 'Maria Biato']
+        lancamentos = {
+            (area, colaborador, data.day): (quantidade, saldo, valor)
+            for area, colaborador, data, quantidade, saldo, valor in db.session.query(
+                AreasProducao.nome, Colaboradores.nome, LancamentosProducao.data,
+                LancamentosProducao.quantidade_realizada, LancamentosProducao.saldo, LancamentosProducao.valor_receber
+            ).join(AreasProducao, AreasProducao.id == LancamentosProducao.area_id)
+            .join(Colaboradores, Colaboradores.id == LancamentosProducao.colaborador_id)
+        }
+        assert set(lancamentos) == {
+            ('Alça', 'Maria Biato', 1), ('Alça', 'Maria Biato', 2), ('Alça', 'Maria Biato', 3),
+            ('Fundo', 'Jaine', 1), ('Fundo', 'Jaine', 3)
+        }
+        # Calculados com as metas importadas da planilha
+        assert lancamentos[('Alça', 'Maria Biato', 1)] == (160, 0, 350.0)
+        assert lancamentos[('Fundo', 'Jaine', 3)] == (140, -140, 100.0)
+        
+        consolidados = {
+            (nome, data.day): (quantidade, soma)
+            for nome, data, quantidade, soma in db.session.query(
+                AreasProducao.nome, ProducaoDiariaArea.data, ProducaoDiariaArea.quantidade_lancamentos,
+                ProducaoDiariaArea.soma_quantidade
+            ).join(AreasProducao, AreasProducao.id == ProducaoDiariaArea.area_id)
+        }
+        assert consolidados == {
+            ('Alça', 1): (1, 160), ('Alça', 2): (1, 200), ('Alça', 3): (1, 80),
+            ('Fundo', 1): (1, 300), ('Fundo', 3): (1, 140)
+        }
+        assert {nome: total for nome, total in db.session.query(Colaboradores.nome, Colaboradores.total_lancamentos)} == {
+            'Maria Biato': 3, 'Jaine': 2
+        }
+        
+        # Re-executável: os lançamentos existentes são ignorados
+        resumo = importar_xml('Alça ', _planilha(PLANILHA_ALCA))
+        assert resumo['inseridos'] == 0 and resumo['ignorados'] == 6
+        assert LancamentosProducao.query.count() == 5
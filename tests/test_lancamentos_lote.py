@@ -0,0 +1,108 @@
+from src.models.models import db, LancamentosProducao, ProducaoDiariaArea
+from src.utils import producao_diaria
+
+def _linhas_consolidado():
+    return db.session.query(
+        ProducaoDiariaArea.data, ProducaoDiariaArea.area_id, ProducaoDiariaArea.quantidade_lancamentos,
+        ProducaoDiariaArea.soma_quantidade, db.func.round(ProducaoDiariaArea.soma_valor, 6)
+    ).order_by(ProducaoDiariaArea.data, ProducaoDiariaArea.area_id).all()
+
+def _consolidado(app):
+    with app.app_context():
+        return _linhas_consolidado()
+
+def _reconstruido(app):
+    # Consolidados recalculados do zero, para comparar com os mantidos incrementalmente
+    with app.app_context():
+        producao_diaria.reconstruir()
+        linhas = _linhas_consolidado()
+        db.session.rollback()
+        return linhas
+
+def _ids(admin, **filtros):
+    query_string = dict(filtros, limit=200)
+    return sorted(item['id'] for item in admin.get('/api/lancamentos', query_string=query_string).get_json()['items'])
+
+def test_atualiza_por_filtro_e_recalcula(app, admin, popular):
+    dados = popular(dias=5)
+    maria = dados['colaboradores'][0]
+    
+    resposta = admin.patch('/api/lancamentos', json={
+        'filtro': {'data_inicio': '2024-03-01', 'data_fim': '2024-03-02', 'colaborador_id': maria},
+        'alteracoes': {'quantidade_realizada': 500}
+    })
+    assert resposta.status_code == 200
+    assert resposta.get_json() == {'atualizados': 4, 'recalculados': 4, 'nao_encontrados': []}
+    
+    for lancamento in admin.get('/api/lancamentos', query_string={'colaborador_id': maria, 'limit': 200}).get_json()['items']:
+        if lancamento['data'] <= '2024-03-02':
+            assert lancamento['quantidade_realizada'] == 500
+            assert lancamento['saldo'] == 500 - (160 if lancamento['area_id'] == dados['areas'][0] else 280)
+    assert _consolidado(app) == _reconstruido(app)
+
+def test_move_por_ids_e_informa_nao_encontrados(app, admin, popular):
+    dados = popular(dias=3)
+    ids = _ids(admin, area_id=dados['areas'][0], colaborador_id=dados['colaboradores'][0])
+    
+    resposta = admin.patch('/api/lancamentos', json={'ids': ids + [999999], 'alteracoes': {'area_id': dados['areas'][1]}})
+    assert resposta.status_code == 400  # a outra área já tem lançamentos nessas datas
+    
+    resposta = admin.patch('/api/lancamentos', json={'ids': ids[:1] + [999999], 'alteracoes': {'data': '2024-04-01'}})
+    assert resposta.get_json()['nao_encontrados'] == [999999]
+    assert admin.get(f'/api/lancamentos/{ids[0]}').get_json()['data'] == '2024-04-01'
+    assert _consolidado(app) == _reconstruido(app)
+
+def test_duplicado_desfaz_toda_a_alteracao(app, admin, popular):
+    dados = popular(dias=3)
+    antes = _consolidado(app)
+    resposta = admin.patch('/api/lancamentos', json={
+        'filtro': {'data_inicio': '2024-03-01', 'data_fim': '2024-03-03', 'area_id': dados['areas'][0]},
+        'alteracoes': {'data': '2024-03-01'}
+    })
+    assert resposta.status_code == 400
+    assert _consolidado(app) == antes
+
+def test_validacoes(admin, popular):
+    popular(dias=1)
+    ids = _ids(admin)
+    assert admin.patch('/api/lancamentos', json={'ids': ids, 'alteracoes': {}}).status_code == 400
+    assert admin.patch('/api/lancamentos', json={'ids': ids, 'alteracoes': {'saldo': 1}}).status_code == 400
+    assert admin.patch('/api/lancamentos', json={'alteracoes': {'quantidade_realizada': 1}}).status_code == 400
+    assert admin.patch('/api/lancamentos', json={
+        'ids': ids, 'filtro': {'data_inicio': '2024-03-01', 'data_fim': '2024-03-01'}, 'alteracoes': {'quantidade_realizada': 1}
+    }).status_code == 400
+    assert admin.patch('/api/lancamentos', json={'ids': ids, 'alteracoes': {'area_id': 999999}}).status_code == 404
+    assert admin.delete('/api/lancamentos', json={'filtro': {'data_inicio': '2024-03-01'}}).status_code == 400
+
+def test_rejeita_colaborador_ausente(admin, popular):
+    dados = popular(dias=1)
+    jaine = dados['colaboradores'][1]
+    admin.post('/api/observacoes', json={'colaborador_id': jaine, 'data': '2024-04-01', 'tipo_observacao': 'falta'})
+    ids = _ids(admin, colaborador_id=dados['colaboradores'][0], area_id=dados['areas'][0])
+    
+    resposta = admin.patch('/api/lancamentos', json={'ids': ids, 'alteracoes': {'colaborador_id': jaine, 'data': '2024-04-01'}})
+    assert resposta.status_code == 400
+    assert 'ausente (falta)' in resposta.get_json()['error']
+
+def test_remove_por_filtro_e_por_ids(app, admin, popular):
+    popular(dias=5)
+    resposta = admin.delete('/api/lancamentos', json={'filtro': {'data_inicio': '2024-03-04', 'data_fim': '2024-03-05'}})
+    assert resposta.get_json() == {'removidos': 8, 'nao_encontrados': []}
+    
+    ids = _ids(admin)
+    resposta = admin.delete('/api/lancamentos', json={'ids': ids[:2] + [999999]})
+    assert resposta.get_json() == {'removidos': 2, 'nao_encontrados': [999999]}
+    with app.app_context():
+        assert LancamentosProducao.query.count() == 10
+    assert _consolidado(app) == _reconstruido(app)
+
+def test_filtro_acima_do_maximo_e_recusado(app, admin, popular, monkeypatch):
+    from src.routes import lancamentos
+    popular(dias=5)
+    monkeypatch.setattr(lancamentos, 'MAX_BULK_ROWS', 3)
+    
+    resposta = admin.delete('/api/lancamentos', json={'filtro': {'data_inicio': '2024-03-01', 'data_fim': '2024-03-05'}})
+    assert resposta.status_code == 400
+    assert 'mais de 3' in resposta.get_json()['error']
+    with app.app_context():
+        assert LancamentosProducao.query.count() == 20
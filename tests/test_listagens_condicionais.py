@@ -0,0 +1,42 @@
+def _get(cliente, rota, etag=None):
+    return cliente.get(rota, headers={'If-None-Match': etag} if etag else {})
+
+def test_304_com_o_etag_atual(admin, popular):
+    popular(dias=1)
+    for rota in ('/api/areas', '/api/colaboradores', '/api/metas'):
+        resposta = _get(admin, rota)
+        assert resposta.status_code == 200
+        etag = resposta.headers['ETag']
+        
+        assert _get(admin, rota, etag).status_code == 304
+
+def test_etag_muda_com_a_tabela(admin, popular):
+    popular(dias=1)
+    etag = _get(admin, '/api/areas').headers['ETag']
+    
+    admin.post('/api/areas', json={'nome': 'Nova'})
+    
+    resposta = _get(admin, '/api/areas', etag)
+    assert resposta.status_code == 200
+    assert 'Nova' in [area['nome'] for area in resposta.get_json()]
+
+def test_areas_mudam_apenas_quando_um_total_muda(admin, popular):
+    dados = popular(dias=1)
+    area_id, colaborador_id = dados['areas'][0], dados['colaboradores'][0]
+    etag_areas = _get(admin, '/api/areas').headers['ETag']
+    etag_metas = _get(admin, '/api/metas').headers['ETag']
+    lancamento = admin.get(f'/api/lancamentos?limit=1&area_id={area_id}').get_json()['items'][0]
+    
+    # Alterar a quantidade não muda nenhum total
+    admin.put(f"/api/lancamentos/{lancamento['id']}", json={'quantidade_realizada': 999})
+    assert _get(admin, '/api/areas', etag_areas).status_code == 304
+    
+    # Um novo lançamento muda o total da área, mas não a listagem de metas
+    admin.post('/api/lancamentos', json={
+        'data': '2024-03-20', 'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': 10
+    })
+    resposta = _get(admin, '/api/areas', etag_areas)
+    assert resposta.status_code == 200
+    totais = {area['id']: area['total_lancamentos'] for area in resposta.get_json()}
+    assert totais[area_id] == 3
+    assert _get(admin, '/api/metas', etag_metas).status_code == 304
@@ -0,0 +1,43 @@
+from datetime import date
+from src.models.models import db
+from src.utils.meta_resolver import meta_resolver
+from src.utils.versoes import versoes_tabelas
+
+def _alterar_meta_em_outro_worker(app, meta_quantidade, valor_unitario):
+    # Escrita direta no banco, sem passar pelas rotas deste processo (como faria
+    # outro worker): só a versão de metas muda
+    with app.app_context(), db.engine.begin() as conexao:
+        conexao.execute(
+            db.text('UPDATE metas SET meta_quantidade = :q, valor_unitario = :v'),
+            {'q': meta_quantidade, 'v': valor_unitario}
+        )
+        conexao.execute(db.text("UPDATE versoes_tabelas SET versao = versao + 1 WHERE tabela = 'metas'"))
+    # As versões são relidas depois do TTL de versoes_tabelas
+    versoes_tabelas.invalidar()
+
+def test_recarrega_quando_a_versao_de_metas_muda(app, popular):
+    dados = popular(dias=0)
+    area_id = dados['areas'][0]
+    with app.app_context():
+        assert meta_resolver.resolver(area_id, date(2024, 3, 1)).meta_quantidade == 160
+    
+    _alterar_meta_em_outro_worker(app, 100, 10)
+    
+    with app.app_context():
+        meta = meta_resolver.resolver(area_id, date(2024, 3, 1))
+        assert (meta.meta_quantidade, meta.valor_unitario) == (100, 10)
+
+def test_lancamento_usa_meta_alterada_em_outro_worker(app, admin, popular):
+    dados = popular(dias=0)
+    area_id, colaborador_id = dados['areas'][0], dados['colaboradores'][0]
+    admin.post('/api/lancamentos', json={
+        'data': '2024-03-01', 'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': 200
+    })
+    
+    _alterar_meta_em_outro_worker(app, 100, 10)
+    
+    resposta = admin.post('/api/lancamentos', json={
+        'data': '2024-03-02', 'area_id': area_id, 'colaborador_id': colaborador_id, 'quantidade_realizada': 200
+    })
+    assert resposta.status_code == 201
+    assert resposta.get_json()['saldo'] == 100
@@ -0,0 +1,21 @@
+def test_metricas_negadas_sem_credenciais(app):
+    assert app.test_client().get('/api/_metrics').status_code == 403
+
+def test_metricas_negadas_para_usuario_comum(criar_usuario):
+    assert criar_usuario('operador').get('/api/_metrics').status_code == 403
+
+def test_metricas_para_administrador(admin):
+    admin.get('/api/areas')
+    resposta = admin.get('/api/_metrics')
+    assert resposta.status_code == 200
+    assert 'http_requests_total{method="GET",endpoint="/api/areas",status="200"}' in resposta.get_data(as_text=True)
+
+def test_metricas_com_token(app):
+    app.config['METRICS_TOKEN'] = 'segredo'
+    cliente = app.test_client()
+    assert cliente.get('/api/_metrics', headers={'Authorization': 'Bearer outro'}).status_code == 403
+    assert cliente.get('/api/_metrics', headers={'Authorization': 'Bearer segredo'}).status_code == 200
+
+def test_metricas_publicas_somente_com_opt_in(app):
+    app.config['METRICS_PUBLIC'] = True
+    assert app.test_client().get('/api/_metrics').status_code == 200
@@ -0,0 +1,24 @@
+import sqlalchemy as sa
+from src.models.models import db, Colaboradores, FechamentoColaborador
+from src.models.migrations import MIGRATIONS
+
+def test_versoes_das_migracoes_unicas_e_ordenadas():
+    versoes = [versao for versao, _, _ in MIGRATIONS]
+    assert versoes == sorted(set(versoes))
+
+def test_nome_do_fechamento_comporta_o_nome_do_colaborador():
+    assert FechamentoColaborador.__table__.c.colaborador_nome.type.length >= Colaboradores.__table__.c.nome.type.length
+
+def test_migracoes_aplicadas_no_banco_novo(app):
+    with app.app_context():
+        aplicadas = {row[0] for row in db.session.execute(db.text('SELECT version FROM schema_migrations'))}
+    assert aplicadas == {versao for versao, _, _ in MIGRATIONS}
+
+def test_migracao_4_cria_o_nome_com_o_tamanho_do_colaborador(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'vazio.db'}")
+    funcao = next(funcao for versao, _, funcao in MIGRATIONS if versao == 4)
+    with engine.begin() as conn:
+        funcao(conn)
+        colunas = {coluna['name']: coluna for coluna in sa.inspect(conn).get_columns('fechamentos_colaboradores')}
+    engine.dispose()
+    assert colunas['colaborador_nome']['type'].length == 200
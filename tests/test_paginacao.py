@@ -0,0 +1,30 @@
+import json
+
+def test_pagina_por_cursor_percorre_todas_as_linhas(admin, popular):
+    popular(dias=3)
+    completos = admin.get('/api/lancamentos').get_json()
+    
+    ids, cursor = [], None
+    while True:
+        query_string = {'limit': 5} if cursor is None else {'limit': 5, 'cursor': cursor}
+        pagina = admin.get('/api/lancamentos', query_string=query_string).get_json()
+        ids += [item['id'] for item in pagina['items']]
+        cursor = pagina['next_cursor']
+        if cursor is None:
+            break
+    assert ids == [item['id'] for item in completos]
+    assert len(ids) == 12
+
+def test_ndjson_envia_uma_linha_por_lancamento(admin, popular):
+    popular(dias=2)
+    resposta = admin.get('/api/lancamentos', query_string={'format': 'ndjson'})
+    assert resposta.status_code == 200
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert [linha['id'] for linha in linhas] == [item['id'] for item in admin.get('/api/lancamentos').get_json()]
+
+def test_ndjson_nao_combina_com_paginacao(admin, popular):
+    popular(dias=1)
+    for query_string in ({'format': 'ndjson', 'limit': 2}, {'format': 'ndjson', 'cursor': 'x'}):
+        resposta = admin.get('/api/lancamentos', query_string=query_string)
+        assert resposta.status_code == 400
+        assert 'ndjson' in resposta.get_json()['error']
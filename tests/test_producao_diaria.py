@@ -0,0 +1,72 @@
+from src.models.models import db, ProducaoDiariaArea, ProducaoDiariaColaborador
+from src.utils import producao_diaria
+
+def _linhas(model, chave):
+    coluna = getattr(model, chave)
+    return db.session.query(
+        model.data, coluna, model.quantidade_lancamentos, model.soma_quantidade, db.func.round(model.soma_valor, 6)
+    ).order_by(model.data, coluna).all()
+
+def _consolidados(app, reconstruir=False):
+    # Com reconstruir=True os consolidados são recalculados do zero (e descartados em seguida)
+    with app.app_context():
+        if reconstruir:
+            producao_diaria.reconstruir()
+        linhas = (
+            _linhas(ProducaoDiariaArea, 'area_id'),
+            _linhas(ProducaoDiariaColaborador, 'colaborador_id')
+        )
+        db.session.rollback()
+        return linhas
+
+def _ids(admin, **filtros):
+    return [item['id'] for item in admin.get('/api/lancamentos', query_string=dict(filtros, limit=200)).get_json()['items']]
+
+def test_consolidados_acompanham_todas_as_escritas(app, admin, popular):
+    dados = popular(dias=4)
+    alca, fundo = dados['areas']
+    maria, jaine = dados['colaboradores']
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Criação individual em uma data nova
+    resposta = admin.post('/api/lancamentos', json={
+        'data': '2024-03-10', 'area_id': alca, 'colaborador_id': maria, 'quantidade_realizada': 170
+    })
+    assert resposta.status_code == 201
+    novo = resposta.get_json()['id']
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Alteração de quantidade, depois mudança de área e de data (sai de um dia e entra em outro)
+    assert admin.put(f'/api/lancamentos/{novo}', json={'quantidade_realizada': 90}).status_code == 200
+    assert admin.put(f'/api/lancamentos/{novo}', json={'area_id': fundo, 'data': '2024-03-11'}).status_code == 200
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Mudança de colaborador de um lançamento existente
+    movido = _ids(admin, area_id=alca, colaborador_id=maria, data_inicio='2024-03-01', data_fim='2024-03-01')[0]
+    assert admin.put(f'/api/lancamentos/{movido}', json={'colaborador_id': jaine, 'data': '2024-03-12'}).status_code == 200
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Exclusão individual (o dia 2024-03-11 fica sem lançamentos)
+    assert admin.delete(f'/api/lancamentos/{novo}').status_code == 200
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Escritas em lote
+    resposta = admin.patch('/api/lancamentos', json={
+        'filtro': {'data_inicio': '2024-03-02', 'data_fim': '2024-03-03', 'area_id': fundo},
+        'alteracoes': {'quantidade_realizada': 300}
+    })
+    assert resposta.status_code == 200
+    resposta = admin.delete('/api/lancamentos', json={'filtro': {'data_inicio': '2024-03-04', 'data_fim': '2024-03-04'}})
+    assert resposta.get_json()['removidos'] == 4
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Recalculo após alterar a meta
+    metas = admin.get('/api/metas').get_json()
+    meta_fundo = next(meta for meta in metas if meta['area_id'] == fundo)
+    assert admin.put(f"/api/metas/{meta_fundo['id']}", json={'valor_unitario': 250}).status_code == 200
+    assert _consolidados(app) == _consolidados(app, reconstruir=True)
+    
+    # Nenhum consolidado vazio sobra depois das exclusões
+    por_area, por_colaborador = _consolidados(app)
+    assert all(linha.quantidade_lancamentos > 0 for linha in por_area + por_colaborador)
+    assert '2024-03-11' not in {linha.data.isoformat() for linha in por_area}
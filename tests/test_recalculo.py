@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from src.utils.calculos import calcular_saldo_valor
+from src.utils.recalculo import calcular_vetorizado
+
+# (quantidade, meta_quantidade, valor_unitario, tem_meta)
+CASOS = [
+    (100, 100, 50.0, True),   # exatamente na meta
+    (150, 100, 50.0, True),   # acima
+    (40, 100, 50.0, True),    # abaixo
+    (0, 160, 350.0, True),
+    (250, 200, 80.0, True),
+    (120, 0, 0.0, False),     # sem meta vigente
+    (120, 0, 50.0, True),     # meta inválida gravada antes da validação
+]
+
+def _escalar(quantidade, meta_quantidade, valor_unitario, tem_meta):
+    if not tem_meta:
+        return 0, 0
+    return calcular_saldo_valor(quantidade, meta_quantidade, valor_unitario)
+
+def test_vetorizado_igual_ao_escalar():
+    quantidades, metas, valores, tem_meta = (np.array(coluna) for coluna in zip(*CASOS))
+    saldos, valores_receber = calcular_vetorizado(
+        quantidades.astype(np.float64), metas.astype(np.float64), valores.astype(np.float64), tem_meta.astype(bool)
+    )
+    for caso, saldo, valor in zip(CASOS, saldos.tolist(), valores_receber.tolist()):
+        saldo_escalar, valor_escalar = _escalar(*caso)
+        assert saldo == saldo_escalar, caso
+        assert valor == pytest.approx(valor_escalar), caso
+
+def _lancamentos(admin, area_id):
+    itens = admin.get('/api/lancamentos', query_string={'area_id': area_id, 'limit': 200}).get_json()['items']
+    return {item['data']: (item['quantidade_realizada'], item['saldo'], item['valor_receber']) for item in itens}
+
+def test_recalculo_em_lote_igual_as_gravacoes_individuais(admin):
+    area = admin.post('/api/areas', json={'nome': 'Tampa'}).get_json()['id']
+    colaborador = admin.post('/api/colaboradores', json={'nome': 'Ana'}).get_json()['id']
+    vigencias = (('2024-03-05', 100, 50.0), ('2024-03-10', 200, 80.0))
+    metas = []
+    for vigencia, meta_quantidade, valor_unitario in vigencias:
+        resposta = admin.post('/api/metas', json={
+            'nome': f'Meta {vigencia}', 'area_id': area, 'meta_quantidade': meta_quantidade,
+            'valor_unitario': valor_unitario, 'data_vigencia': vigencia
+        })
+        assert resposta.status_code == 201
+        metas.append(resposta.get_json()['id'])
+    
+    # Antes da primeira vigência, na meta, acima e abaixo de cada vigência
+    for data, quantidade in (('2024-03-01', 90), ('2024-03-05', 100), ('2024-03-06', 150), ('2024-03-07', 40),
+                             ('2024-03-10', 200), ('2024-03-12', 250)):
+        resposta = admin.post('/api/lancamentos', json={
+            'data': data, 'area_id': area, 'colaborador_id': colaborador, 'quantidade_realizada': quantidade
+        })
+        assert resposta.status_code == 201
+    
+    gravados = _lancamentos(admin, area)
+    assert gravados['2024-03-01'] == (90, 0, 0)
+    assert gravados['2024-03-05'] == (100, 0, 50.0)
+    
+    # Os valores gravados pelo cálculo escalar não mudam no recalculo vetorizado
+    resumo = admin.post('/api/metas/recalcular', json={'area_id': area, 'dry_run': True}).get_json()
+    assert resumo['lancamentos_analisados'] == 6
+    assert resumo['lancamentos_alterados'] == 0
+    
+    # Alterar a segunda meta recalcula em lote; o resultado bate com o cálculo escalar
+    assert admin.put(f'/api/metas/{metas[1]}', json={'meta_quantidade': 180}).status_code == 200
+    for data, (quantidade, saldo, valor) in _lancamentos(admin, area).items():
+        meta = next((meta for meta in reversed(vigencias) if meta[0] <= data), None)
+        esperado = calcular_saldo_valor(quantidade, 180 if meta == vigencias[1] else meta[1], meta[2]) if meta else (0, 0)
+        assert saldo == esperado[0], data
+        assert valor == pytest.approx(esperado[1]), data
+
+def test_rejeita_meta_quantidade_nao_positiva(admin):
+    area = admin.post('/api/areas', json={'nome': 'Tampa'}).get_json()['id']
+    for meta_quantidade in (0, -5, '100', None, True):
+        resposta = admin.post('/api/metas', json={
+            'nome': 'Meta', 'area_id': area, 'meta_quantidade': meta_quantidade, 'valor_unitario': 10
+        })
+        assert resposta.status_code == 400, meta_quantidade
+    
+    meta = admin.post('/api/metas', json={'nome': 'Meta', 'area_id': area, 'meta_quantidade': 10, 'valor_unitario': 10})
+    meta_id = meta.get_json()['id']
+    assert admin.put(f'/api/metas/{meta_id}', json={'meta_quantidade': 0}).status_code == 400
+    assert admin.get(f'/api/metas/{meta_id}').get_json()['meta_quantidade'] == 10
@@ -0,0 +1,17 @@
+ROTA = '/api/relatorios/producao-area'
+
+def test_comparativo_igual_aos_relatorios_de_cada_periodo(admin, popular):
+    popular(dias=10)
+    periodos = {'a': ('2024-03-01', '2024-03-05'), 'b': ('2024-03-06', '2024-03-10')}
+    resposta = admin.get(ROTA, query_string=[('periodo', f'{nome}:{inicio}:{fim}') for nome, (inicio, fim) in periodos.items()])
+    assert resposta.status_code == 200
+    comparativo = resposta.get_json()
+    
+    for nome, (inicio, fim) in periodos.items():
+        simples = admin.get(ROTA, query_string={'data_inicio': inicio, 'data_fim': fim}).get_json()
+        total = sum(linha['total_produzido'] for linha in simples)
+        assert comparativo['totais'][nome]['total_produzido'] == total
+
+def test_periodo_invalido(admin):
+    assert admin.get(ROTA, query_string={'periodo': 'a:2024-03-10:2024-03-01'}).status_code == 400
+    assert admin.get(ROTA, query_string={'periodo': 'sem-datas'}).status_code == 400
@@ -0,0 +1,48 @@
+from src.models.models import db, VersaoTabela
+from src.models.user import User
+from src.utils.versoes import versoes_tabelas
+
+def _em_outro_worker(app, sql):
+    # Alteração feita por outro processo: só o banco e a versão de users mudam
+    with app.app_context(), db.engine.begin() as conexao:
+        conexao.execute(db.text(sql))
+        conexao.execute(db.text("UPDATE versoes_tabelas SET versao = versao + 1 WHERE tabela = 'users'"))
+    versoes_tabelas.invalidar()
+
+def _versao_users(app):
+    with app.app_context():
+        versao = db.session.get(VersaoTabela, 'users')
+        return versao.versao if versao else 0
+
+def test_usuario_desativado_em_outro_worker_perde_acesso(app, criar_usuario):
+    cliente = criar_usuario('operador')
+    assert cliente.get('/api/me').status_code == 200
+    
+    _em_outro_worker(app, "UPDATE users SET is_active = 0 WHERE username = 'operador'")
+    
+    assert cliente.get('/api/me').status_code != 200
+
+def test_papel_alterado_em_outro_worker_vale_na_proxima_requisicao(app, criar_usuario):
+    cliente = criar_usuario('operador')
+    assert cliente.post('/api/areas', json={'nome': 'Nova'}).status_code == 403
+    
+    _em_outro_worker(app, "UPDATE users SET role = 'admin' WHERE username = 'operador'")
+    
+    assert cliente.post('/api/areas', json={'nome': 'Nova'}).status_code == 201
+
+def test_alteracoes_pelo_orm_incrementam_a_versao(app, criar_usuario):
+    criar_usuario('operador')
+    inicial = _versao_users(app)
+    assert inicial > 0
+    
+    with app.app_context():
+        user = User.query.filter_by(username='operador').first()
+        user.last_login = None
+        db.session.commit()
+    assert _versao_users(app) == inicial
+    
+    with app.app_context():
+        user = User.query.filter_by(username='operador').first()
+        user.is_active = False
+        db.session.commit()
+    assert _versao_users(app) == inicial + 1
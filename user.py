@@ -4,25 +4,33 @@ from flask_login import UserMixin
 from datetime import datetime
 from .models import db
 
-class User(UserMixin, db.Model):
-    __tablename__ = 'users'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.String(20), nullable=False, default='user')  # 'admin' ou 'user'
-    is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_login = db.Column(db.DateTime)
+# Permissões em bits; a máscara de cada função é calculada uma única vez
+PERM_MANAGE_METAS = 1 << 0
+PERM_CREATE_LANCAMENTOS = 1 << 1
+PERM_VIEW_ALL_LANCAMENTOS = 1 << 2
+PERM_MANAGE_AREAS = 1 << 3
+PERM_MANAGE_COLABORADORES = 1 << 4
+PERM_MANAGE_OBSERVACOES = 1 << 5
+
+ROLE_PERMISSIONS = {
+    'admin': (
+        PERM_MANAGE_METAS | PERM_CREATE_LANCAMENTOS | PERM_VIEW_ALL_LANCAMENTOS |
+        PERM_MANAGE_AREAS | PERM_MANAGE_COLABORADORES | PERM_MANAGE_OBSERVACOES
+    ),
+    'user': PERM_CREATE_LANCAMENTOS
+}
+
+class UserPermissionsMixin:
+    """Verificações de permissão e serialização comuns a User e CachedUser"""
     
-    def set_password(self, password):
-        """Define a senha do usuário usando hash seguro"""
-        self.password_hash = generate_password_hash(password)
+    @property
+    def permissions(self):
+        """Máscara de permissões da função do usuário"""
+        return ROLE_PERMISSIONS.get(self.role, 0)
     
-    def check_password(self, password):
-        """Verifica se a senha fornecida está correta"""
-        return check_password_hash(self.password_hash, password)
+    def has_permission(self, permission):
+        """Verifica se o usuário possui todas as permissões da máscara informada"""
+        return self.permissions & permission == permission
     
     def is_admin(self):
         """Verifica se o usuário é administrador"""
@@ -30,27 +38,27 @@ class User(UserMixin, db.Model):
     
     def can_manage_metas(self):
         """Verifica se o usuário pode gerenciar metas"""
-        return self.role == 'admin'
+        return self.has_permission(PERM_MANAGE_METAS)
     
     def can_create_lancamentos(self):
         """Verifica se o usuário pode criar lançamentos"""
-        return self.role in ['admin', 'user']
+        return self.has_permission(PERM_CREATE_LANCAMENTOS)
     
     def can_view_all_lancamentos(self):
         """Verifica se o usuário pode ver todos os lançamentos"""
-        return self.role == 'admin'
+        return self.has_permission(PERM_VIEW_ALL_LANCAMENTOS)
     
     def can_manage_areas(self):
         """Verifica se o usuário pode gerenciar áreas"""
-        return self.role == 'admin'
+        return self.has_permission(PERM_MANAGE_AREAS)
     
     def can_manage_colaboradores(self):
         """Verifica se o usuário pode gerenciar colaboradores"""
-        return self.role == 'admin'
+        return self.has_permission(PERM_MANAGE_COLABORADORES)
     
     def can_manage_observacoes(self):
         """Verifica se o usuário pode gerenciar observações"""
-        return self.role == 'admin'
+        return self.has_permission(PERM_MANAGE_OBSERVACOES)
     
     def to_dict(self):
         """Converte o usuário para dicionário (sem senha)"""
@@ -71,7 +79,47 @@ class User(UserMixin, db.Model):
                 'can_manage_observacoes': self.can_manage_observacoes()
             }
         }
+
+class User(UserPermissionsMixin, UserMixin, db.Model):
+    __tablename__ = 'users'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    role = db.Column(db.String(20), nullable=False, default='user')  # 'admin' ou 'user'
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_login = db.Column(db.DateTime)
+    
+    def set_password(self, password):
+        """Define a senha do usuário usando hash seguro"""
+        self.password_hash = generate_password_hash(password)
+    
+    def check_password(self, password):
+        """Verifica se a senha fornecida está correta"""
+        return check_password_hash(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
 
+class CachedUser(UserPermissionsMixin, UserMixin):
+    """Cópia somente leitura de um User, mantida no cache de usuários autenticados
+
+    Não está ligada a nenhuma sessão do SQLAlchemy, de modo que pode ser
+    compartilhada entre requisições e threads sem acessar o banco.
+    """
+    
+    is_active = True
+    
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role = user.role
+        self.is_active = bool(user.is_active)
+        self.created_at = user.created_at
+        self.last_login = user.last_login
+    
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
@@ -0,0 +1,58 @@
+import threading
+from sqlalchemy import event, inspect
+from src.models.models import db
+from src.models.user import User, CachedUser
+from src.utils.versoes import versoes_tabelas
+
+# Cache (por processo) dos usuários autenticados usado pelo user_loader.
+#
+# Cada requisição autenticada consulta o cache em vez de executar User.query.get.
+# Cada entrada guarda a versão da tabela users com que foi carregada e é recarregada
+# quando essa versão muda. Inserções, exclusões e alterações de papel, situação,
+# nome ou email feitas pelo ORM incrementam a versão na mesma transação, de modo
+# que um usuário desativado em um worker deixa de ser autorizado nos demais assim
+# que as versões são relidas (versoes_tabelas), e não ao fim de um TTL.
+
+# Atributos que mudam o que o cache devolve (last_login, por exemplo, não)
+ATRIBUTOS_VERSIONADOS = ('username', 'email', 'role', 'is_active')
+
+class UserCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, user_id):
+        """CachedUser ativo com o id informado, ou None se não existir ou estiver inativo"""
+        versao = versoes_tabelas.versoes((User.__tablename__,))
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] == versao:
+            return entry[1]
+
+        user = db.session.get(User, user_id)
+        cached = CachedUser(user) if user is not None and user.is_active else None
+        with self._lock:
+            self._entries[user_id] = (versao, cached)
+        return cached
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache()
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    versoes_tabelas.incrementar(User.__tablename__, conexao=connection)
+
+@event.listens_for(User, 'after_update')
+def _update_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    estado = inspect(target)
+    if any(estado.attrs[atributo].history.has_changes() for atributo in ATRIBUTOS_VERSIONADOS):
+        versoes_tabelas.incrementar(User.__tablename__, conexao=connection)
@@ -0,0 +1,121 @@
+import threading
+import time
+from functools import wraps
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.models import db, VersaoTabela
+from src.utils.db_profile import RoutingSession
+
+# Versões das tabelas de referência (áreas, colaboradores, metas) e GET condicional.
+#
+# As rotas de escrita chamam incrementar() antes do commit, na mesma transação da
+# alteração. As listagens marcadas com @conditional_get geram um ETag forte a partir
+# das versões das tabelas de que dependem: se o cliente já tem essa versão
+# (If-None-Match) a resposta é 304 sem consultar o banco; senão o corpo serializado
+# é guardado por versão e reutilizado. As versões são relidas do banco no máximo a
+# cada DEFAULT_TTL segundos, o que limita o atraso entre workers.
+
+DEFAULT_TTL = 5
+
+class VersoesTabelas:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versoes = {}
+        self._expira_em = 0.0
+
+    def versoes(self, tabelas):
+        """Tupla com a versão atual de cada tabela informada"""
+        if time.monotonic() >= self._expira_em:
+            self.carregar()
+        return tuple(self._versoes.get(tabela, 0) for tabela in tabelas)
+
+    def carregar(self):
+        versoes = dict(db.session.query(VersaoTabela.tabela, VersaoTabela.versao))
+        with self._lock:
+            self._versoes = versoes
+            self._expira_em = time.monotonic() + self.ttl
+
+    def incrementar(self, *tabelas, conexao=None):
+        """Incrementa a versão das tabelas na transação atual (sem commit)
+
+        conexao é a conexão da transação em andamento, para os eventos de flush do
+        ORM, em que a sessão não pode executar instruções; por padrão usa db.session.
+        """
+        executor = conexao if conexao is not None else db.session
+        stmt = _insert(VersaoTabela.__table__, conexao)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VersaoTabela.tabela],
+            set_={'versao': VersaoTabela.versao + 1}
+        )
+        executor.execute(stmt, [{'tabela': tabela, 'versao': 1} for tabela in tabelas])
+        db.session.info['versoes_alteradas'] = True
+
+    def invalidar(self):
+        with self._lock:
+            self._expira_em = 0.0
+
+versoes_tabelas = VersoesTabelas()
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidar_versoes(session):
+    # Relê as versões somente depois do commit, para não guardar a versão anterior
+    if session.info.pop('versoes_alteradas', False):
+        versoes_tabelas.invalidar()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _descartar_versoes(session):
+    session.info.pop('versoes_alteradas', None)
+
+def _insert(table, conexao=None):
+    dialect = (conexao if conexao is not None else db.session.get_bind()).dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+# Listagens decoradas com @conditional_get, para aquecer_listagens()
+LISTAGENS = []
+
+def limpar_listagens():
+    """Descarta os corpos guardados de todas as listagens (por exemplo, ao trocar de banco)"""
+    for listagem in LISTAGENS:
+        listagem.limpar()
+
+def aquecer_listagens(app):
+    """Gera e guarda em cache o corpo atual de todas as listagens com @conditional_get"""
+    for listagem in LISTAGENS:
+        with app.test_request_context():
+            listagem()
+
+def conditional_get(*tabelas):
+    """Decorator de listagem com ETag forte e corpo em cache por versão das tabelas"""
+    def decorator(f):
+        corpos = {}
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            versoes = versoes_tabelas.versoes(tabelas)
+            etag = f.__name__ + '-' + '-'.join(str(versao) for versao in versoes)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                corpo = corpos.get(versoes)
+                if corpo is None:
+                    response = f(*args, **kwargs)
+                    if isinstance(response, tuple):
+                        response, status = response
+                        if status != 200:
+                            return response, status
+                    corpo = response.get_data()
+                    # Apenas a versão mais recente é mantida
+                    corpos.clear()
+                    corpos[versoes] = corpo
+                response = Response(corpo, mimetype='application/json')
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        decorated_function.limpar = corpos.clear
+        LISTAGENS.append(decorated_function)
+        return decorated_function
+    return decorator